@@ -0,0 +1,142 @@
+"""A small read-only JSON API over the book catalog.
+
+Rows are fetched with ``values()`` and serialised straight from those dicts,
+so no model instances or templates are involved.  ``?fields=`` narrows the
+SELECT to the requested columns.
+"""
+from django.conf import settings
+from django.http import JsonResponse
+from django.urls import reverse
+from django.views.decorators.gzip import gzip_page
+from django.views.decorators.http import require_safe
+
+from loans.models import Book
+from loans.pagination import get_keyset_window, parse_cursor
+
+API_FIELDS = ['id', 'authors', 'title', 'publication_date', 'isbn', 'updated_at']
+MAX_LIMIT = 500
+MAX_IDS = 500
+
+
+class BadRequest(Exception):
+    pass
+
+
+def error_response(message, status=400):
+    return JsonResponse({'error': message}, status=status)
+
+
+def parse_fields(request):
+    value = request.GET.get('fields')
+    if not value:
+        return API_FIELDS
+    fields = list(dict.fromkeys(field.strip() for field in value.split(',') if field.strip()))
+    unknown = [field for field in fields if field not in API_FIELDS]
+    if unknown:
+        raise BadRequest(f"Unknown fields: {', '.join(unknown)}. Choose from {', '.join(API_FIELDS)}.")
+    return fields
+
+
+def parse_limit(request):
+    value = request.GET.get('limit')
+    if value is None:
+        return settings.ITEMS_PER_PAGE
+    try:
+        limit = int(value)
+    except ValueError:
+        raise BadRequest("limit must be an integer.")
+    if not 1 <= limit <= MAX_LIMIT:
+        raise BadRequest(f"limit must be between 1 and {MAX_LIMIT}.")
+    return limit
+
+
+def parse_ids(value):
+    try:
+        ids = list(dict.fromkeys(int(book_id) for book_id in value.split(',') if book_id.strip()))
+    except ValueError:
+        raise BadRequest("ids must be a comma-separated list of integers.")
+    if len(ids) > MAX_IDS:
+        raise BadRequest(f"At most {MAX_IDS} ids can be fetched at once.")
+    return ids
+
+
+def project(queryset, fields):
+    """Return ``queryset`` as dicts of ``fields``; ``id`` is always selected for cursors and lookups."""
+    return queryset.values(*dict.fromkeys(['id', *fields]))
+
+
+def strip(rows, fields):
+    if 'id' in fields:
+        return rows
+    for row in rows:
+        del row['id']
+    return rows
+
+
+def batch_data(ids, fields, rows):
+    rows = {row['id']: row for row in rows}
+    results = [rows[book_id] for book_id in ids if book_id in rows]
+    return {
+        'results': strip(results, fields),
+        'missing': [book_id for book_id in ids if book_id not in rows],
+    }
+
+
+def get_batch(ids, fields):
+    return batch_data(ids, fields, project(Book.objects.filter(pk__in=ids), fields))
+
+
+async def aget_batch(ids, fields):
+    return batch_data(ids, fields, [row async for row in project(Book.objects.filter(pk__in=ids), fields)])
+
+
+def page_window(request, fields):
+    limit = parse_limit(request)
+    after = parse_cursor(request.GET.get('after'))
+    return limit, project(get_keyset_window(Book.objects.all(), limit, after=after), fields)
+
+
+def page_data(request, fields, limit, rows):
+    data = {'results': rows[:limit], 'next': None}
+    if len(rows) > limit:
+        query = request.GET.copy()
+        query['after'] = rows[limit - 1]['id']
+        data['next'] = f"{reverse('api_list_books')}?{query.urlencode()}"
+    strip(data['results'], fields)
+    return data
+
+
+def get_page(request, fields):
+    limit, window = page_window(request, fields)
+    return page_data(request, fields, limit, list(window))
+
+
+async def aget_page(request, fields):
+    limit, window = page_window(request, fields)
+    return page_data(request, fields, limit, [row async for row in window])
+
+
+@require_safe
+@gzip_page
+def list_books(request):
+    """List books by primary key, ``?after=<id>&limit=<n>``, or fetch several with ``?ids=1,2,3``."""
+    try:
+        fields = parse_fields(request)
+        if 'ids' in request.GET:
+            return JsonResponse(get_batch(parse_ids(request.GET['ids']), fields))
+        return JsonResponse(get_page(request, fields))
+    except BadRequest as error:
+        return error_response(str(error))
+
+
+@require_safe
+@gzip_page
+def get_book(request, book_id):
+    try:
+        fields = parse_fields(request)
+    except BadRequest as error:
+        return error_response(str(error))
+    row = project(Book.objects.filter(pk=book_id), fields).first()
+    if row is None:
+        return error_response(f"Could not find book with primary key {book_id}", status=404)
+    return JsonResponse(strip([row], fields)[0])
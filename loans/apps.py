@@ -1,6 +1,22 @@
 from django.apps import AppConfig
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_migrate
+
+
+def install_search_index(using, **kwargs):
+    from django.db import connections
+    from loans.search import install_search_index
+    install_search_index(connections[using])
 
 
 class LoansConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'loans'
+
+    def ready(self):
+        from loans import signals  # noqa: F401
+        from loans.metrics import install_query_timing
+        from loans.replica import tune_connection
+        post_migrate.connect(install_search_index, sender=self)
+        connection_created.connect(tune_connection)
+        connection_created.connect(install_query_timing)
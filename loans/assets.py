@@ -0,0 +1,124 @@
+"""Fingerprinted, precompressed static files, served by the app itself.
+
+``collectstatic`` with ``CompressedManifestStaticFilesStorage`` stores every
+file a second time under a name that carries a hash of its content, and writes
+``.gz`` copies (and ``.br`` ones when the optional ``brotli`` package is
+installed) of the text formats next to both names.  Nothing is compressed per
+request: ``serve_asset`` picks the smallest copy the client accepts, and
+hashed names, which change whenever their content does, are cached for a year.
+"""
+import gzip
+import mimetypes
+import os
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage, staticfiles_storage
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse, Http404, HttpResponseNotModified
+from django.utils._os import safe_join
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.utils.http import http_date
+from django.views.decorators.http import require_safe
+from django.views.static import was_modified_since
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSED_EXTENSIONS = {'.css', '.js', '.map', '.svg', '.json', '.txt', '.html', '.xml'}
+# Preferred first.  A copy is only kept when it is clearly smaller.
+ENCODINGS = [('br', '.br'), ('gzip', '.gz')]
+MIN_SAVING = 0.05
+IMMUTABLE_MAX_AGE = 365 * 24 * 60 * 60
+
+
+def compressors():
+    yield 'gzip', '.gz', lambda data: gzip.compress(data, compresslevel=9, mtime=0)
+    if brotli is not None:
+        yield 'br', '.br', lambda data: brotli.compress(data, quality=11)
+
+
+def compress_file(path):
+    """Write the compressed copies of the file at ``path``; return the suffixes written."""
+    if os.path.splitext(path)[1] not in COMPRESSED_EXTENSIONS:
+        return []
+    with open(path, 'rb') as original:
+        data = original.read()
+    written = []
+    for encoding, suffix, compress in compressors():
+        compressed = compress(data)
+        if len(compressed) <= len(data) * (1 - MIN_SAVING):
+            with open(path + suffix, 'wb') as output:
+                output.write(compressed)
+            written.append(suffix)
+        elif os.path.exists(path + suffix):
+            os.remove(path + suffix)
+    return written
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run, **options)
+        if dry_run:
+            return
+        for name in paths:
+            for stored in {name, self.stored_name(name)}:
+                compress_file(self.path(stored))
+
+
+def accepted_encodings(header):
+    """Return the content codings ``header`` (an Accept-Encoding value) allows."""
+    accepted = set()
+    for item in header.split(','):
+        coding, _, params = item.strip().partition(';')
+        quality = 1.0
+        name, _, value = params.strip().partition('=')
+        if name.strip() == 'q':
+            try:
+                quality = float(value)
+            except ValueError:
+                quality = 0.0
+        if coding and quality > 0:
+            accepted.add(coding.strip().lower())
+    return accepted
+
+
+def is_hashed(path):
+    return path in getattr(staticfiles_storage, 'hashed_files', {}).values()
+
+
+@require_safe
+def serve_asset(request, path):
+    """Serve ``path`` from ``STATIC_ROOT``, as the best precompressed copy the client accepts."""
+    try:
+        fullpath = safe_join(settings.STATIC_ROOT, path)
+    except SuspiciousFileOperation:
+        raise Http404(f"{path} is not a static file")
+    # The compressed copies are only served in place of their originals.
+    if not os.path.isfile(fullpath) or fullpath.endswith(tuple(suffix for encoding, suffix in ENCODINGS)):
+        raise Http404(f"{path} is not a static file")
+
+    content_type = mimetypes.guess_type(fullpath)[0] or 'application/octet-stream'
+    accepted = accepted_encodings(request.headers.get('Accept-Encoding', ''))
+    chosen, content_encoding = fullpath, None
+    for encoding, suffix in ENCODINGS:
+        if encoding in accepted and os.path.isfile(fullpath + suffix):
+            chosen, content_encoding = fullpath + suffix, encoding
+            break
+
+    modified = os.stat(fullpath).st_mtime
+    if not was_modified_since(request.headers.get('If-Modified-Since'), modified):
+        response = HttpResponseNotModified()
+    else:
+        response = FileResponse(open(chosen, 'rb'), content_type=content_type, filename=os.path.basename(fullpath))
+        response['Last-Modified'] = http_date(modified)
+        if content_encoding is not None:
+            response['Content-Encoding'] = content_encoding
+    if os.path.splitext(fullpath)[1] in COMPRESSED_EXTENSIONS:
+        patch_vary_headers(response, ['Accept-Encoding'])
+    if is_hashed(path):
+        patch_cache_control(response, public=True, max_age=IMMUTABLE_MAX_AGE, immutable=True)
+    else:
+        patch_cache_control(response, public=True, no_cache=True)
+    return response
@@ -0,0 +1,103 @@
+"""Async versions of the catalog's read views, for the ASGI deployment.
+
+They return the same pages and JSON as their counterparts in ``loans.views``
+and ``loans.api`` but query through the async ORM, so under ASGI a request
+does not hold a worker thread while it waits on the database.
+``my_library.asgi_urls`` routes to them; the WSGI deployment keeps the sync
+views, which would otherwise each be run through ``async_to_sync``.
+"""
+from django.conf import settings
+from django.http import Http404, JsonResponse
+from django.shortcuts import render
+from django.views.decorators.gzip import gzip_page
+from django.views.decorators.http import require_safe
+
+from loans.api import BadRequest, aget_batch, aget_page, error_response, parse_fields, parse_ids, project, strip
+from loans.availability import aget_availability
+from loans.cache import cache_book_page, cache_list_page, render_rows
+from loans.conditional import awindow_validator, conditional_page, make_etag
+from loans.helpers import clean_isbn, is_valid_isbn, isbn_to_key
+from loans.models import Book
+from loans.pagination import CountedPaginator, aget_keyset_page, get_keyset_window, parse_cursor
+from loans.views import list_context_version
+
+async def book_list_validator(request):
+    book_list = Book.objects.all().order_by('id')
+    after = parse_cursor(request.GET.get("after"))
+    before = parse_cursor(request.GET.get("before"))
+    if after is not None or before is not None:
+        window = get_keyset_window(book_list, settings.ITEMS_PER_PAGE, after=after, before=before)
+        return await awindow_validator(window, 'keyset', *list_context_version())
+    paginator = CountedPaginator(book_list, settings.ITEMS_PER_PAGE)
+    page_object = await paginator.aget_page(request.GET.get("page"))
+    bottom = (page_object.number - 1) * settings.ITEMS_PER_PAGE
+    window = book_list[bottom:bottom + settings.ITEMS_PER_PAGE + 1]
+    return await awindow_validator(window, page_object.number, paginator.count, *list_context_version())
+
+@conditional_page(book_list_validator)
+@cache_list_page
+async def list_books(request):
+    book_list = Book.objects.all().order_by('id')
+    after = parse_cursor(request.GET.get("after"))
+    before = parse_cursor(request.GET.get("before"))
+    if after is not None or before is not None:
+        page_object = await aget_keyset_page(book_list, settings.ITEMS_PER_PAGE, after=after, before=before)
+    else:
+        paginator = CountedPaginator(book_list, settings.ITEMS_PER_PAGE)
+        page_object = await paginator.aget_page(request.GET.get("page"))
+    availability = await aget_availability([book.pk for book in page_object])
+    for book in page_object:
+        book.availability = availability[book.pk]
+    render_rows(page_object, '__book_row.html')
+    context = {'page_object': page_object}
+    return render(request, 'books.html', context)
+
+async def book_validator(request, book_id):
+    updated_at = await Book.objects.filter(pk=book_id).values_list('updated_at', flat=True).afirst()
+    if updated_at is None:
+        return None
+    return make_etag(book_id, updated_at), updated_at
+
+@conditional_page(book_validator)
+@cache_book_page
+async def get_book(request, book_id):
+    try:
+        context = {'book': await Book.objects.aget(pk=book_id)}
+    except Book.DoesNotExist:
+        raise Http404(f"Could not find book with primary key {book_id}")
+    else:
+        return render(request, 'get_book.html', context)
+
+async def get_book_by_isbn(request, isbn):
+    isbn = clean_isbn(isbn)
+    if not is_valid_isbn(isbn):
+        raise Http404(f"{isbn} is not a valid ISBN")
+    try:
+        context = {'book': await Book.objects.aget(isbn_key=isbn_to_key(isbn))}
+    except Book.DoesNotExist:
+        raise Http404(f"Could not find book with ISBN {isbn}")
+    else:
+        return render(request, 'get_book.html', context)
+
+@require_safe
+@gzip_page
+async def api_list_books(request):
+    try:
+        fields = parse_fields(request)
+        if 'ids' in request.GET:
+            return JsonResponse(await aget_batch(parse_ids(request.GET['ids']), fields))
+        return JsonResponse(await aget_page(request, fields))
+    except BadRequest as error:
+        return error_response(str(error))
+
+@require_safe
+@gzip_page
+async def api_get_book(request, book_id):
+    try:
+        fields = parse_fields(request)
+    except BadRequest as error:
+        return error_response(str(error))
+    row = await project(Book.objects.filter(pk=book_id), fields).afirst()
+    if row is None:
+        return error_response(f"Could not find book with primary key {book_id}", status=404)
+    return JsonResponse(strip([row], fields)[0])
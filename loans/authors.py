@@ -0,0 +1,62 @@
+"""Authors as rows, linked to the books whose ``authors`` text names them.
+
+``Book.authors`` stays the text that is edited, shown, searched and exported.
+Each name in it (see ``split_authors``) is an ``Author`` row, unique on its
+``author_sort_key``, and is linked to the book through ``Author.books``.
+Listing an author's books is then a lookup on the unique sort key followed by
+the link table's ``(author_id, book_id)`` index, instead of a ``LIKE`` scan of
+every book.
+
+``save()`` keeps the links in step through a signal; bulk writes call
+``link_authors`` with the rows they wrote.  Deleting a book deletes its links.
+Authors left without books are kept, so a later book by them reuses the row.
+"""
+from loans.helpers import author_sort_key, split_authors
+from loans.models import Author
+
+Link = Author.books.through
+
+# SQLite allows 999 bound parameters per statement.
+CHUNK_SIZE = 900
+BATCH_SIZE = 500
+
+
+def chunked(values):
+    for start in range(0, len(values), CHUNK_SIZE):
+        yield values[start:start + CHUNK_SIZE]
+
+
+def get_author_ids(names):
+    """Return ``{sort_key: author_id}`` for ``names``, a ``{sort_key: name}`` dict, creating missing authors."""
+    keys = list(names)
+    ids = {}
+    for chunk in chunked(keys):
+        ids.update(Author.objects.filter(sort_key__in=chunk).values_list('sort_key', 'id'))
+    missing = [key for key in keys if key not in ids]
+    if missing:
+        # Ignoring conflicts lets a concurrent writer create the same author.
+        Author.objects.bulk_create([Author(name=names[key], sort_key=key) for key in missing], batch_size=BATCH_SIZE, ignore_conflicts=True)
+        for chunk in chunked(missing):
+            ids.update(Author.objects.filter(sort_key__in=chunk).values_list('sort_key', 'id'))
+    return ids
+
+
+def unlink_books(book_ids):
+    """Delete the author links of ``book_ids``; bulk deletes do this before removing the books."""
+    for chunk in chunked(list(book_ids)):
+        Link.objects.filter(book_id__in=chunk).delete()
+
+
+def link_authors(books):
+    """Link each of ``books``, ``(book_id, authors)`` pairs, to exactly the authors its text names."""
+    books = list(books)
+    names = {}
+    links = {}
+    for book_id, authors in books:
+        for name in split_authors(authors):
+            key = author_sort_key(name)
+            names.setdefault(key, name)
+            links[(book_id, key)] = None
+    ids = get_author_ids(names)
+    unlink_books(book_id for book_id, authors in books)
+    Link.objects.bulk_create([Link(book_id=book_id, author_id=ids[key]) for book_id, key in links], batch_size=BATCH_SIZE)
@@ -0,0 +1,72 @@
+"""Batched availability queries over Loan intervals.
+
+A loan keeps its book from ``start_at`` to ``end_at``, both days included,
+unless it has been returned; an overdue loan keeps it until it is returned.
+Every function here answers for a whole set of books with one SQL statement,
+served by the ``(book, start_at, end_at)`` index, rather than one query per book.
+"""
+from collections import namedtuple
+import datetime
+
+from django.utils import timezone
+
+from loans.models import Loan
+
+Availability = namedtuple('Availability', ['available', 'free_from'])
+ONE_DAY = datetime.timedelta(days=1)
+
+
+def busy_book_ids(book_ids, start, end):
+    """Return the ids among ``book_ids`` with a loan overlapping ``start``..``end``."""
+    return set(
+        Loan.objects
+        .filter(book_id__in=book_ids, start_at__lte=end, end_at__gte=start, returned_at__isnull=True)
+        .values_list('book_id', flat=True)
+        .distinct()
+    )
+
+
+def available_between(book_ids, start, end):
+    """Map each of ``book_ids`` to whether it is free for the whole of ``start``..``end``."""
+    busy = busy_book_ids(book_ids, start, end)
+    return {book_id: book_id not in busy for book_id in book_ids}
+
+
+def loans_from(book_ids, on):
+    # Loans that ended before ``on`` but are still out are overdue, and keep
+    # their book until it comes back, so every unreturned loan is read.
+    return (
+        Loan.objects
+        .filter(book_id__in=book_ids, returned_at__isnull=True)
+        .order_by('book_id', 'start_at')
+        .values_list('book_id', 'start_at', 'end_at')
+    )
+
+
+def chain_loans(book_ids, loans, on):
+    free_from = {book_id: on for book_id in book_ids}
+    for book_id, start_at, end_at in loans:
+        if free_from[book_id] is None:
+            continue
+        if end_at < on:
+            free_from[book_id] = None
+        elif start_at <= free_from[book_id] <= end_at:
+            free_from[book_id] = end_at + ONE_DAY
+    return {book_id: Availability(day == on, day) for book_id, day in free_from.items()}
+
+
+def get_availability(book_ids, on=None):
+    """Map each of ``book_ids`` to an ``Availability`` as of the day ``on`` (default today).
+
+    ``free_from`` is the first day from ``on`` onwards that no loan covers, so
+    back-to-back loans are chained together.  It is None while the book is
+    out on an overdue loan, as nobody knows when it will be back.
+    """
+    on = on or timezone.localdate()
+    return chain_loans(book_ids, loans_from(book_ids, on), on)
+
+
+async def aget_availability(book_ids, on=None):
+    """``get_availability`` with the async ORM."""
+    on = on or timezone.localdate()
+    return chain_loans(book_ids, [loan async for loan in loans_from(book_ids, on)], on)
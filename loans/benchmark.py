@@ -0,0 +1,326 @@
+"""Latency and query-count benchmark of every named route, for ``manage.py bench``.
+
+Each route is requested through the test ``Client``: once untimed, to warm up
+and count its queries with the metrics ``QueryTimer``, and then ``repeat``
+more times to time it.  Reports are plain dicts, ready for JSON,
+keyed by scale and then by case label, so two runs can be compared case by case.
+
+``run_wsgi`` and ``run_asgi``, for ``manage.py bench_concurrency``, measure
+throughput instead: they send many requests at once straight to Django's WSGI
+and ASGI handlers, from a thread pool and from an event loop, without a
+server or network in between.  ``measure_compression``, for
+``manage.py bench_compression``, reports what the compression middleware does
+to a page: its size in each encoding and the CPU time spent compressing it.
+"""
+import asyncio
+import datetime
+import io
+import math
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.core.handlers.asgi import ASGIHandler
+from django.core.handlers.wsgi import WSGIHandler
+from django.db import connection
+from django.test import Client
+from django.urls import URLPattern, get_resolver, reverse
+from django.utils.http import urlencode
+
+from loans import compression
+from loans.helpers import split_authors
+from loans.loan_stats import count_member_loans
+from loans.metrics import QueryTimer
+from loans.models import Book, Loan, Member
+
+Case = namedtuple('Case', ['label', 'url', 'repeat'])
+Regression = namedtuple('Regression', ['scale', 'label', 'metric', 'baseline', 'current'])
+
+PERCENTILES = (50, 95, 99)
+COMPARED_METRICS = ('p50_ms', 'p95_ms')
+HISTORY_LOANS = 50
+
+# Extra query strings worth timing on their own; keys only, so labels stay
+# the same at every scale.
+QUERIES = {
+    'list_books': [
+        lambda samples: {},
+        lambda samples: {'page': samples['last_page']},
+        lambda samples: {'after': samples['book_id']},
+    ],
+    'search_books': [lambda samples: {'q': 'history'}],
+    'api_list_books': [
+        lambda samples: {},
+        lambda samples: {'ids': ','.join(map(str, samples['book_ids']))},
+    ],
+}
+# Routes that cost a full pass over the catalog get fewer timed runs.
+REPEATS = {'export_books': 3}
+
+
+def unhashed_storages():
+    """``STORAGES`` with plain static file names, so pages render without a collectstatic run."""
+    return {**settings.STORAGES, 'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'}}
+
+
+def named_patterns():
+    """Yield ``(name, pattern)`` for every named URL, leaving out included URLconfs like the admin."""
+    for pattern in get_resolver().url_patterns:
+        if isinstance(pattern, URLPattern) and pattern.name:
+            yield pattern.name, pattern
+
+
+def add_member_history(loans=HISTORY_LOANS):
+    """Give one member a loan history over the first books, so member pages have rows."""
+    member = Member.objects.create(first_name="Bench", last_name="Member", email="bench@example.org")
+    today = datetime.date.today()
+    Loan.objects.bulk_create([
+        Loan(
+            member=member,
+            book_id=book_id,
+            start_at=today - datetime.timedelta(days=2 * number + 14),
+            end_at=today - datetime.timedelta(days=2 * number),
+            returned_at=today - datetime.timedelta(days=2 * number) if number else None,
+        )
+        for number, book_id in enumerate(Book.objects.order_by('pk').values_list('pk', flat=True)[:loans])
+    ])
+    # bulk_create sends no post_save.
+    count_member_loans([member.pk])
+    return member
+
+
+def get_samples(per_page):
+    count = Book.objects.count()
+    middle = Book.objects.order_by('pk').values('pk', 'isbn', 'authors')[count // 2]
+    return {
+        'book_id': middle['pk'],
+        'isbn': middle['isbn'],
+        'name': next(iter(split_authors(middle['authors'])), middle['authors']),
+        'member_id': Member.objects.order_by('pk').values_list('pk', flat=True).first(),
+        'last_page': max(1, math.ceil(count / per_page)),
+        'book_ids': list(Book.objects.order_by('?').values_list('pk', flat=True)[:per_page]),
+    }
+
+
+def build_cases(samples, repeat, names=None):
+    """Return a case for every named route, or those in ``names``, plus the extra query strings in ``QUERIES``."""
+    cases = []
+    for name, pattern in named_patterns():
+        if names is not None and name not in names:
+            continue
+        kwargs = {key: samples[key] for key in pattern.pattern.converters}
+        path = reverse(name, kwargs=kwargs)
+        for make_query in QUERIES.get(name, [lambda samples: {}]):
+            query = make_query(samples)
+            label = f"{name}?{'&'.join(sorted(query))}" if query else name
+            url = f"{path}?{urlencode(query)}" if query else path
+            cases.append(Case(label, url, min(repeat, REPEATS.get(name, repeat))))
+    return cases
+
+
+def fetch(client, url):
+    response = client.get(url)
+    if response.streaming:
+        for chunk in response.streaming_content:
+            pass
+    return response
+
+
+def percentile(samples, percent):
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(samples)
+    return ordered[max(0, math.ceil(percent / 100 * len(ordered)) - 1)]
+
+
+def run_case(client, case):
+    queries = QueryTimer()
+    with connection.execute_wrapper(queries):
+        response = fetch(client, case.url)
+    timings = []
+    for number in range(case.repeat):
+        started = time.perf_counter()
+        fetch(client, case.url)
+        timings.append((time.perf_counter() - started) * 1000)
+    result = {
+        'url': case.url,
+        'status': response.status_code,
+        'queries': queries.queries,
+        'requests': len(timings),
+        'mean_ms': round(sum(timings) / len(timings), 3),
+    }
+    for percent in PERCENTILES:
+        result[f'p{percent}_ms'] = round(percentile(timings, percent), 3)
+    return result
+
+
+def run_cases(cases):
+    client = Client()
+    return {case.label: run_case(client, case) for case in cases}
+
+
+def compare(report, baseline, threshold, min_delta_ms):
+    """Return the regressions of ``report`` against ``baseline``.
+
+    A latency percentile regresses when it is more than ``threshold`` (a
+    fraction) and ``min_delta_ms`` slower; any extra query is a regression.
+    Cases missing from either side are ignored.
+    """
+    regressions = []
+    for scale, results in report['scales'].items():
+        previous = baseline.get('scales', {}).get(scale, {})
+        for label, result in results.items():
+            if label not in previous:
+                continue
+            old = previous[label]
+            if result['queries'] > old['queries']:
+                regressions.append(Regression(scale, label, 'queries', old['queries'], result['queries']))
+            for metric in COMPARED_METRICS:
+                if result[metric] > old[metric] * (1 + threshold) and result[metric] - old[metric] > min_delta_ms:
+                    regressions.append(Regression(scale, label, metric, old[metric], result[metric]))
+    return regressions
+
+
+def summarize(timings, statuses, seconds, concurrency):
+    result = {
+        'requests': len(timings),
+        'concurrency': concurrency,
+        'errors': sum(1 for status in statuses if status >= 400),
+        'rps': round(len(timings) / seconds, 1),
+    }
+    for percent in PERCENTILES[:2]:
+        result[f'p{percent}_ms'] = round(percentile(timings, percent), 3)
+    return result
+
+
+def wsgi_environ(url):
+    parts = urlsplit(url)
+    return {
+        'REQUEST_METHOD': 'GET',
+        'SCRIPT_NAME': '',
+        'PATH_INFO': parts.path,
+        'QUERY_STRING': parts.query,
+        'SERVER_NAME': 'localhost',
+        'SERVER_PORT': '80',
+        'SERVER_PROTOCOL': 'HTTP/1.1',
+        'HTTP_HOST': 'localhost',
+        'wsgi.input': io.BytesIO(),
+        'wsgi.errors': io.StringIO(),
+        'wsgi.url_scheme': 'http',
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': False,
+        'wsgi.run_once': False,
+    }
+
+
+def call_wsgi(handler, url):
+    statuses = []
+    started = time.perf_counter()
+    body = handler(wsgi_environ(url), lambda status, headers, exc_info=None: statuses.append(int(status[:3])))
+    try:
+        for chunk in body:
+            pass
+    finally:
+        if hasattr(body, 'close'):
+            body.close()
+    return (time.perf_counter() - started) * 1000, statuses[0]
+
+
+def run_wsgi(url, requests, concurrency):
+    """Send ``requests`` GETs for ``url`` to a ``WSGIHandler`` from ``concurrency`` threads."""
+    handler = WSGIHandler()
+    call_wsgi(handler, url)
+    with ThreadPoolExecutor(concurrency) as pool:
+        started = time.perf_counter()
+        results = list(pool.map(lambda number: call_wsgi(handler, url), range(requests)))
+        seconds = time.perf_counter() - started
+    timings, statuses = zip(*results)
+    return summarize(timings, statuses, seconds, concurrency)
+
+
+async def call_asgi(handler, url):
+    parts = urlsplit(url)
+    scope = {
+        'type': 'http',
+        'asgi': {'version': '3.0'},
+        'http_version': '1.1',
+        'method': 'GET',
+        'scheme': 'http',
+        'path': parts.path,
+        'raw_path': parts.path.encode(),
+        'query_string': parts.query.encode(),
+        'root_path': '',
+        'headers': [(b'host', b'localhost')],
+        'server': ('localhost', 80),
+        'client': ('127.0.0.1', 0),
+    }
+    finished = asyncio.Event()
+    statuses = []
+    requested = False
+
+    async def receive():
+        nonlocal requested
+        if not requested:
+            requested = True
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+        # Django listens for a disconnect while the view runs; the client
+        # stays connected until the whole response has been sent.
+        await finished.wait()
+        return {'type': 'http.disconnect'}
+
+    async def send(message):
+        if message['type'] == 'http.response.start':
+            statuses.append(message['status'])
+        elif not message.get('more_body', False):
+            finished.set()
+
+    started = time.perf_counter()
+    await handler(scope, receive, send)
+    finished.set()
+    return (time.perf_counter() - started) * 1000, statuses[0]
+
+
+async def drive_asgi(handler, url, requests, concurrency):
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def limited():
+        async with semaphore:
+            return await call_asgi(handler, url)
+
+    await call_asgi(handler, url)
+    started = time.perf_counter()
+    results = await asyncio.gather(*(limited() for number in range(requests)))
+    return results, time.perf_counter() - started
+
+
+def run_asgi(url, requests, concurrency):
+    """Send ``requests`` GETs for ``url`` to an ``ASGIHandler``, at most ``concurrency`` at a time."""
+    results, seconds = asyncio.run(drive_asgi(ASGIHandler(), url, requests, concurrency))
+    timings, statuses = zip(*results)
+    return summarize(timings, statuses, seconds, concurrency)
+
+
+def cpu_microseconds(function, repeat):
+    started = time.process_time()
+    for number in range(repeat):
+        function()
+    return round((time.process_time() - started) / repeat * 1e6, 1)
+
+
+def measure_compression(client, url, repeat):
+    """Return the uncompressed size of ``url`` and, per encoding, its compressed size and CPU cost."""
+    response = client.get(url)
+    body = b''.join(response.streaming_content) if response.streaming else response.content
+    result = {'url': url, 'status': response.status_code, 'identity_bytes': len(body), 'encodings': {}}
+    encoders = {'gzip': lambda: compression.compress_bytes(body, 'gzip')}
+    if compression.brotli is not None:
+        encoders['br'] = lambda: compression.compress_bytes(body, 'br')
+    for name, encode in encoders.items():
+        size = len(encode())
+        result['encodings'][name] = {
+            'bytes': size,
+            'ratio': round(size / len(body), 3) if body else None,
+            'cpu_us': cpu_microseconds(encode, repeat),
+        }
+    return result
@@ -0,0 +1,259 @@
+"""Response cache for the read-mostly catalog pages.
+
+Rendered pages are stored in the ``CATALOG_CACHE_ALIAS`` cache.  List pages are
+stamped with the catalog's list version, which every write bumps, so one
+increment retires every cached list page without having to find them.  Detail
+pages are keyed by book and dropped individually when that book changes, as
+are the book's rendered rows, which list pages reuse when they re-render.
+
+With ``CATALOG_CACHE_STALE_TIMEOUT`` set, an expired or outdated page is kept
+for that many extra seconds.  The first request to see it takes a lock and
+re-renders; everyone else is served the stale copy in the meantime, so a write
+never sends every reader to the database at once.
+"""
+from functools import wraps
+import hashlib
+import time
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.contrib import messages
+from django.core.cache import caches
+from django.http import HttpResponse
+from django.template.loader import get_template
+from django.utils import timezone
+from django.utils.safestring import mark_safe
+
+LIST_VERSION_KEY = 'catalog:books:version'
+LOANS_VERSION_KEY = 'catalog:loans:version'
+LOCK_TIMEOUT = 30
+
+
+def get_cache():
+    return caches[settings.CATALOG_CACHE_ALIAS]
+
+
+def has_pending_messages(request):
+    # len() loads the messages without marking them as shown.
+    return bool(len(messages.get_messages(request)))
+
+
+def is_cacheable(request):
+    # Pages carrying flash messages are one-off, so they are neither served
+    # from nor written to the cache.
+    return (
+        settings.CATALOG_CACHE_ENABLED
+        and request.method in ('GET', 'HEAD')
+        and not has_pending_messages(request)
+    )
+
+
+def get_version(key):
+    cache = get_cache()
+    version = cache.get(key)
+    if version is None:
+        # Start from the clock rather than 1, so entries written before the
+        # counter was evicted can never match again.
+        cache.add(key, time.time_ns(), None)
+        version = cache.get(key)
+    return version
+
+
+def bump_version(key):
+    cache = get_cache()
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, time.time_ns(), None)
+
+
+def get_list_version():
+    return get_version(LIST_VERSION_KEY)
+
+
+def bump_list_version():
+    bump_version(LIST_VERSION_KEY)
+
+
+def get_loans_version():
+    return get_version(LOANS_VERSION_KEY)
+
+
+def bump_loans_version():
+    """Record a loan write: list pages show availability, so they are retired too."""
+    bump_version(LOANS_VERSION_KEY)
+    bump_list_version()
+
+
+def book_key(book_id):
+    return f'catalog:book:{book_id}'
+
+
+def row_key(book_id):
+    return f'catalog:row:{book_id}'
+
+
+def list_key(request):
+    digest = hashlib.md5(request.GET.urlencode().encode()).hexdigest()
+    return f'catalog:books:{digest}'
+
+
+def invalidate_book(book_id, deleted=False):
+    """Drop the cached detail page and list row of one book and retire every list page."""
+    cache = get_cache()
+    cache.delete(row_key(book_id))
+    key = book_key(book_id)
+    entry = cache.get(key) if settings.CATALOG_CACHE_STALE_TIMEOUT and not deleted else None
+    if entry is None:
+        cache.delete(key)
+    else:
+        entry['expires'] = 0
+        cache.set(key, entry, settings.CATALOG_CACHE_STALE_TIMEOUT)
+    bump_list_version()
+
+
+def invalidate_books(book_ids):
+    """Drop the cached detail pages and list rows of many books at once, for bulk writes."""
+    get_cache().delete_many([key for book_id in book_ids for key in (book_key(book_id), row_key(book_id))])
+    bump_list_version()
+
+
+def render_rows(books, template_name):
+    """Set ``book.row`` to ``template_name`` rendered for each of ``books``.
+
+    Rows are cached per book for ``CATALOG_ROW_TIMEOUT``, stamped with the
+    book's ``updated_at`` and its ``availability``, and fetched in one
+    ``get_many``.  A list page that is re-rendered because another book or a
+    loan changed therefore only renders the rows that actually differ.
+    """
+    template = get_template(template_name)
+    if not settings.CATALOG_CACHE_ENABLED:
+        for book in books:
+            book.row = template.render({'book': book})
+        return books
+    cache = get_cache()
+    entries = cache.get_many([row_key(book.pk) for book in books])
+    rendered = {}
+    for book in books:
+        key = row_key(book.pk)
+        version = (book.updated_at, book.availability)
+        entry = entries.get(key)
+        if entry is not None and entry['version'] == version:
+            book.row = mark_safe(entry['content'])
+        else:
+            book.row = template.render({'book': book})
+            rendered[key] = {'content': str(book.row), 'version': version}
+    if rendered:
+        cache.set_many(rendered, settings.CATALOG_ROW_TIMEOUT)
+    return books
+
+
+def build_response(entry, status):
+    response = HttpResponse(entry['content'], content_type=entry['content_type'])
+    response['X-Cache'] = status
+    return response
+
+
+def find_entry(key, version):
+    """Return ``(response, locked)`` for a lookup of ``key``.
+
+    ``response`` is the cached page to serve, or None when the caller has to
+    render it; ``locked`` says whether the caller then holds the re-render lock.
+    """
+    cache = get_cache()
+    entry = cache.get(key)
+    if entry is None:
+        return None, False
+    if entry['version'] == version and time.time() < entry['expires']:
+        return build_response(entry, 'HIT'), False
+    if not settings.CATALOG_CACHE_STALE_TIMEOUT:
+        return None, False
+    if not cache.add(f'{key}:lock', 1, LOCK_TIMEOUT):
+        return build_response(entry, 'STALE'), False
+    return None, True
+
+
+def store_response(key, response, version):
+    if response.status_code == 200 and not response.streaming and not response.cookies:
+        entry = {
+            'content': response.content,
+            'content_type': response['Content-Type'],
+            'version': version,
+            'expires': time.time() + settings.CATALOG_CACHE_TIMEOUT,
+        }
+        get_cache().set(key, entry, settings.CATALOG_CACHE_TIMEOUT + settings.CATALOG_CACHE_STALE_TIMEOUT)
+        response['X-Cache'] = 'MISS'
+    return response
+
+
+def cached_response(request, key, render_response, version=None):
+    """Return the cached page under ``key``, calling ``render_response`` to build it when needed.
+
+    ``version`` is compared with the version an entry was rendered from; a
+    mismatch is treated like an expired entry.
+    """
+    if not is_cacheable(request):
+        return render_response()
+    response, locked = find_entry(key, version)
+    if response is not None:
+        return response
+    try:
+        return store_response(key, render_response(), version)
+    finally:
+        if locked:
+            get_cache().delete(f'{key}:lock')
+
+
+async def acached_response(request, key, render_response, version=None):
+    """``cached_response`` for an async ``render_response``.
+
+    The catalog cache is local memory or files, so it is called directly
+    rather than through a thread.
+    """
+    if not is_cacheable(request):
+        return await render_response()
+    response, locked = find_entry(key, version)
+    if response is not None:
+        return response
+    try:
+        return store_response(key, await render_response(), version)
+    finally:
+        if locked:
+            get_cache().delete(f'{key}:lock')
+
+
+def cache_book_page(view):
+    """Cache a view that takes ``book_id`` under that book's detail key."""
+    if iscoroutinefunction(view):
+        @wraps(view)
+        async def async_wrapper(request, book_id, *args, **kwargs):
+            return await acached_response(request, book_key(book_id), lambda: view(request, book_id, *args, **kwargs))
+        return async_wrapper
+
+    @wraps(view)
+    def wrapper(request, book_id, *args, **kwargs):
+        return cached_response(request, book_key(book_id), lambda: view(request, book_id, *args, **kwargs))
+    return wrapper
+
+
+def list_page_version():
+    # List pages show availability, which also changes with the date.
+    return get_list_version(), timezone.localdate()
+
+
+def cache_list_page(view):
+    """Cache a list view per query string, stamped with the current list version and date."""
+    if iscoroutinefunction(view):
+        @wraps(view)
+        async def async_wrapper(request, *args, **kwargs):
+            if not is_cacheable(request):
+                return await view(request, *args, **kwargs)
+            return await acached_response(request, list_key(request), lambda: view(request, *args, **kwargs), version=list_page_version())
+        return async_wrapper
+
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if not is_cacheable(request):
+            return view(request, *args, **kwargs)
+        return cached_response(request, list_key(request), lambda: view(request, *args, **kwargs), version=list_page_version())
+    return wrapper
@@ -0,0 +1,170 @@
+"""Compression of dynamic responses, with gzip or, when installed, brotli.
+
+``CompressionMiddleware`` compresses responses of an allowed content type
+that are at least ``COMPRESSION_MIN_SIZE`` bytes, streaming ones included, in
+the best encoding the client accepts.  Responses that already carry a
+Content-Encoding (the CSV export, ``gzip_page`` views, precompressed static
+files) are left alone.
+
+Like Django's ``GZipMiddleware``, the gzip header carries a random-length
+file name, to make the compressed length less useful for BREACH; the gzip
+framing is therefore written here around a raw deflate stream.
+"""
+import secrets
+import struct
+import zlib
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.http import FileResponse
+from django.utils.cache import patch_vary_headers
+
+from loans.assets import accepted_encodings
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# FTEXT clear, FNAME set; no modification time; OS unknown.
+GZIP_HEADER = b'\x1f\x8b\x08\x08\x00\x00\x00\x00\x00\xff'
+MAX_RANDOM_BYTES = 100
+
+
+class GzipEncoder:
+    def __init__(self, level):
+        self.compressor = zlib.compressobj(level, zlib.DEFLATED, -zlib.MAX_WBITS)
+        self.crc = 0
+        self.size = 0
+
+    def start(self):
+        name = secrets.token_hex(secrets.randbelow(MAX_RANDOM_BYTES // 2 + 1)).encode()
+        return GZIP_HEADER + name + b'\x00'
+
+    def compress(self, data):
+        self.crc = zlib.crc32(data, self.crc)
+        self.size += len(data)
+        return self.compressor.compress(data)
+
+    def flush(self):
+        return self.compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self):
+        return self.compressor.flush() + struct.pack('<LL', self.crc, self.size & 0xffffffff)
+
+
+class BrotliEncoder:
+    def __init__(self, quality):
+        self.compressor = brotli.Compressor(quality=quality)
+
+    def start(self):
+        return b''
+
+    def compress(self, data):
+        return self.compressor.process(data)
+
+    def flush(self):
+        return self.compressor.flush()
+
+    def finish(self):
+        return self.compressor.finish()
+
+
+def get_encoder(encoding):
+    if encoding == 'br':
+        return BrotliEncoder(settings.COMPRESSION_BROTLI_QUALITY)
+    return GzipEncoder(settings.COMPRESSION_GZIP_LEVEL)
+
+
+def compress_bytes(data, encoding):
+    encoder = get_encoder(encoding)
+    return encoder.start() + encoder.compress(data) + encoder.finish()
+
+
+def compress_chunks(chunks, encoding):
+    encoder = get_encoder(encoding)
+    yield encoder.start()
+    for chunk in chunks:
+        if chunk:
+            yield encoder.compress(chunk) + encoder.flush()
+    yield encoder.finish()
+
+
+async def acompress_chunks(chunks, encoding):
+    encoder = get_encoder(encoding)
+    yield encoder.start()
+    async for chunk in chunks:
+        if chunk:
+            yield encoder.compress(chunk) + encoder.flush()
+    yield encoder.finish()
+
+
+def choose_encoding(request):
+    accepted = accepted_encodings(request.headers.get('Accept-Encoding', ''))
+    if brotli is not None and 'br' in accepted:
+        return 'br'
+    if 'gzip' in accepted:
+        return 'gzip'
+    return None
+
+
+def is_compressible(response):
+    content_type = response.get('Content-Type', '').partition(';')[0].strip().lower()
+    if (
+        response.has_header('Content-Encoding')
+        # Static files are compressed once, by collectstatic.
+        or isinstance(response, FileResponse)
+        or content_type not in settings.COMPRESSION_CONTENT_TYPES
+        or 'no-transform' in response.get('Cache-Control', '')
+    ):
+        return False
+    if response.streaming:
+        return int(response.get('Content-Length', settings.COMPRESSION_MIN_SIZE)) >= settings.COMPRESSION_MIN_SIZE
+    return len(response.content) >= settings.COMPRESSION_MIN_SIZE
+
+
+def compress_response(request, response):
+    if not is_compressible(response):
+        return response
+    patch_vary_headers(response, ('Accept-Encoding',))
+    encoding = choose_encoding(request)
+    if encoding is None:
+        return response
+
+    if response.streaming:
+        if response.is_async:
+            response.streaming_content = acompress_chunks(response.streaming_content, encoding)
+        else:
+            response.streaming_content = compress_chunks(response.streaming_content, encoding)
+        del response.headers['Content-Length']
+    else:
+        compressed = compress_bytes(response.content, encoding)
+        if len(compressed) >= len(response.content):
+            return response
+        response.content = compressed
+        response.headers['Content-Length'] = str(len(compressed))
+
+    # The body is no longer byte-for-byte what a strong ETag promised.
+    etag = response.get('ETag')
+    if etag and etag.startswith('"'):
+        response.headers['ETag'] = 'W/' + etag
+    response.headers['Content-Encoding'] = encoding
+    return response
+
+
+class CompressionMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return compress_response(request, self.get_response(request))
+
+    async def __acall__(self, request):
+        return compress_response(request, await self.get_response(request))
@@ -0,0 +1,111 @@
+"""Conditional GET support (ETag, Last-Modified and 304 responses) for catalog pages.
+
+Django's ``condition`` decorator asks for the ETag and the last-modified time
+through two separate callbacks, which would cost two queries.  Here a single
+validator function returns both, so a browser revalidating an unchanged page
+costs one small query and gets an empty 304 back.
+"""
+from functools import wraps
+import hashlib
+
+from asgiref.sync import iscoroutinefunction
+from django.db.models import Count, Max, Min
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+
+from loans.cache import has_pending_messages
+
+
+def make_etag(*parts):
+    return quote_etag(hashlib.md5(':'.join(str(part) for part in parts).encode()).hexdigest())
+
+
+def window_stats(window):
+    return window.model.objects.filter(pk__in=window.values('pk')), {
+        'last_modified': Max('updated_at'),
+        'rows': Count('pk'),
+        'first': Min('pk'),
+        'last': Max('pk'),
+    }
+
+
+def window_etag(stats, extra):
+    return make_etag(stats['rows'], stats['first'], stats['last'], stats['last_modified'], *extra), stats['last_modified']
+
+
+def window_validator(window, *extra):
+    """Return ``(etag, last_modified)`` for the rows in ``window`` with one aggregate query.
+
+    ``window`` is a sliced queryset of the rows a page shows plus the one past
+    it, so edits, deletions and insertions that change the page or its Next
+    link all change the ETag.
+    """
+    queryset, aggregates = window_stats(window)
+    return window_etag(queryset.aggregate(**aggregates), extra)
+
+
+async def awindow_validator(window, *extra):
+    queryset, aggregates = window_stats(window)
+    return window_etag(await queryset.aaggregate(**aggregates), extra)
+
+
+def skips_validation(request):
+    # A 304 would swallow pending flash messages, so those requests always
+    # get a full page.
+    return request.method not in ('GET', 'HEAD') or has_pending_messages(request)
+
+
+def not_modified(request, validators):
+    etag, last_modified = validators
+    timestamp = int(last_modified.timestamp()) if last_modified else None
+    return get_conditional_response(request, etag=etag, last_modified=timestamp)
+
+
+def add_validators(response, validators):
+    etag, last_modified = validators
+    # A stale cached copy must not be labelled with the current validators.
+    if response.status_code in (200, 304) and response.get('X-Cache') != 'STALE':
+        response.headers.setdefault('ETag', etag)
+        if last_modified is not None:
+            response.headers.setdefault('Last-Modified', http_date(int(last_modified.timestamp())))
+        patch_cache_control(response, no_cache=True)
+    return response
+
+
+def conditional_page(validator):
+    """Answer GET and HEAD requests with 304 when ``validator`` says the page is unchanged.
+
+    ``validator`` takes the view's arguments and returns ``(etag, last_modified)``,
+    or None when there is nothing to validate (the view then runs as usual).
+    Async views take an async validator.  Responses are marked ``no-cache`` so
+    browsers revalidate instead of guessing a freshness lifetime from
+    Last-Modified.
+    """
+    def decorator(view):
+        if iscoroutinefunction(view):
+            @wraps(view)
+            async def async_wrapper(request, *args, **kwargs):
+                if skips_validation(request):
+                    return await view(request, *args, **kwargs)
+                validators = await validator(request, *args, **kwargs)
+                if validators is None:
+                    return await view(request, *args, **kwargs)
+                response = not_modified(request, validators)
+                if response is None:
+                    response = await view(request, *args, **kwargs)
+                return add_validators(response, validators)
+            return async_wrapper
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if skips_validation(request):
+                return view(request, *args, **kwargs)
+            validators = validator(request, *args, **kwargs)
+            if validators is None:
+                return view(request, *args, **kwargs)
+            response = not_modified(request, validators)
+            if response is None:
+                response = view(request, *args, **kwargs)
+            return add_validators(response, validators)
+        return wrapper
+    return decorator
@@ -0,0 +1,52 @@
+"""Exact row counts for the loans tables without ``SELECT COUNT(*)``.
+
+SQLite has no stored row count, so counting a table means walking the whole
+index.  Instead each tracked model has a ``RowCount`` row that save/delete
+signals move by one, and bulk paths adjust by the number of rows they wrote.
+The update runs inside the writer's transaction, so a rollback undoes it too.
+"""
+from asgiref.sync import sync_to_async
+from django.db.models import F
+
+from loans.models import Book, Loan, Member, RowCount
+
+TRACKED_MODELS = [Book, Member, Loan]
+
+
+def recount(model):
+    """Count ``model``'s table from scratch and store the result; returns ``(old, new)``."""
+    label = model._meta.label
+    old = RowCount.objects.filter(pk=label).values_list('rows', flat=True).first()
+    new = model._default_manager.count()
+    RowCount.objects.update_or_create(pk=label, defaults={'rows': new})
+    return old, new
+
+
+def adjust_row_count(model, delta):
+    if not delta:
+        return
+    updated = RowCount.objects.filter(pk=model._meta.label).update(rows=F('rows') + delta)
+    if not updated:
+        # No counter yet: the table already holds the rows that were just
+        # written, so a full count initialises it correctly.
+        recount(model)
+
+
+def get_row_count(model):
+    """Return the stored row count of ``model``, or None if it is not tracked."""
+    if model not in TRACKED_MODELS:
+        return None
+    rows = RowCount.objects.filter(pk=model._meta.label).values_list('rows', flat=True).first()
+    if rows is None:
+        rows = recount(model)[1]
+    return rows
+
+
+async def aget_row_count(model):
+    """``get_row_count`` for async code."""
+    if model not in TRACKED_MODELS:
+        return None
+    rows = await RowCount.objects.filter(pk=model._meta.label).values_list('rows', flat=True).afirst()
+    if rows is None:
+        rows = (await sync_to_async(recount)(model))[1]
+    return rows
@@ -0,0 +1,82 @@
+"""Constant-memory export of the book catalog as CSV or NDJSON.
+
+Rows are read with ``values_list(...).iterator()``, so no model instances are
+built and only one chunk of rows is in memory at a time, and they are encoded
+into roughly ``BUFFER_SIZE`` byte pieces for whoever is consuming the stream:
+an HTTP response or a file.
+"""
+import csv
+import json
+import zlib
+
+from loans.models import Book
+
+EXPORT_FIELDS = ['id', 'authors', 'title', 'publication_date', 'isbn']
+CONTENT_TYPES = {
+    'csv': 'text/csv',
+    'ndjson': 'application/x-ndjson',
+}
+CHUNK_SIZE = 2000
+BUFFER_SIZE = 64 * 1024
+
+
+class LineBuffer:
+    """A write-only file for ``csv.writer`` that hands back what was written."""
+
+    def write(self, value):
+        return value
+
+
+def iter_rows(chunk_size=CHUNK_SIZE):
+    return Book.objects.order_by('pk').values_list(*EXPORT_FIELDS).iterator(chunk_size=chunk_size)
+
+
+def csv_lines(rows):
+    writer = csv.writer(LineBuffer())
+    yield writer.writerow(EXPORT_FIELDS)
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def ndjson_lines(rows):
+    for row in rows:
+        record = dict(zip(EXPORT_FIELDS, row))
+        record['publication_date'] = record['publication_date'].isoformat()
+        yield json.dumps(record) + '\n'
+
+
+ENCODERS = {
+    'csv': csv_lines,
+    'ndjson': ndjson_lines,
+}
+
+
+def buffered(lines, size=BUFFER_SIZE):
+    """Join lines into UTF-8 chunks of about ``size`` bytes, so each write or yield carries many rows."""
+    buffer = []
+    length = 0
+    for line in lines:
+        buffer.append(line)
+        length += len(line)
+        if length >= size:
+            yield ''.join(buffer).encode()
+            buffer = []
+            length = 0
+    if buffer:
+        yield ''.join(buffer).encode()
+
+
+def gzipped(chunks, level=6):
+    """Compress a stream of byte chunks into a single gzip member as it goes."""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def stream_catalog(file_format='csv', compress=False, chunk_size=CHUNK_SIZE):
+    """Return an iterator over the encoded catalog in ``file_format``, gzipped if ``compress``."""
+    chunks = buffered(ENCODERS[file_format](iter_rows(chunk_size)))
+    return gzipped(chunks) if compress else chunks
@@ -1,7 +1,109 @@
 from django import forms
+from django.core.exceptions import ValidationError
+from django.db.models import F
+from django.utils import timezone
+from loans.authors import link_authors
+from loans.bulk import MAX_SELECTION, UPDATE_FIELDS
+from loans.cache import invalidate_book
+from loans.helpers import clean_isbn, is_valid_isbn, isbn_to_key
 from loans.models import Book
+from loans.rollups import adjust_rollups
+
+def validate_isbn_check_digit(isbn):
+    if not is_valid_isbn(isbn):
+        raise ValidationError("Enter a valid ISBN-10 or ISBN-13 with a correct check digit.", code='invalid_isbn')
 
 class BookForm(forms.ModelForm):
     class Meta:
         model = Book
-        fields = ['authors', 'title', 'publication_date', 'isbn']
\ No newline at end of file
+        fields = ['authors', 'title', 'publication_date', 'isbn']
+
+    def clean_isbn(self):
+        isbn = clean_isbn(self.cleaned_data['isbn'])
+        validate_isbn_check_digit(isbn)
+        if self.instance.pk is not None and isbn_to_key(isbn) == self.instance.isbn_key:
+            return isbn
+        duplicates = Book.objects.filter(isbn_key=isbn_to_key(isbn)).exclude(pk=self.instance.pk)
+        if duplicates.exists():
+            raise ValidationError("A book with this ISBN already exists.")
+        return isbn
+
+class BookUpdateForm(BookForm):
+    """Edits a book with one conditional UPDATE of the fields that changed.
+
+    The hidden ``version`` is the one the editor started from; if the book has
+    been written since, ``save_changes`` changes nothing and returns False.
+    """
+    version = forms.IntegerField(widget=forms.HiddenInput, required=False)
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fields['version'].initial = self.instance.version
+
+    def save_changes(self):
+        """Write the changed fields; return False if someone else saved the book first."""
+        version = self.cleaned_data.get('version')
+        if version is None:
+            version = self.instance.version
+        changes = {name: self.cleaned_data[name] for name in self.changed_data if name in self._meta.fields}
+        if not changes:
+            # The book already reads as the editor wants it.
+            return True
+        if 'isbn' in changes:
+            changes['isbn_key'] = isbn_to_key(changes['isbn'])
+        changes['updated_at'] = timezone.now()
+        updated = Book.objects.filter(pk=self.instance.pk, version=version).update(version=F('version') + 1, **changes)
+        if not updated:
+            return False
+        # A queryset update sends no post_save, so the cached pages are dropped,
+        # the rollups moved and the authors relinked here.  The instance already holds the new
+        # values; the initial ones are those the version check confirmed.
+        invalidate_book(self.instance.pk)
+        if 'authors' in changes or 'publication_date' in changes:
+            adjust_rollups(
+                added=[(self.cleaned_data['authors'], self.cleaned_data['publication_date'], self.instance.created_at)],
+                removed=[(self.initial['authors'], self.initial['publication_date'], self.instance.created_at)],
+            )
+        if 'authors' in changes:
+            link_authors([(self.instance.pk, changes['authors'])])
+        for name, value in changes.items():
+            setattr(self.instance, name, value)
+        self.instance.version = version + 1
+        return True
+
+class BookSelectionField(forms.Field):
+    """The ids of the books ticked on the list page, without duplicates."""
+    widget = forms.MultipleHiddenInput
+    default_error_messages = {
+        'required': "Select at least one book.",
+        'invalid': "The selection must be a list of book ids.",
+        'too_many': "At most %(limit)s books can be changed at once.",
+    }
+
+    def to_python(self, value):
+        if not value:
+            return []
+        try:
+            ids = list(dict.fromkeys(int(book_id) for book_id in value))
+        except (TypeError, ValueError):
+            raise ValidationError(self.error_messages['invalid'], code='invalid')
+        if len(ids) > MAX_SELECTION:
+            raise ValidationError(self.error_messages['too_many'], code='too_many', params={'limit': MAX_SELECTION})
+        return ids
+
+class BookSelectionForm(forms.Form):
+    ids = BookSelectionField()
+
+class BulkUpdateForm(BookSelectionForm):
+    field = forms.ChoiceField(choices=[(name, Book._meta.get_field(name).verbose_name.capitalize()) for name in UPDATE_FIELDS])
+    value = forms.CharField(max_length=255)
+
+    def clean(self):
+        cleaned_data = super().clean()
+        if 'field' in cleaned_data and 'value' in cleaned_data:
+            # The model field's own validation, as the single-book form applies it.
+            try:
+                cleaned_data['value'] = Book._meta.get_field(cleaned_data['field']).clean(cleaned_data['value'], None)
+            except ValidationError as error:
+                self.add_error('value', error)
+        return cleaned_data
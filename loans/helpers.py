@@ -1,14 +1,239 @@
+from itertools import compress
 import math
+import re
+import threading
+import unicodedata
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+# Witnesses that make Miller-Rabin exact below MILLER_RABIN_EXACT_LIMIT, which
+# covers every 64-bit integer.  The limit is the smallest strong pseudoprime to
+# all of them; from there on the extra witnesses are tried too, and the test is
+# a strong probable-prime test rather than a proof.
+MILLER_RABIN_BASES = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37, 41)
+MILLER_RABIN_EXACT_LIMIT = 3317044064679887385961981
+MILLER_RABIN_EXTRA_BASES = (43, 47, 53, 59, 61, 67, 71, 73, 79, 83, 89, 97)
+# Witnesses that are enough below 4,759,123,141, for the vectorized path.
+MILLER_RABIN_BASES_32 = (2, 7, 61)
+# Separates the authors of one book; "Last, First" keeps its comma.
+AUTHOR_SEPARATOR = re.compile(r'\s*(?:;|&|\band\b)\s*', re.IGNORECASE)
+NON_ALPHANUMERIC = re.compile(r'[\W_]+')
+# is_prime_many answers values below this from a cached sieve.
+SIEVE_CACHE_LIMIT = 1 << 24
+SEGMENT_SIZE = 1 << 18
+
+sieve_lock = threading.RLock()
+sieve_flags = bytearray(b'\x00\x00\x01\x01')
 
 def is_prime(number):
+    """Return whether ``number`` is prime.
+
+    Exact below ``MILLER_RABIN_EXACT_LIMIT`` (about 3.3e24); above it a
+    composite passes only if it is a strong pseudoprime to 25 prime bases.
+    """
     if not isinstance(number, int):
         raise ValueError("Input must be an integer.")
 
     if number <= 1:
         return False
 
-    for i in range(2, int(math.sqrt(number)) + 1):
-        if number % i == 0:
+    for prime in MILLER_RABIN_BASES:
+        if number % prime == 0:
+            return number == prime
+
+    if number >= MILLER_RABIN_EXACT_LIMIT:
+        return miller_rabin(number, MILLER_RABIN_BASES + MILLER_RABIN_EXTRA_BASES)
+    return miller_rabin(number)
+
+def miller_rabin(number, bases=MILLER_RABIN_BASES):
+    """Miller-Rabin for an odd ``number`` with no factor among ``MILLER_RABIN_BASES``."""
+    d = number - 1
+    shifts = (d & -d).bit_length() - 1
+    d >>= shifts
+    for base in bases:
+        x = pow(base, d, number)
+        if x == 1 or x == number - 1:
+            continue
+        for _ in range(shifts - 1):
+            x = x * x % number
+            if x == number - 1:
+                break
+        else:
             return False
+    return True
+
+def sieve_segment(start, end, base_primes):
+    """Return primality flags for ``start``..``end - 1``, crossing off multiples of ``base_primes``."""
+    flags = bytearray(b'\x01') * (end - start)
+    for prime in base_primes:
+        if prime * prime >= end:
+            break
+        first = max(prime * prime, -(-start // prime) * prime)
+        flags[first - start::prime] = bytes(len(range(first - start, end - start, prime)))
+    for number in range(start, min(end, 2)):
+        flags[number - start] = 0
+    return flags
+
+def prime_flags(limit):
+    """Return the cached sieve, grown segment by segment to cover at least ``0..limit``."""
+    global sieve_flags
+    flags = sieve_flags
+    if limit < len(flags):
+        return flags
+    with sieve_lock:
+        flags = sieve_flags
+        if limit >= len(flags):
+            end = max(limit + 1, 2 * len(flags))
+            base = prime_flags(math.isqrt(end))
+            base_primes = list(compress(range(len(base)), base))
+            flags = flags + sieve_segment(len(flags), end, base_primes)
+            sieve_flags = flags
+    return flags
+
+def primes_up_to(limit):
+    """Return every prime up to and including ``limit``, in order.
+
+    Up to ``SIEVE_CACHE_LIMIT`` this reads the cached sieve; beyond it the rest
+    is sieved in ``SEGMENT_SIZE`` pieces that are not kept.
+    """
+    if limit < 2:
+        return []
+    flags = prime_flags(min(limit, SIEVE_CACHE_LIMIT))
+    primes = list(compress(range(min(limit, SIEVE_CACHE_LIMIT) + 1), flags))
+    if limit > SIEVE_CACHE_LIMIT:
+        base_primes = primes_up_to(math.isqrt(limit))
+        for start in range(SIEVE_CACHE_LIMIT + 1, limit + 1, SEGMENT_SIZE):
+            end = min(start + SEGMENT_SIZE, limit + 1)
+            primes.extend(compress(range(start, end), sieve_segment(start, end, base_primes)))
+    return primes
+
+def is_prime_many(numbers):
+    """Return whether each of ``numbers`` is prime.
+
+    A NumPy integer array gets a NumPy boolean array back, computed with
+    vectorized operations; any other iterable gets a list.  Values below
+    ``SIEVE_CACHE_LIMIT`` are looked up in the cached sieve.
+    """
+    if numpy is not None and isinstance(numbers, numpy.ndarray):
+        return is_prime_array(numbers)
+    numbers = list(numbers)
+    for number in numbers:
+        if not isinstance(number, int):
+            raise ValueError("Input must be an integer.")
+    small = [number for number in numbers if number < SIEVE_CACHE_LIMIT]
+    flags = prime_flags(max(small)) if small else sieve_flags
+    return [
+        number > 1 and bool(flags[number]) if number < SIEVE_CACHE_LIMIT else is_prime(number)
+        for number in numbers
+    ]
+
+def is_prime_array(numbers):
+    if numbers.dtype.kind not in 'iu':
+        raise ValueError("Input must be an integer.")
+    result = numpy.zeros(numbers.shape, dtype=bool)
+    small = (numbers > 1) & (numbers < SIEVE_CACHE_LIMIT)
+    if small.any():
+        flags = numpy.frombuffer(prime_flags(int(numbers[small].max())), dtype=numpy.uint8)
+        result[small] = flags[numbers[small]].astype(bool)
+    medium = (numbers >= SIEVE_CACHE_LIMIT) & (numbers < 1 << 32)
+    if medium.any():
+        values = numbers[medium].astype(numpy.uint64)
+        # Trial division by the bases rules out most composites cheaply.
+        candidates = numpy.ones(values.shape, dtype=bool)
+        for prime in MILLER_RABIN_BASES:
+            candidates &= values % numpy.uint64(prime) != 0
+        candidates[candidates] = miller_rabin_array(values[candidates])
+        result[medium] = candidates
+    for index in zip(*numpy.nonzero(numbers >= 1 << 32)):
+        result[index] = is_prime(int(numbers[index]))
+    return result
+
+def miller_rabin_array(numbers):
+    """Vectorized Miller-Rabin for a uint64 array of odd values below 2**32.
+
+    Every product of two residues stays below 2**64, so plain uint64 arithmetic
+    does not overflow.
+    """
+    prime = numpy.ones(numbers.shape, dtype=bool)
+    d = numbers - 1
+    # The lowest set bit of d is a power of two, which float64 holds exactly.
+    shifts = numpy.log2((d & (~d + 1)).astype(numpy.float64)).astype(numpy.uint64)
+    d >>= shifts
+    for base in MILLER_RABIN_BASES_32:
+        x = numpy.ones(numbers.shape, dtype=numpy.uint64)
+        power = numpy.uint64(base) % numbers
+        exponent = d.copy()
+        while exponent.any():
+            x = numpy.where(exponent & 1, x * power % numbers, x)
+            power = power * power % numbers
+            exponent >>= 1
+        passed = (x == 1) | (x == numbers - 1)
+        for round_number in range(1, int(shifts.max())):
+            x = x * x % numbers
+            passed |= (x == numbers - 1) & (round_number < shifts)
+        prime &= passed
+    return prime
+
+def isbn10_check_digit(first_nine_digits):
+    total = sum(int(digit) * weight for digit, weight in zip(first_nine_digits, range(10, 1, -1)))
+    check = (11 - total % 11) % 11
+    return 'X' if check == 10 else str(check)
+
+def isbn13_check_digit(first_twelve_digits):
+    total = sum(int(digit) * (3 if position % 2 else 1) for position, digit in enumerate(first_twelve_digits))
+    return str((10 - total % 10) % 10)
+
+def clean_isbn(isbn):
+    """Strip the hyphens and spaces that ISBNs are usually printed with."""
+    return isbn.replace('-', '').replace(' ', '').upper()
+
+def is_valid_isbn(isbn):
+    """Return whether ``isbn`` is an ISBN-10 or ISBN-13 with a correct check digit."""
+    if not isinstance(isbn, str):
+        return False
+    if len(isbn) == 10 and isbn[:9].isdigit() and (isbn[9].isdigit() or isbn[9] == 'X'):
+        return isbn[9] == isbn10_check_digit(isbn[:9])
+    if len(isbn) == 13 and isbn.isdigit():
+        return isbn[12] == isbn13_check_digit(isbn[:12])
+    return False
+
+def to_isbn13(isbn):
+    """Return the canonical ISBN-13 form of an ISBN-10 or ISBN-13.
+
+    An ISBN-10 gains the 978 prefix and a recomputed check digit.  Check digits
+    are not validated here; use ``is_valid_isbn`` for that.
+    """
+    if len(isbn) == 10:
+        body = '978' + isbn[:9]
+        return body + isbn13_check_digit(body)
+    if len(isbn) == 13:
+        return isbn
+    raise ValueError(f"{isbn!r} is not an ISBN-10 or ISBN-13.")
+
+def isbn_to_key(isbn):
+    """Return the 64-bit integer key both forms of the same ISBN share."""
+    return int(to_isbn13(isbn))
+
+
+def author_sort_key(name):
+    """Return the key under which spellings of the same author name match.
+
+    Accents, case, punctuation and spacing are ignored, so "Doe, J." and
+    "DOE J" share "doe j".
+    """
+    decomposed = unicodedata.normalize('NFKD', name)
+    stripped = ''.join(character for character in decomposed if not unicodedata.combining(character))
+    return NON_ALPHANUMERIC.sub(' ', stripped.casefold()).strip()
 
-    return True
\ No newline at end of file
+def split_authors(authors):
+    """Return the author names in a book's ``authors`` text, in order and without repeats."""
+    names = {}
+    for name in AUTHOR_SEPARATOR.split(authors):
+        name = name.strip()
+        key = author_sort_key(name)
+        if key and key not in names:
+            names[key] = name
+    return list(names.values())
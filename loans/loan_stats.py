@@ -0,0 +1,93 @@
+"""Per-member loan counts for the overdue report, maintained as loans change.
+
+``LoanStats`` has a row per member with loans: how many loans they have had,
+how many are still out, how many of those are overdue, and the earliest end
+date among them.  Saving or deleting a loan recounts only its member, over
+the member's own loans, so the report reads these rows instead of grouping
+the whole loan table joined to its members and books.
+
+Overdue counts also change as days pass without any write.  Whether a member
+is overdue does not go stale, as the report compares ``next_due_at`` with
+today; the counts are brought up to date by ``manage.py refresh_loan_stats
+--overdue``, which reads only loans not returned past their end date, through
+the partial ``loans_loan_open_by_member`` index.  Without ``--overdue`` the
+command rebuilds the table from scratch.
+"""
+from django.db import transaction
+from django.db.models import Count, Min, Q
+from django.utils import timezone
+
+from loans.models import Loan, LoanStats
+from loans.pagination import WindowedPaginator
+
+COUNT_FIELDS = ['total_loans', 'active_loans', 'overdue_loans', 'next_due_at', 'counted_on']
+BATCH_SIZE = 500
+
+
+def stats_annotations(on):
+    active = Q(returned_at__isnull=True)
+    return {
+        'total_loans': Count('id'),
+        'active_loans': Count('id', filter=active),
+        'overdue_loans': Count('id', filter=active & Q(end_at__lt=on)),
+        'next_due_at': Min('end_at', filter=active),
+    }
+
+
+def count_loans(loans, on):
+    """Return unsaved ``LoanStats`` for the members of ``loans``, counted over them in one query."""
+    rows = loans.order_by().values('member').annotate(**stats_annotations(on))
+    return [LoanStats(member_id=row.pop('member'), counted_on=on, **row) for row in rows]
+
+
+def count_member_loans(member_ids, on=None):
+    """Recount the stats of the members ``member_ids`` from their loans."""
+    on = on or timezone.localdate()
+    stats = count_loans(Loan.objects.filter(member_id__in=member_ids), on)
+    if stats:
+        LoanStats.objects.bulk_create(stats, update_conflicts=True, unique_fields=['member'], update_fields=COUNT_FIELDS)
+    without_loans = set(member_ids) - {row.member_id for row in stats}
+    if without_loans:
+        LoanStats.objects.filter(member_id__in=without_loans).delete()
+
+
+def rebuild_loan_stats(on=None):
+    """Recount every member's stats from the whole loan table; return the number of rows written."""
+    on = on or timezone.localdate()
+    with transaction.atomic():
+        LoanStats.objects.all().delete()
+        stats = LoanStats.objects.bulk_create(count_loans(Loan.objects.all(), on), batch_size=BATCH_SIZE)
+    return len(stats)
+
+
+def refresh_overdue(on=None):
+    """Bring the overdue counts up to date for ``on``; return the number of members whose count changed.
+
+    Without writes, overdue counts only grow, and only for members whose
+    ``next_due_at`` has passed, so those are the only rows read.
+    """
+    on = on or timezone.localdate()
+    overdue = dict(
+        Loan.objects
+        .filter(returned_at__isnull=True, end_at__lt=on)
+        .order_by()
+        .values('member')
+        .annotate(count=Count('id'))
+        .values_list('member', 'count')
+    )
+    with transaction.atomic():
+        changed = []
+        for stats in LoanStats.objects.filter(next_due_at__lt=on):
+            if stats.overdue_loans != overdue.get(stats.member_id, 0):
+                stats.overdue_loans = overdue.get(stats.member_id, 0)
+                changed.append(stats)
+        LoanStats.objects.bulk_update(changed, ['overdue_loans'], batch_size=BATCH_SIZE)
+        LoanStats.objects.filter(counted_on__lt=on).update(counted_on=on)
+    return len(changed)
+
+
+def get_overdue_report(per_page, page_number, on=None):
+    """Return a page of the stats of members with overdue loans on ``on``, longest overdue first."""
+    on = on or timezone.localdate()
+    stats = LoanStats.objects.filter(next_due_at__lt=on).select_related('member').order_by('next_due_at', 'member')
+    return WindowedPaginator(stats, per_page).get_page(page_number)
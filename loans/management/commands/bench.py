@@ -0,0 +1,107 @@
+import json
+import time
+
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import override_settings, setup_databases, setup_test_environment, teardown_databases, teardown_test_environment
+from django.utils import timezone
+
+from loans.benchmark import add_member_history, build_cases, compare, get_samples, run_cases, unhashed_storages
+from loans.models import Book
+
+def parse_scales(value):
+    try:
+        scales = sorted({int(scale) for scale in value.split(',') if scale.strip()})
+    except ValueError:
+        raise CommandError(f"--scales must be a comma-separated list of book counts, not {value!r}")
+    if not scales or scales[0] < 1:
+        raise CommandError("--scales needs at least one positive book count")
+    return scales
+
+class Command(BaseCommand):
+    help = "Time every route against throwaway databases of increasing size and compare with a baseline"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scales', default='1000,100000', help="Comma-separated catalog sizes, e.g. 1000,100000,1000000")
+        parser.add_argument('--requests', type=int, default=50, help="Timed requests per route")
+        parser.add_argument('--output', default='bench_report.json', help="Where to write the JSON report")
+        parser.add_argument('--baseline', help="JSON report to compare against")
+        parser.add_argument('--save-baseline', action='store_true', help="Also write this report to --baseline")
+        parser.add_argument('--threshold', type=float, default=0.25, help="Slowdown, as a fraction, that counts as a regression")
+        parser.add_argument('--min-delta', type=float, default=1.0, help="Ignore slowdowns smaller than this many milliseconds")
+        parser.add_argument('--workers', type=int, default=1, help="Processes generating seed data")
+        parser.add_argument('--seed', type=int, default=0, help="Seed for the generated catalog")
+        parser.add_argument('--cache', action='store_true', help="Keep the catalog response cache on")
+
+    def handle(self, *args, **options):
+        scales = parse_scales(options['scales'])
+        repeat = max(1, options['requests'])
+        if options['save_baseline'] and not options['baseline']:
+            raise CommandError("--save-baseline needs --baseline")
+        baseline = self.load_baseline(options['baseline']) if not options['save_baseline'] else None
+
+        report = {'created': timezone.now().isoformat(), 'requests': repeat, 'scales': {}}
+        setup_test_environment()
+        old_config = setup_databases(verbosity=0, interactive=False, aliases={'default'}, serialized_aliases=set())
+        try:
+            # The throwaway database has no replica, so every read goes to it.
+            with override_settings(CATALOG_CACHE_ENABLED=options['cache'] and settings.CATALOG_CACHE_ENABLED, DEBUG=False, STORAGES=unhashed_storages(), REPLICA_DATABASE_ALIAS=None):
+                for scale in scales:
+                    self.grow(scale, options)
+                    if scale == scales[0]:
+                        add_member_history()
+                    cases = build_cases(get_samples(settings.ITEMS_PER_PAGE), repeat)
+                    started = time.perf_counter()
+                    report['scales'][str(scale)] = results = run_cases(cases)
+                    self.stdout.write(f"{scale} books: {len(cases)} cases in {time.perf_counter() - started:.1f}s")
+                    self.write_results(results)
+        finally:
+            teardown_databases(old_config, verbosity=0)
+            teardown_test_environment()
+
+        self.write_report(options['output'], report)
+        if options['save_baseline']:
+            self.write_report(options['baseline'], report)
+        elif baseline is not None:
+            self.check_regressions(report, baseline, options['threshold'], options['min_delta'])
+
+    def grow(self, scale, options):
+        missing = scale - Book.objects.count()
+        if missing > 0:
+            call_command('seed', count=missing, workers=options['workers'], seed=options['seed'] + scale, stdout=self.stdout if options['verbosity'] > 1 else None)
+
+    def load_baseline(self, path):
+        if not path:
+            return None
+        try:
+            with open(path, encoding='utf-8') as baseline:
+                return json.load(baseline)
+        except FileNotFoundError:
+            self.stdout.write(self.style.WARNING(f"No baseline at {path}; run with --save-baseline to create one"))
+        except ValueError as error:
+            raise CommandError(f"Could not read baseline {path}: {error}")
+
+    def write_results(self, results):
+        self.stdout.write(f"  {'case':<32} {'status':>6} {'queries':>7} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+        for label, result in results.items():
+            self.stdout.write(
+                f"  {label:<32} {result['status']:>6} {result['queries']:>7} "
+                f"{result['p50_ms']:>9.2f} {result['p95_ms']:>9.2f} {result['p99_ms']:>9.2f}"
+            )
+
+    def write_report(self, path, report):
+        with open(path, 'w', encoding='utf-8') as output:
+            json.dump(report, output, indent=2)
+        self.stdout.write(f"Report written to {path}")
+
+    def check_regressions(self, report, baseline, threshold, min_delta):
+        regressions = compare(report, baseline, threshold, min_delta)
+        for regression in regressions:
+            self.stdout.write(self.style.ERROR(
+                f"{regression.scale} books, {regression.label}: {regression.metric} "
+                f"{regression.baseline} -> {regression.current}"
+            ))
+        if regressions:
+            raise CommandError(f"{len(regressions)} regressions against the baseline")
+        self.stdout.write(self.style.SUCCESS("No regressions against the baseline"))
@@ -0,0 +1,42 @@
+import json
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+from django.test.utils import override_settings
+from django.utils import timezone
+
+from loans.benchmark import build_cases, get_samples, measure_compression, unhashed_storages
+from loans.models import Book
+
+BOOK_PAGES = {'list_books', 'get_book', 'get_book_by_isbn', 'search_books'}
+
+class Command(BaseCommand):
+    help = "Report the size on the wire and the CPU cost of compressing the book pages of the current database"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=200, help="Compressions timed per page and encoding")
+        parser.add_argument('--output', help="Where to write the JSON report")
+
+    def handle(self, *args, **options):
+        if not Book.objects.exists():
+            raise CommandError("The catalog is empty; run manage.py seed first")
+        repeat = max(1, options['repeat'])
+        cases = build_cases(get_samples(settings.ITEMS_PER_PAGE), repeat, names=BOOK_PAGES)
+
+        report = {'created': timezone.now().isoformat(), 'books': Book.objects.count(), 'pages': {}}
+        self.stdout.write(f"  {'case':<32} {'encoding':<10} {'bytes':>9} {'ratio':>6} {'cpu us':>9}")
+        with override_settings(CATALOG_CACHE_ENABLED=False, DEBUG=False, STORAGES=unhashed_storages()):
+            client = Client(HTTP_HOST='localhost')
+            for case in cases:
+                report['pages'][case.label] = result = measure_compression(client, case.url, repeat)
+                self.stdout.write(f"  {case.label:<32} {'identity':<10} {result['identity_bytes']:>9}")
+                for encoding, figures in result['encodings'].items():
+                    self.stdout.write(
+                        f"  {'':<32} {encoding:<10} {figures['bytes']:>9} {figures['ratio']:>6.3f} {figures['cpu_us']:>9.1f}"
+                    )
+
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as output:
+                json.dump(report, output, indent=2)
+            self.stdout.write(f"Report written to {options['output']}")
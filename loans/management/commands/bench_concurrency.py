@@ -0,0 +1,50 @@
+import json
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import override_settings
+from django.utils import timezone
+
+from loans.benchmark import build_cases, get_samples, run_asgi, run_wsgi, unhashed_storages
+from loans.models import Book
+from my_library.asgi_urls import ASYNC_VIEWS
+
+SERVERS = {
+    'wsgi': ('my_library.urls', run_wsgi),
+    'asgi': ('my_library.asgi_urls', run_asgi),
+}
+
+class Command(BaseCommand):
+    help = "Compare the throughput of the catalog's read routes under WSGI and ASGI on the current database"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200, help="Requests per route and server")
+        parser.add_argument('--concurrency', type=int, default=16, help="Requests in flight at once")
+        parser.add_argument('--output', help="Where to write the JSON report")
+        parser.add_argument('--cache', action='store_true', help="Keep the catalog response cache on")
+
+    def handle(self, *args, **options):
+        if not Book.objects.exists():
+            raise CommandError("The catalog is empty; run manage.py seed first")
+        requests = max(1, options['requests'])
+        concurrency = max(1, options['concurrency'])
+        cases = build_cases(get_samples(settings.ITEMS_PER_PAGE), requests, names=ASYNC_VIEWS)
+
+        report = {'created': timezone.now().isoformat(), 'books': Book.objects.count(), 'servers': {}}
+        self.stdout.write(f"{report['books']} books, {requests} requests per route, {concurrency} at a time")
+        self.stdout.write(f"  {'case':<32} {'server':>6} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'errors':>6}")
+        with override_settings(CATALOG_CACHE_ENABLED=options['cache'] and settings.CATALOG_CACHE_ENABLED, DEBUG=False, STORAGES=unhashed_storages()):
+            for server, (urlconf, run) in SERVERS.items():
+                report['servers'][server] = {}
+                with override_settings(ROOT_URLCONF=urlconf):
+                    for case in cases:
+                        report['servers'][server][case.label] = result = run(case.url, case.repeat, concurrency)
+                        self.stdout.write(
+                            f"  {case.label:<32} {server:>6} {result['rps']:>9.1f} "
+                            f"{result['p50_ms']:>9.2f} {result['p95_ms']:>9.2f} {result['errors']:>6}"
+                        )
+
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as output:
+                json.dump(report, output, indent=2)
+            self.stdout.write(f"Report written to {options['output']}")
@@ -0,0 +1,30 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from loans.export import CHUNK_SIZE, CONTENT_TYPES, stream_catalog
+
+class Command(BaseCommand):
+    help = "Stream every Book to a CSV or NDJSON file without loading the table into memory"
+
+    def add_arguments(self, parser):
+        parser.add_argument('output', nargs='?', default='-', help="File to write, or - for standard output")
+        parser.add_argument('--format', choices=sorted(CONTENT_TYPES), default='csv', help="Output format")
+        parser.add_argument('--gzip', action='store_true', help="Gzip the output as it is written")
+        parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE, help="Rows fetched from the database at a time")
+
+    def handle(self, *args, **options):
+        path = options['output']
+        chunks = stream_catalog(options['format'], compress=options['gzip'], chunk_size=options['chunk_size'])
+        try:
+            output = sys.stdout.buffer if path == '-' else open(path, 'wb')
+        except OSError as error:
+            raise CommandError(f"Could not open {path}: {error}")
+        try:
+            for chunk in chunks:
+                output.write(chunk)
+        finally:
+            if path != '-':
+                output.close()
+        if path != '-':
+            self.stdout.write(self.style.SUCCESS(f"Exported books to {path}"))
@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+
+from loans.cache import bump_list_version
+from loans.rollups import rebuild_rollups
+
+class Command(BaseCommand):
+    help = "Recount the catalog statistics rollups from the book table"
+
+    def handle(self, *args, **options):
+        rows = rebuild_rollups()
+        bump_list_version()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {rows} rollup rows"))
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from loans.search import is_supported, rebuild_search_index
+
+class Command(BaseCommand):
+    help = "Rebuild the full-text search index over Book titles and authors"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--no-optimize', action='store_true', help="Skip merging the index b-trees after the rebuild")
+
+    def handle(self, *args, **options):
+        if not is_supported(connection):
+            raise CommandError("Full-text search requires the SQLite database backend.")
+        rebuild_search_index(connection, optimize=not options['no_optimize'])
+        self.stdout.write(self.style.SUCCESS("Rebuilt the book search index."))
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from loans.counters import TRACKED_MODELS, recount
+
+class Command(BaseCommand):
+    help = "Recount the rows of every tracked table and repair any drift in RowCount"
+
+    def handle(self, *args, **options):
+        for model in TRACKED_MODELS:
+            with transaction.atomic():
+                old, new = recount(model)
+            label = model._meta.label
+            if old == new:
+                self.stdout.write(f"{label}: {new} rows")
+            else:
+                self.stdout.write(self.style.WARNING(f"{label}: {new} rows (was recorded as {old})"))
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from loans.loan_stats import rebuild_loan_stats, refresh_overdue
+
+class Command(BaseCommand):
+    help = "Rebuild the per-member loan stats behind the overdue report, or only bring their overdue counts up to date"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--overdue', action='store_true', help="Only recount overdue loans, through the index of loans not returned (run daily)")
+
+    def handle(self, *args, **options):
+        if options['overdue']:
+            changed = refresh_overdue()
+            self.stdout.write(self.style.SUCCESS(f"Updated the overdue count of {changed} members"))
+        else:
+            rows = rebuild_loan_stats()
+            self.stdout.write(self.style.SUCCESS(f"Rebuilt loan stats for {rows} members"))
@@ -0,0 +1,39 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+from loans.cache import get_cache
+from loans.replica import backup_database, get_replica_alias
+
+class Command(BaseCommand):
+    help = "Copy the primary SQLite database to the read replica with the online backup API"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--replica', help="Replica file to write (default: the replica database's NAME)")
+        parser.add_argument('--pages', type=int, default=1024, help="Pages copied per backup step; -1 copies everything in one step")
+
+    def handle(self, *args, **options):
+        path = options['replica']
+        if path is None:
+            alias = get_replica_alias()
+            if alias is None:
+                raise CommandError("No replica database is configured; set DATABASE_REPLICA or pass --replica")
+            path = settings.DATABASES[alias]['NAME']
+            connections[alias].close()
+
+        source = connections[DEFAULT_DB_ALIAS]
+        if source.vendor != 'sqlite':
+            raise CommandError("refresh_replica only copies SQLite databases")
+
+        def progress(status, remaining, total):
+            if options['verbosity'] > 1:
+                self.stdout.write(f"Copied {total - remaining}/{total} pages")
+
+        started = time.perf_counter()
+        backup_database(source, path, pages=options['pages'] or -1, progress=progress)
+        # Pages rendered from the old copy may be cached; the catalog cache
+        # holds nothing else, so it is emptied rather than versioned.
+        get_cache().clear()
+        self.stdout.write(self.style.SUCCESS(f"Replica {path} refreshed in {time.perf_counter() - started:.1f}s"))
@@ -1,22 +1,143 @@
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+import random
+import time
+
 from faker import Faker
+from loans.authors import link_authors
+from loans.cache import bump_list_version
+from loans.counters import adjust_row_count
+from loans.helpers import isbn13_check_digit
 from loans.models import Book
+from loans.rollups import adjust_rollups
 fake =Faker()
 
-from django.core.management.base import BaseCommand
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Max
+
+# The nine digits between the 979 prefix and the check digit.
+ISBN_SPACE = 10 ** 9
+
+@lru_cache
+def isbn_permutation(seed):
+    """Return ``(multiplier, offset)`` of a seeded bijection of ``range(ISBN_SPACE)``."""
+    rng = random.Random(f"{seed}:isbn")
+    multiplier = rng.randrange(1, ISBN_SPACE)
+    # Coprime with 10 ** 9, so no two counters share an ISBN.
+    while multiplier % 2 == 0 or multiplier % 5 == 0:
+        multiplier = rng.randrange(1, ISBN_SPACE)
+    return multiplier, rng.randrange(ISBN_SPACE)
+
+def seeded_isbn(seed, counter):
+    """Return the ISBN-13 of the ``counter``-th book of a run seeded with ``seed``.
+
+    Counting rows of the run rather than primary keys keeps a seed's ISBNs the
+    same whatever the table already holds, and across worker processes.
+    """
+    if not 0 <= counter < ISBN_SPACE:
+        raise ValueError(f"Only {ISBN_SPACE} seeded ISBNs exist, not {counter + 1}")
+    multiplier, offset = isbn_permutation(seed)
+    body = f"979{(multiplier * counter + offset) % ISBN_SPACE:09d}"
+    return body + isbn13_check_digit(body)
+
+def generate_batch(seed, batch_number, first_pk, first_counter, size):
+    """Return ``size`` rows of fake book data for one batch.
+
+    Each batch reseeds Faker from the run seed and its own batch number, so the
+    output does not depend on which worker builds it or in what order.
+    """
+    fake.seed_instance(f"{seed}:{batch_number}")
+    rows = []
+    for offset in range(size):
+        rows.append((
+            first_pk + offset,
+            f"{fake.last_name()}, {fake.first_name()}",
+            fake.sentence(),
+            fake.date(),
+            seeded_isbn(seed, first_counter + offset),
+        ))
+    return rows
 
 class Command(BaseCommand):
     help = "Seed the database with sample Book data"
-    
+
+    def add_arguments(self, parser):
+        parser.add_argument('--count', type=int, default=100, help="Number of books to create")
+        parser.add_argument('--batch-size', type=int, default=1000, help="Rows per bulk INSERT and transaction")
+        parser.add_argument('--workers', type=int, default=1, help="Processes generating fake data")
+        parser.add_argument('--seed', type=int, default=None, help="Seed for reproducible datasets")
+
     def handle(self, *args, **options):
-        for _ in range(100):
-            book_authors = f"{fake.last_name()}, {fake.first_name()}"
-            book_title = fake.sentence()
-            book_publication_date = fake.date()
-            book_isbn = fake.unique.isbn13().replace('-', '')
-            Book.objects.create(
-                authors=book_authors,
-                title=book_title,
-                publication_date=book_publication_date,
-                isbn=book_isbn
-            )
+        count = options['count']
+        batch_size = max(1, options['batch_size'])
+        workers = max(1, options['workers'])
+        seed = options['seed'] if options['seed'] is not None else random.randrange(2**32)
+
+        if count > ISBN_SPACE:
+            raise CommandError(f"At most {ISBN_SPACE} books can be seeded at once")
+
+        first_pk = (Book.objects.aggregate(Max('pk'))['pk__max'] or 0) + 1
+        batches = [
+            (seed, batch_number, first_pk + offset, offset, min(batch_size, count - offset))
+            for batch_number, offset in enumerate(range(0, count, batch_size))
+        ]
+
+        started = time.perf_counter()
+        created = 0
+        self.spare_counter = count
+        for rows in self.generate(batches, workers):
+            with transaction.atomic():
+                rows = self.replace_taken_isbns(rows, seed)
+                books = Book.objects.bulk_create(
+                    [Book(pk=pk, authors=authors, title=title, publication_date=publication_date, isbn=isbn, isbn_key=int(isbn))
+                     for pk, authors, title, publication_date, isbn in rows],
+                    batch_size=batch_size,
+                )
+                adjust_row_count(Book, len(rows))
+                adjust_rollups(added=[(book.authors, book.publication_date, book.created_at) for book in books])
+                link_authors((book.pk, book.authors) for book in books)
+            created += len(rows)
+            if options['verbosity'] > 1:
+                self.stdout.write(f"Created {created}/{count} books")
+
+        # bulk_create sends no post_save signals, so retire cached list pages here.
+        bump_list_version()
+
+        elapsed = time.perf_counter() - started
+        rate = created / elapsed if elapsed else created
+        self.stdout.write(self.style.SUCCESS(
+            f"Seeded {created} books with seed {seed} in {elapsed:.1f}s ({rate:.0f} rows/s)"
+        ))
+
+    def replace_taken_isbns(self, rows, seed):
+        """Give rows whose ISBN an existing book already has the run's next unused ISBNs."""
+        rows = list(rows)
+        pending = range(len(rows))
+        while pending:
+            taken = set(Book.objects.filter(isbn_key__in=[int(rows[index][4]) for index in pending]).values_list('isbn_key', flat=True))
+            pending = [index for index in pending if int(rows[index][4]) in taken]
+            for index in pending:
+                try:
+                    isbn = seeded_isbn(seed, self.spare_counter)
+                except ValueError as error:
+                    raise CommandError(str(error))
+                rows[index] = rows[index][:4] + (isbn,)
+                self.spare_counter += 1
+        return rows
 
+    def generate(self, batches, workers):
+        """Yield generated batches in order, keeping at most two per worker in flight."""
+        if workers == 1:
+            for batch in batches:
+                yield generate_batch(*batch)
+            return
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            pending = deque()
+            for batch in batches:
+                pending.append(executor.submit(generate_batch, *batch))
+                if len(pending) >= workers * 2:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
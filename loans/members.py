@@ -0,0 +1,52 @@
+"""Member pages: the member with a summary of their loans, and their loan history.
+
+The member row and the summary come from one query, by annotating the member
+with conditional counts over its loans.  History pages are keyset pages of
+loans with their books joined in, so a page costs the same number of queries
+however many loans it shows.
+"""
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from loans.models import Loan, Member
+from loans.pagination import get_keyset_page
+
+ACTIVE = 'active'
+OVERDUE = 'overdue'
+RETURNED = 'returned'
+UPCOMING = 'upcoming'
+
+
+def summary_annotations(on):
+    outstanding = Q(loans__returned_at__isnull=True)
+    return {
+        'loan_count': Count('loans'),
+        'active_count': Count('loans', filter=outstanding & Q(loans__start_at__lte=on, loans__end_at__gte=on)),
+        'overdue_count': Count('loans', filter=outstanding & Q(loans__end_at__lt=on)),
+    }
+
+
+def get_member_summary(member_id, on=None):
+    """Return the member with ``loan_count``, ``active_count`` and ``overdue_count`` as of ``on``."""
+    on = on or timezone.localdate()
+    return Member.objects.annotate(**summary_annotations(on)).get(pk=member_id)
+
+
+def loan_status(loan, on):
+    if loan.returned_at is not None:
+        return RETURNED
+    if loan.end_at < on:
+        return OVERDUE
+    if loan.start_at > on:
+        return UPCOMING
+    return ACTIVE
+
+
+def get_loan_history(member, per_page, after=None, before=None, on=None):
+    """Return a keyset page of ``member``'s loans, each with its book and a ``status``."""
+    on = on or timezone.localdate()
+    loans = Loan.objects.filter(member=member).select_related('book')
+    page_object = get_keyset_page(loans, per_page, after=after, before=before)
+    for loan in page_object:
+        loan.status = loan_status(loan, on)
+    return page_object
@@ -0,0 +1,215 @@
+"""In-process request and SQL metrics, exposed in the Prometheus text format.
+
+``MetricsMiddleware`` times every request and counts the queries it runs and
+the time spent in them, through an execute wrapper that every connection gets
+when it is opened, in whichever thread.  Samples are folded straight into
+fixed histogram buckets, so memory depends on the number of URL names rather
+than on traffic, and the number of label sets is capped by ``MAX_SERIES``.
+
+Each worker process keeps its own figures; Prometheus adds them up across the
+scraped targets.  Queries run while a streaming response is being consumed
+happen after the middleware returns and are not counted.
+"""
+from bisect import bisect_left
+from contextvars import ContextVar
+import threading
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 25, 50, 100)
+METHODS = {'GET', 'HEAD', 'POST', 'PUT', 'PATCH', 'DELETE', 'OPTIONS'}
+MAX_SERIES = 200
+UNMATCHED = 'unmatched'
+OVERFLOW = 'other'
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+class Histogram:
+    __slots__ = ('bounds', 'counts', 'total')
+
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.total = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.total += value
+
+    def cumulative(self):
+        running = 0
+        for bound, count in zip((*self.bounds, '+Inf'), self.counts):
+            running += count
+            yield bound, running
+
+
+class Series:
+    """Everything recorded for one (view, method) pair."""
+    __slots__ = ('durations', 'queries', 'sql_seconds', 'statuses')
+
+    def __init__(self):
+        self.durations = Histogram(DURATION_BUCKETS)
+        self.queries = Histogram(QUERY_BUCKETS)
+        self.sql_seconds = 0.0
+        self.statuses = {}
+
+
+class Registry:
+    def __init__(self, max_series=MAX_SERIES):
+        self.max_series = max_series
+        self.lock = threading.Lock()
+        self.series = {}
+
+    def reset(self):
+        with self.lock:
+            self.series = {}
+
+    def record(self, view, method, status, duration, queries, sql_seconds):
+        status = f'{status // 100}xx'
+        with self.lock:
+            key = (view, method)
+            series = self.series.get(key)
+            if series is None:
+                if len(self.series) >= self.max_series:
+                    key = (OVERFLOW, method)
+                series = self.series.setdefault(key, Series())
+            series.durations.observe(duration)
+            series.queries.observe(queries)
+            series.sql_seconds += sql_seconds
+            series.statuses[status] = series.statuses.get(status, 0) + 1
+
+    def render(self):
+        with self.lock:
+            items = sorted(self.series.items())
+            lines = []
+            lines += histogram_lines('library_request_duration_seconds', "Request latency by URL name.", items, 'durations')
+            lines += histogram_lines('library_request_queries', "SQL queries per request by URL name.", items, 'queries')
+            lines += [
+                "# HELP library_sql_duration_seconds_total Time spent in SQL by URL name.",
+                "# TYPE library_sql_duration_seconds_total counter",
+            ]
+            for (view, method), series in items:
+                lines.append(f'library_sql_duration_seconds_total{{{labels(view, method)}}} {series.sql_seconds!r}')
+            lines += [
+                "# HELP library_requests_total Requests by URL name and status class.",
+                "# TYPE library_requests_total counter",
+            ]
+            for (view, method), series in items:
+                for status, count in sorted(series.statuses.items()):
+                    lines.append(f'library_requests_total{{{labels(view, method)},status="{status}"}} {count}')
+        return '\n'.join(lines) + '\n'
+
+
+def escape(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def labels(view, method):
+    return f'view="{escape(view)}",method="{method}"'
+
+
+def histogram_lines(name, help_text, items, attribute):
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+    for (view, method), series in items:
+        histogram = getattr(series, attribute)
+        for bound, count in histogram.cumulative():
+            lines.append(f'{name}_bucket{{{labels(view, method)},le="{bound}"}} {count}')
+        lines.append(f'{name}_sum{{{labels(view, method)}}} {histogram.total!r}')
+        lines.append(f'{name}_count{{{labels(view, method)}}} {sum(histogram.counts)}')
+    return lines
+
+
+registry = Registry()
+
+
+class QueryTimer:
+    """An execute wrapper that counts queries and adds up the time they take."""
+
+    def __init__(self):
+        self.queries = 0
+        self.seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.seconds += time.perf_counter() - started
+            self.queries += 1
+
+
+def view_name(request):
+    match = getattr(request, 'resolver_match', None)
+    return match.view_name if match is not None else UNMATCHED
+
+
+# The timer of the request being handled.  sync_to_async copies the context
+# into its worker thread, so queries the async ORM runs there see it too.
+current_timer = ContextVar('current_timer', default=None)
+
+
+def time_query(execute, sql, params, many, context):
+    timer = current_timer.get()
+    if timer is None:
+        return execute(sql, params, many, context)
+    return timer(execute, sql, params, many, context)
+
+
+def install_query_timing(connection, **kwargs):
+    """Add ``time_query`` to ``connection``; a ``connection_created`` receiver.
+
+    Connections belong to the thread that opened them, so the wrapper has to
+    be on each of them rather than on the one the middleware runs beside.
+    """
+    if time_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(time_query)
+
+
+def record(request, response, started, timer):
+    duration = time.perf_counter() - started
+    method = request.method if request.method in METHODS else 'other'
+    registry.record(view_name(request), method, response.status_code, duration, timer.queries, timer.seconds)
+
+
+class MetricsMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.METRICS_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+        # Connections opened before the receiver was connected.
+        for connection in connections.all(initialized_only=True):
+            install_query_timing(connection)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        timer = QueryTimer()
+        started = time.perf_counter()
+        token = current_timer.set(timer)
+        try:
+            response = self.get_response(request)
+        finally:
+            current_timer.reset(token)
+        record(request, response, started, timer)
+        return response
+
+    async def __acall__(self, request):
+        timer = QueryTimer()
+        started = time.perf_counter()
+        token = current_timer.set(timer)
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_timer.reset(token)
+        record(request, response, started, timer)
+        return response
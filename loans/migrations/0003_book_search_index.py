@@ -0,0 +1,23 @@
+from django.db import migrations
+
+from loans.search import install_search_index, rebuild_search_index, uninstall_search_index
+
+
+def create_index(apps, schema_editor):
+    install_search_index(schema_editor.connection)
+    rebuild_search_index(schema_editor.connection, optimize=False)
+
+
+def drop_index(apps, schema_editor):
+    uninstall_search_index(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('loans', '0002_member_alter_book_authors_alter_book_isbn_loan'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_index, drop_index),
+    ]
@@ -0,0 +1,67 @@
+import django.core.validators
+from django.db import migrations, models
+
+BATCH_SIZE = 1000
+
+
+def isbn_to_key(isbn):
+    # Frozen copy of loans.helpers.isbn_to_key, so this migration keeps working
+    # however the helper changes later.
+    if len(isbn) == 10:
+        body = '978' + isbn[:9]
+        total = sum(int(digit) * (3 if position % 2 else 1) for position, digit in enumerate(body))
+        return int(body + str((10 - total % 10) % 10))
+    return int(isbn)
+
+
+def find_isbn_collisions(books):
+    """Group the ``(pk, isbn)`` pairs whose ISBNs share a key, such as a book's ISBN-10 and ISBN-13."""
+    groups = {}
+    for pk, isbn in books:
+        groups.setdefault(isbn_to_key(isbn), []).append((pk, isbn))
+    return [group for group in groups.values() if len(group) > 1]
+
+
+def backfill_isbn_key(apps, schema_editor):
+    Book = apps.get_model('loans', 'Book')
+    # isbn_key becomes unique below; stop before writing anything rather than
+    # fail on the constraint with no word of which books are to blame.
+    collisions = find_isbn_collisions(Book.objects.order_by('pk').values_list('pk', 'isbn').iterator(chunk_size=BATCH_SIZE))
+    if collisions:
+        listed = '; '.join(', '.join(f"book {pk} ({isbn})" for pk, isbn in group) for group in collisions)
+        raise RuntimeError(f"These books are the same ISBN written in two forms; merge or delete the duplicates, then migrate again: {listed}")
+    last_pk = 0
+    while True:
+        batch = list(Book.objects.filter(pk__gt=last_pk).order_by('pk').only('pk', 'isbn')[:BATCH_SIZE])
+        if not batch:
+            break
+        for book in batch:
+            book.isbn_key = isbn_to_key(book.isbn)
+        Book.objects.bulk_update(batch, ['isbn_key'])
+        last_pk = batch[-1].pk
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('loans', '0003_book_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='book',
+            name='isbn_key',
+            field=models.BigIntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.RunPython(backfill_isbn_key, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='book',
+            name='isbn_key',
+            field=models.BigIntegerField(blank=True, editable=False, unique=True),
+        ),
+        migrations.AlterField(
+            model_name='book',
+            name='isbn',
+            field=models.CharField(validators=[django.core.validators.RegexValidator('^(\\d{9}[\\dX]|\\d{13})$')]),
+        ),
+    ]
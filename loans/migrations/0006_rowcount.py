@@ -0,0 +1,28 @@
+# Generated by Django 5.2.7 on 2026-10-18 16:39
+
+from django.db import migrations, models
+
+
+def initialise_row_counts(apps, schema_editor):
+    RowCount = apps.get_model('loans', 'RowCount')
+    for name in ['Book', 'Member', 'Loan']:
+        model = apps.get_model('loans', name)
+        RowCount.objects.update_or_create(pk=f'loans.{name}', defaults={'rows': model.objects.count()})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('loans', '0005_book_updated_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RowCount',
+            fields=[
+                ('table', models.CharField(max_length=100, primary_key=True, serialize=False)),
+                ('rows', models.BigIntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(initialise_row_counts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.7 on 2026-10-18 16:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('loans', '0006_rowcount'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='loan',
+            index=models.Index(fields=['book', 'start_at', 'end_at'], name='loans_loan_book_interval'),
+        ),
+    ]
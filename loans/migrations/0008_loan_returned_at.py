@@ -0,0 +1,24 @@
+# Generated by Django 5.2.7 on 2026-10-18 16:46
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('loans', '0007_loan_book_interval_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='loan',
+            name='returned_at',
+            field=models.DateField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='loan',
+            name='member',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='loans', to='loans.member'),
+        ),
+    ]
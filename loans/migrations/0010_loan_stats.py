@@ -0,0 +1,50 @@
+# Generated by Django 5.2.7 on 2026-10-18 17:18
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Min, Q
+from django.utils import timezone
+
+
+def initialise_loan_stats(apps, schema_editor):
+    # Frozen copy of loans.loan_stats.rebuild_loan_stats.
+    Loan = apps.get_model('loans', 'Loan')
+    LoanStats = apps.get_model('loans', 'LoanStats')
+    on = timezone.localdate()
+    active = Q(returned_at__isnull=True)
+    rows = Loan.objects.order_by().values('member').annotate(
+        total_loans=Count('id'),
+        active_loans=Count('id', filter=active),
+        overdue_loans=Count('id', filter=active & Q(end_at__lt=on)),
+        next_due_at=Min('end_at', filter=active),
+    )
+    LoanStats.objects.bulk_create(
+        [LoanStats(member_id=row.pop('member'), counted_on=on, **row) for row in rows],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('loans', '0009_book_version'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LoanStats',
+            fields=[
+                ('member', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='loan_stats', serialize=False, to='loans.member')),
+                ('total_loans', models.PositiveIntegerField(default=0)),
+                ('active_loans', models.PositiveIntegerField(default=0)),
+                ('overdue_loans', models.PositiveIntegerField(default=0)),
+                ('next_due_at', models.DateField(blank=True, db_index=True, null=True)),
+                ('counted_on', models.DateField()),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='loan',
+            index=models.Index(condition=models.Q(('returned_at__isnull', True)), fields=['member', 'end_at'], name='loans_loan_open_by_member'),
+        ),
+        migrations.RunPython(initialise_loan_stats, migrations.RunPython.noop),
+    ]
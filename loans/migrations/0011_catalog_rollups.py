@@ -0,0 +1,62 @@
+# Generated by Django 5.2.7 on 2026-10-18 17:21
+
+import django.utils.timezone
+from django.db import migrations, models
+from django.db.models import Count, F
+from django.db.models.functions import ExtractYear, TruncMonth
+
+
+def backfill_created_at(apps, schema_editor):
+    # The closest thing to a creation time the existing rows have.
+    Book = apps.get_model('loans', 'Book')
+    Book.objects.update(created_at=F('updated_at'))
+
+
+def initialise_rollups(apps, schema_editor):
+    # Frozen copy of loans.rollups.rebuild_rollups.
+    Book = apps.get_model('loans', 'Book')
+    CatalogRollup = apps.get_model('loans', 'CatalogRollup')
+    books = Book.objects.order_by()
+    rollups = [
+        CatalogRollup(kind='year', key=f"{row['year']:04d}", books=row['books'])
+        for row in books.values(year=ExtractYear('publication_date')).annotate(books=Count('id'))
+    ]
+    rollups += [
+        CatalogRollup(kind='authors', key=row['authors'], books=row['books'])
+        for row in books.values('authors').annotate(books=Count('id'))
+    ]
+    rollups += [
+        CatalogRollup(kind='month', key=row['month'].strftime('%Y-%m'), books=row['books'])
+        for row in books.values(month=TruncMonth('created_at')).annotate(books=Count('id'))
+    ]
+    CatalogRollup.objects.bulk_create(rollups, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('loans', '0010_loan_stats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='book',
+            name='created_at',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False),
+        ),
+        migrations.CreateModel(
+            name='CatalogRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(max_length=20)),
+                ('key', models.CharField(max_length=255)),
+                ('books', models.BigIntegerField(default=0)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['kind', '-books'], name='loans_catalogrollup_top')],
+                'constraints': [models.UniqueConstraint(fields=('kind', 'key'), name='loans_catalogrollup_kind_key')],
+            },
+        ),
+        migrations.RunPython(backfill_created_at, migrations.RunPython.noop),
+        migrations.RunPython(initialise_rollups, migrations.RunPython.noop),
+    ]
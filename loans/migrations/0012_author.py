@@ -0,0 +1,22 @@
+# Generated by Django 5.2.7 on 2026-10-18 17:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('loans', '0011_catalog_rollups'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Author',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255)),
+                ('sort_key', models.CharField(max_length=255, unique=True)),
+                ('books', models.ManyToManyField(to='loans.book')),
+            ],
+        ),
+    ]
@@ -0,0 +1,75 @@
+import re
+import unicodedata
+
+from django.db import migrations, transaction
+
+BATCH_SIZE = 1000
+
+# Frozen copies of loans.helpers.split_authors and author_sort_key, so this
+# migration keeps working however the helpers change later.
+AUTHOR_SEPARATOR = re.compile(r'\s*(?:;|&|\band\b)\s*', re.IGNORECASE)
+NON_ALPHANUMERIC = re.compile(r'[\W_]+')
+
+
+def author_sort_key(name):
+    decomposed = unicodedata.normalize('NFKD', name)
+    stripped = ''.join(character for character in decomposed if not unicodedata.combining(character))
+    return NON_ALPHANUMERIC.sub(' ', stripped.casefold()).strip()
+
+
+def split_authors(authors):
+    names = {}
+    for name in AUTHOR_SEPARATOR.split(authors):
+        name = name.strip()
+        key = author_sort_key(name)
+        if key and key not in names:
+            names[key] = name
+    return names
+
+
+def link_book_authors(apps, schema_editor):
+    """Parse every book's authors into Author rows and links, a batch per transaction.
+
+    Only books without links are read, so an interrupted run picks up where it
+    stopped when the migration is run again.
+    """
+    Book = apps.get_model('loans', 'Book')
+    Author = apps.get_model('loans', 'Author')
+    Link = Author.books.through
+    last_pk = 0
+    while True:
+        with transaction.atomic():
+            batch = list(
+                Book.objects
+                .filter(pk__gt=last_pk, author__isnull=True)
+                .order_by('pk')
+                .values_list('pk', 'authors')[:BATCH_SIZE]
+            )
+            if not batch:
+                break
+            names = {}
+            links = {}
+            for book_id, authors in batch:
+                for key, name in split_authors(authors).items():
+                    names.setdefault(key, name)
+                    links[(book_id, key)] = None
+            Author.objects.bulk_create([Author(name=name, sort_key=key) for key, name in names.items()], ignore_conflicts=True)
+            ids = {}
+            keys = list(names)
+            for start in range(0, len(keys), 900):
+                ids.update(Author.objects.filter(sort_key__in=keys[start:start + 900]).values_list('sort_key', 'id'))
+            Link.objects.bulk_create([Link(book_id=book_id, author_id=ids[key]) for book_id, key in links], batch_size=500)
+            last_pk = batch[-1][0]
+
+
+class Migration(migrations.Migration):
+    # Each batch commits on its own, so the work done survives an interruption.
+    atomic = False
+
+    dependencies = [
+        ('loans', '0012_author'),
+    ]
+
+    operations = [
+        migrations.RunPython(link_book_authors, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,29 @@
+from django.db import migrations
+from django.db.models import Count
+
+
+def roll_up_linked_authors(apps, schema_editor):
+    # Author rollups were keyed on the whole authors text; count them per
+    # linked author instead, keyed on the author's sort key.
+    Author = apps.get_model('loans', 'Author')
+    CatalogRollup = apps.get_model('loans', 'CatalogRollup')
+    Link = Author.books.through
+    CatalogRollup.objects.filter(kind='authors').delete()
+    CatalogRollup.objects.bulk_create(
+        [
+            CatalogRollup(kind='authors', key=row['author__sort_key'], books=row['books'])
+            for row in Link.objects.order_by().values('author__sort_key').annotate(books=Count('book_id'))
+        ],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('loans', '0013_link_book_authors'),
+    ]
+
+    operations = [
+        migrations.RunPython(roll_up_linked_authors, migrations.RunPython.noop),
+    ]
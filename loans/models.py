@@ -1,6 +1,9 @@
 from django.db import models
 from django.core.validators import MinLengthValidator
 from django.core.validators import RegexValidator
+from django.utils import timezone
+
+from loans.helpers import isbn_to_key, split_authors
 
 class Book (models.Model):
     authors = models.CharField(
@@ -10,16 +13,54 @@ class Book (models.Model):
     title = models.CharField(max_length = 255)
     publication_date = models.DateField()
     isbn = models.CharField(
-        validators = [RegexValidator(r'^\d{10}(\d{3})?$')],
-        unique = True
+        validators = [RegexValidator(r'^(\d{9}[\dX]|\d{13})$')]
+        )
+    # Canonical ISBN-13 as an integer, so the ISBN-10 and ISBN-13 forms of a
+    # book share one compact unique key.  Kept in step with isbn by save().
+    isbn_key = models.BigIntegerField(
+        unique = True,
+        editable = False,
+        blank = True
         )
+    updated_at = models.DateTimeField(auto_now = True, db_index = True)
+    created_at = models.DateTimeField(default = timezone.now, editable = False)
+    # Bumped by every write, so an edit based on an older copy can be refused
+    # instead of silently overwriting someone else's (see BookUpdateForm).
+    version = models.PositiveIntegerField(default = 1, editable = False)
 
     def __str__(self):
         return (f"{self.authors}    ({self.publication_date.year})  \"{self.title}\"    ISBN {self.isbn}.")
     
     def __repr__(self):
         return (f"<Book: {self.__str__()}>")
+
+    @property
+    def author_names(self):
+        return split_authors(self.authors)
+
+    def clean(self):
+        try:
+            self.isbn_key = isbn_to_key(self.isbn)
+        except (TypeError, ValueError):
+            # Malformed ISBNs are reported by the isbn field's validator.
+            pass
+
+    def save(self, *args, **kwargs):
+        self.isbn_key = isbn_to_key(self.isbn)
+        if not self._state.adding:
+            self.version += 1
+        super().save(*args, **kwargs)
     
+class Author(models.Model):
+    """An author, linked to every book whose authors text names them (see loans.authors)."""
+    name = models.CharField(max_length = 255)
+    # author_sort_key(name): one row per author however the name is written.
+    sort_key = models.CharField(max_length = 255, unique = True)
+    books = models.ManyToManyField(Book)
+
+    def __str__(self):
+        return (f"{self.name}")
+
 class Member(models.Model):
     first_name = models.CharField(max_length = 100)
     last_name = models.CharField(max_length = 100)
@@ -29,7 +70,62 @@ class Member(models.Model):
         return (f"Member {self.id}: {self.last_name}, {self.first_name} <{self.email}>")
     
 class Loan(models.Model):
-    member = models.ForeignKey(Member, on_delete=models.PROTECT)
+    member = models.ForeignKey(Member, on_delete=models.PROTECT, related_name='loans')
     book = models.ForeignKey(Book, on_delete=models.PROTECT)
     start_at = models.DateField()
-    end_at = models.DateField()
\ No newline at end of file
+    end_at = models.DateField()
+    returned_at = models.DateField(null = True, blank = True)
+
+    class Meta:
+        indexes = [
+            # Serves overlap queries for a set of books over a date range.
+            models.Index(fields = ['book', 'start_at', 'end_at'], name = 'loans_loan_book_interval'),
+            # Serves the overdue query, grouped by member: only loans not
+            # returned yet are indexed, so it reads no returned loans.
+            models.Index(
+                fields = ['member', 'end_at'],
+                condition = models.Q(returned_at__isnull = True),
+                name = 'loans_loan_open_by_member',
+            ),
+        ]
+
+class LoanStats(models.Model):
+    """Loan counts of one member, kept up to date by loans.loan_stats."""
+    member = models.OneToOneField(Member, on_delete = models.CASCADE, primary_key = True, related_name = 'loan_stats')
+    total_loans = models.PositiveIntegerField(default = 0)
+    # Loans not returned yet.
+    active_loans = models.PositiveIntegerField(default = 0)
+    # Active loans past their end date on counted_on.
+    overdue_loans = models.PositiveIntegerField(default = 0)
+    # Earliest end date of the active loans: before today means overdue.
+    next_due_at = models.DateField(null = True, blank = True, db_index = True)
+    counted_on = models.DateField()
+
+    def __str__(self):
+        return (f"{self.member_id}: {self.active_loans} active, {self.overdue_loans} overdue of {self.total_loans} loans")
+
+class CatalogRollup(models.Model):
+    """Number of books per value of one catalog statistic, kept up to date by loans.rollups."""
+    kind = models.CharField(max_length = 20)
+    key = models.CharField(max_length = 255)
+    books = models.BigIntegerField(default = 0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields = ['kind', 'key'], name = 'loans_catalogrollup_kind_key'),
+        ]
+        indexes = [
+            # Serves the largest values of a statistic, such as the top authors.
+            models.Index(fields = ['kind', '-books'], name = 'loans_catalogrollup_top'),
+        ]
+
+    def __str__(self):
+        return (f"{self.kind} {self.key}: {self.books} books")
+
+class RowCount(models.Model):
+    """Exact number of rows in another table, kept up to date by loans.counters."""
+    table = models.CharField(max_length = 100, primary_key = True)
+    rows = models.BigIntegerField(default = 0)
+
+    def __str__(self):
+        return (f"{self.table}: {self.rows} rows")
@@ -0,0 +1,156 @@
+from django.core.paginator import Page, Paginator
+from django.db.models import QuerySet
+from django.utils.functional import cached_property
+
+from loans.counters import aget_row_count, get_row_count
+
+
+class WindowedPage(Page):
+    """A numbered page that also exposes primary key cursors and an elided page range."""
+
+    @property
+    def elided_page_range(self):
+        return self.paginator.get_elided_page_range(self.number, on_each_side=2, on_ends=1)
+
+    @property
+    def next_cursor(self):
+        return self[len(self) - 1].pk if len(self) else None
+
+    @property
+    def previous_cursor(self):
+        return self[0].pk if len(self) else None
+
+
+class WindowedPaginator(Paginator):
+    def _get_page(self, *args, **kwargs):
+        return WindowedPage(*args, **kwargs)
+
+
+class CountedPaginator(WindowedPaginator):
+    """A paginator that takes the size of an unfiltered table from its RowCount.
+
+    Filtered querysets, and tables without a counter, fall back to COUNT(*).
+    """
+
+    @cached_property
+    def count(self):
+        if self.uses_row_count():
+            rows = get_row_count(self.object_list.model)
+            if rows is not None:
+                return rows
+        return super().count
+
+    def uses_row_count(self):
+        queryset = self.object_list
+        return isinstance(queryset, QuerySet) and not queryset.query.has_filters() and not queryset.query.distinct and not queryset.query.is_sliced
+
+    async def aget_page(self, number):
+        """``get_page`` for async views: the count and the page's rows are fetched with the async ORM."""
+        rows = await aget_row_count(self.object_list.model) if self.uses_row_count() else None
+        self.count = rows if rows is not None else await self.object_list.acount()
+        page_object = self.get_page(number)
+        page_object.object_list = [row async for row in page_object.object_list]
+        return page_object
+
+
+class KeysetPage:
+    """A page located by seeking on the primary key instead of by OFFSET.
+
+    Keyset pages have no page number and never count the whole table, so the
+    cost of fetching a page does not depend on how deep into the list it is.
+    """
+    number = None
+    paginator = None
+    elided_page_range = ()
+
+    def __init__(self, object_list, has_next, has_previous):
+        self.object_list = object_list
+        self._has_next = has_next
+        self._has_previous = has_previous
+
+    def __repr__(self):
+        return f"<KeysetPage {self.previous_cursor}..{self.next_cursor}>"
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
+
+    def has_other_pages(self):
+        return self._has_next or self._has_previous
+
+    @property
+    def next_cursor(self):
+        return self.object_list[-1].pk if self.object_list else None
+
+    @property
+    def previous_cursor(self):
+        return self.object_list[0].pk if self.object_list else None
+
+
+def parse_cursor(value):
+    """Return the cursor in a query string value as an int, or None if it is missing or malformed."""
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def get_keyset_window(queryset, per_page, after=None, before=None):
+    """Return the rows a keyset page shows plus the one beyond it in the direction of travel.
+
+    The rows come back in travel order, so a ``before`` window is newest first.
+    """
+    queryset = queryset.order_by('pk')
+    if before is not None:
+        return queryset.filter(pk__lt=before).order_by('-pk')[:per_page + 1]
+    if after is not None:
+        queryset = queryset.filter(pk__gt=after)
+    return queryset[:per_page + 1]
+
+
+def get_keyset_page(queryset, per_page, after=None, before=None):
+    """Return the page of ``queryset`` that follows ``after`` or precedes ``before``.
+
+    Rows are ordered by primary key.  One extra row is fetched to find out whether
+    there is another page in the direction of travel; the other direction is
+    answered with a single indexed EXISTS query.
+    """
+    rows = list(get_keyset_window(queryset, per_page, after=after, before=before))
+    has_more = len(rows) > per_page
+    rows = rows[:per_page]
+    queryset = queryset.order_by('pk')
+    if before is not None:
+        rows.reverse()
+        has_previous = has_more
+        has_next = queryset.filter(pk__gte=before).exists()
+    else:
+        has_previous = after is not None and queryset.filter(pk__lte=after).exists()
+        has_next = has_more
+    return KeysetPage(rows, has_next, has_previous)
+
+
+async def aget_keyset_page(queryset, per_page, after=None, before=None):
+    """``get_keyset_page`` with the async ORM."""
+    rows = [row async for row in get_keyset_window(queryset, per_page, after=after, before=before)]
+    has_more = len(rows) > per_page
+    rows = rows[:per_page]
+    queryset = queryset.order_by('pk')
+    if before is not None:
+        rows.reverse()
+        has_previous = has_more
+        has_next = await queryset.filter(pk__gte=before).aexists()
+    else:
+        has_previous = after is not None and await queryset.filter(pk__lte=after).aexists()
+        has_next = has_more
+    return KeysetPage(rows, has_next, has_previous)
@@ -0,0 +1,156 @@
+"""Read/write splitting between the primary database and a read-only SQLite replica.
+
+``PrimaryReplicaRouter`` sends reads of ``loans`` models to
+``REPLICA_DATABASE_ALIAS`` and writes to the primary.  Replica reads are only
+used while ``ReplicaMiddleware`` allows them: during GET and HEAD requests, and
+not once the request has written anything, so a request always reads its own
+writes.  The middleware also sets a short-lived cookie after a write, so the
+page a form redirects to is read from the primary too.
+
+Outside requests (management commands, the shell, migrations) everything uses
+the primary.  The replica file is a copy made by ``manage.py refresh_replica``.
+"""
+from contextvars import ContextVar
+import os
+import sqlite3
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+PIN_COOKIE = 'primary_pin'
+
+reads_from_replica = ContextVar('reads_from_replica', default=False)
+
+
+def get_replica_alias():
+    alias = settings.REPLICA_DATABASE_ALIAS
+    return alias if alias in settings.DATABASES else None
+
+
+def pin_to_primary():
+    reads_from_replica.set(False)
+
+
+class PrimaryReplicaRouter:
+    def db_for_read(self, model, **hints):
+        alias = get_replica_alias()
+        if (
+            alias is not None
+            and model._meta.app_label == 'loans'
+            and reads_from_replica.get()
+            and not connections[DEFAULT_DB_ALIAS].in_atomic_block
+        ):
+            return alias
+        return None
+
+    def db_for_write(self, model, **hints):
+        if model._meta.app_label != 'loans':
+            return None
+        pin_to_primary()
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, get_replica_alias()}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, **hints):
+        # The replica is a copy of the primary, schema included.
+        if db == get_replica_alias():
+            return False
+        return None
+
+
+def routed(content, value):
+    """Keep replica routing as it was for the view while a streaming response is consumed."""
+    previous = reads_from_replica.get()
+    reads_from_replica.set(value)
+    try:
+        yield from content
+    finally:
+        reads_from_replica.set(previous)
+
+
+class ReplicaMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        allowed = replica_allowed(request)
+        token = reads_from_replica.set(allowed)
+        try:
+            response = self.get_response(request)
+            wrote = allowed and not reads_from_replica.get()
+            if response.streaming and not response.is_async:
+                response.streaming_content = routed(response.streaming_content, reads_from_replica.get())
+        finally:
+            reads_from_replica.reset(token)
+        return pin_response(request, response, wrote)
+
+    async def __acall__(self, request):
+        # sync_to_async copies context variables back after each call, so a
+        # write made in a thread still pins the rest of this request.
+        allowed = replica_allowed(request)
+        token = reads_from_replica.set(allowed)
+        try:
+            response = await self.get_response(request)
+            wrote = allowed and not reads_from_replica.get()
+        finally:
+            reads_from_replica.reset(token)
+        return pin_response(request, response, wrote)
+
+
+def replica_allowed(request):
+    return request.method in ('GET', 'HEAD') and PIN_COOKIE not in request.COOKIES
+
+
+def pin_response(request, response, wrote):
+    if wrote or request.method not in ('GET', 'HEAD'):
+        response.set_cookie(PIN_COOKIE, '1', max_age=settings.REPLICA_PIN_SECONDS, httponly=True, samesite='Lax')
+    return response
+
+
+def tune_connection(sender, connection, **kwargs):
+    """Apply ``SQLITE_CONNECTION_PROFILE`` to each new SQLite connection.
+
+    The pragmas go straight to the sqlite3 connection, so they are not logged
+    or counted as queries.  Replica connections keep the copy's journal mode
+    and are made read-only.
+    """
+    if connection.vendor != 'sqlite':
+        return
+    pragmas = dict(settings.SQLITE_CONNECTION_PROFILE)
+    if connection.alias == get_replica_alias():
+        pragmas.pop('journal_mode', None)
+        pragmas['query_only'] = 'ON'
+    for name, value in pragmas.items():
+        connection.connection.execute(f'PRAGMA {name} = {value}')
+
+
+def backup_database(source, path, pages=1024, progress=None):
+    """Copy the SQLite database behind ``source`` to ``path`` with the online backup API.
+
+    The copy is written next to ``path`` and moved into place once complete, so
+    replica connections see either the old file or the new one.  It is switched
+    out of WAL mode, as it is only ever read.
+    """
+    temporary = f'{path}.tmp'
+    if os.path.exists(temporary):
+        os.remove(temporary)
+    source.ensure_connection()
+    destination = sqlite3.connect(temporary)
+    try:
+        source.connection.backup(destination, pages=pages, progress=progress)
+        destination.execute('PRAGMA journal_mode = DELETE')
+    finally:
+        destination.close()
+    os.replace(temporary, path)
@@ -0,0 +1,122 @@
+"""Precomputed catalog statistics for the stats page.
+
+``CatalogRollup`` holds the number of books per publication year, per
+author (see ``loans.authors``) and per month the book was added in.  Every write to a book
+moves the affected rows by delta: signals cover ``save()`` and ``delete()``,
+and the bulk paths (imports, seeding, bulk edits and deletes, the edit form's
+conditional update) call ``adjust_rollups`` with the rows they wrote.  The
+stats page therefore reads a few hundred small rows instead of grouping the
+whole book table.
+
+The migration that adds the table fills it, so a row that is missing when a
+delta arrives stands for no books and is inserted with the delta itself.
+``manage.py rebuild_rollups`` recounts everything.
+"""
+from collections import Counter
+from itertools import accumulate
+
+from django.db import connections, router, transaction
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce, ExtractYear, TruncMonth
+from django.utils import timezone
+
+from loans.helpers import author_sort_key, split_authors
+from loans.models import Author, Book, CatalogRollup
+
+YEAR = 'year'
+AUTHORS = 'authors'
+MONTH = 'month'
+KEY_FIELDS = ['authors', 'publication_date', 'created_at']
+TOP_AUTHORS = 10
+BATCH_SIZE = 500
+# SQLite allows 999 bound parameters per statement, three per row.
+ROWS_PER_STATEMENT = 300
+
+
+def rollup_keys(authors, publication_date, created_at):
+    """Return the ``(kind, key)`` of each rollup row one book counts towards.
+
+    A book counts once towards each author it names, keyed like ``Author`` on
+    the author's sort key.
+    """
+    return [
+        # publication_date may still be the ISO string it was given as.
+        (YEAR, str(publication_date)[:4]),
+        *((AUTHORS, author_sort_key(name)) for name in split_authors(authors)),
+        (MONTH, timezone.localtime(created_at).strftime('%Y-%m')),
+    ]
+
+
+def adjust_rollups(added=(), removed=()):
+    """Move the rollups by the books ``added`` and ``removed``.
+
+    Both are iterables of ``(authors, publication_date, created_at)``; a book
+    that changed appears in both, with its old values in ``removed``.  The
+    deltas are applied as one upsert per ``ROWS_PER_STATEMENT`` keys.
+    """
+    deltas = Counter()
+    for values in added:
+        deltas.update(rollup_keys(*values))
+    for values in removed:
+        deltas.subtract(rollup_keys(*values))
+    rows = [(kind, key, delta) for (kind, key), delta in deltas.items() if delta]
+    if not rows:
+        return
+    using = connections[router.db_for_write(CatalogRollup)]
+    table = using.ops.quote_name(CatalogRollup._meta.db_table)
+    kind, key, books = (using.ops.quote_name(CatalogRollup._meta.get_field(name).column) for name in ('kind', 'key', 'books'))
+    with using.cursor() as cursor:
+        for start in range(0, len(rows), ROWS_PER_STATEMENT):
+            chunk = rows[start:start + ROWS_PER_STATEMENT]
+            cursor.execute(
+                f"INSERT INTO {table} ({kind}, {key}, {books}) VALUES {', '.join(['(%s, %s, %s)'] * len(chunk))} "
+                f"ON CONFLICT ({kind}, {key}) DO UPDATE SET {books} = {table}.{books} + excluded.{books}",
+                [value for row in chunk for value in row],
+            )
+
+
+def get_key_values(queryset):
+    """Return the ``KEY_FIELDS`` of the books in ``queryset``, for ``adjust_rollups``."""
+    return list(queryset.values_list(*KEY_FIELDS))
+
+
+def rebuild_rollups():
+    """Recount every rollup from the book table; return the number of rows written."""
+    books = Book.objects.order_by()
+    rollups = [
+        CatalogRollup(kind=YEAR, key=f"{row['year']:04d}", books=row['books'])
+        for row in books.values(year=ExtractYear('publication_date')).annotate(books=Count('id'))
+    ]
+    rollups += [
+        CatalogRollup(kind=AUTHORS, key=row['author__sort_key'], books=row['books'])
+        for row in Author.books.through.objects.order_by().values('author__sort_key').annotate(books=Count('book_id'))
+    ]
+    rollups += [
+        CatalogRollup(kind=MONTH, key=timezone.localtime(row['month']).strftime('%Y-%m'), books=row['books'])
+        for row in books.values(month=TruncMonth('created_at')).annotate(books=Count('id'))
+    ]
+    with transaction.atomic():
+        CatalogRollup.objects.all().delete()
+        CatalogRollup.objects.bulk_create(rollups, batch_size=BATCH_SIZE)
+    return len(rollups)
+
+
+def get_catalog_stats(top_authors=TOP_AUTHORS):
+    """Return the rollups the stats page shows, read in three queries."""
+    rollups = CatalogRollup.objects.filter(books__gt=0)
+    years = list(rollups.filter(kind=YEAR).order_by('key').values_list('key', 'books'))
+    # The author's name is read through the unique sort key, in the same query.
+    name = Subquery(Author.objects.filter(sort_key=OuterRef('key')).values('name')[:1])
+    authors = list(
+        rollups.filter(kind=AUTHORS).order_by('-books', 'key')
+        .annotate(name=Coalesce(name, 'key')).values_list('name', 'books')[:top_authors]
+    )
+    months = list(rollups.filter(kind=MONTH).order_by('key').values_list('key', 'books'))
+    totals = list(accumulate(books for month, books in months))
+    return {
+        'years': years,
+        'most_books_in_a_year': max((books for year, books in years), default=0),
+        'authors': authors,
+        'growth': [(month, books, total) for (month, books), total in zip(months, totals)],
+        'total': totals[-1] if totals else 0,
+    }
@@ -0,0 +1,162 @@
+"""Full-text search over book titles and authors, backed by an SQLite FTS5 table.
+
+``loans_book_fts`` is an external-content FTS5 table: it stores only the index
+and reads the text back from ``loans_book``.  Triggers on ``loans_book`` keep it
+in step with every write, including ``bulk_create`` and queryset updates that
+bypass model signals.
+"""
+import re
+
+from django.db import connection
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+SEARCH_TABLE = 'loans_book_fts'
+
+CREATE_TABLE = f"""
+CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} USING fts5(
+    title, authors,
+    content='loans_book', content_rowid='id',
+    tokenize='unicode61 remove_diacritics 2'
+)
+"""
+
+CREATE_TRIGGERS = [
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {SEARCH_TABLE}_ai AFTER INSERT ON loans_book BEGIN
+        INSERT INTO {SEARCH_TABLE}(rowid, title, authors) VALUES (new.id, new.title, new.authors);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {SEARCH_TABLE}_ad AFTER DELETE ON loans_book BEGIN
+        INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}, rowid, title, authors) VALUES ('delete', old.id, old.title, old.authors);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {SEARCH_TABLE}_au AFTER UPDATE OF title, authors ON loans_book BEGIN
+        INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}, rowid, title, authors) VALUES ('delete', old.id, old.title, old.authors);
+        INSERT INTO {SEARCH_TABLE}(rowid, title, authors) VALUES (new.id, new.title, new.authors);
+    END
+    """,
+]
+
+DROP_STATEMENTS = [
+    f"DROP TRIGGER IF EXISTS {SEARCH_TABLE}_ai",
+    f"DROP TRIGGER IF EXISTS {SEARCH_TABLE}_ad",
+    f"DROP TRIGGER IF EXISTS {SEARCH_TABLE}_au",
+    f"DROP TABLE IF EXISTS {SEARCH_TABLE}",
+]
+
+# Control characters cannot occur in titles entered through the form, so they
+# are safe markers for highlight() before the text is HTML-escaped.
+HIGHLIGHT_START = '\x02'
+HIGHLIGHT_END = '\x03'
+
+TERM_PATTERN = re.compile(r'\w+')
+
+
+def is_supported(using=connection):
+    return using.vendor == 'sqlite'
+
+
+def install_search_index(using=connection):
+    """Create the FTS table and its triggers if they are missing.
+
+    Django rebuilds ``loans_book`` from scratch for some schema changes on
+    SQLite, which drops the triggers with it, so this runs after every migrate.
+    """
+    if not is_supported(using):
+        return
+    with using.cursor() as cursor:
+        cursor.execute(CREATE_TABLE)
+        for statement in CREATE_TRIGGERS:
+            cursor.execute(statement)
+
+
+def uninstall_search_index(using=connection):
+    if not is_supported(using):
+        return
+    with using.cursor() as cursor:
+        for statement in DROP_STATEMENTS:
+            cursor.execute(statement)
+
+
+def rebuild_search_index(using=connection, optimize=True):
+    """Re-read every book into the index and optionally merge its b-trees."""
+    install_search_index(using)
+    with using.cursor() as cursor:
+        cursor.execute(f"INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}) VALUES ('rebuild')")
+        if optimize:
+            cursor.execute(f"INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}) VALUES ('optimize')")
+
+
+def build_match_expression(query):
+    """Turn free text into an FTS5 expression that matches all of its words.
+
+    Every word is quoted, so characters that mean something to FTS5 (quotes,
+    ``*``, ``-``, ``NEAR``...) are searched for literally instead of raising a
+    syntax error.
+    """
+    return ' '.join(f'"{term}"' for term in TERM_PATTERN.findall(query))
+
+
+def highlight(text):
+    text = escape(text)
+    return mark_safe(text.replace(HIGHLIGHT_START, '<mark>').replace(HIGHLIGHT_END, '</mark>'))
+
+
+class SearchResult:
+    def __init__(self, pk, title, authors, rank):
+        self.pk = pk
+        self.title = highlight(title)
+        self.authors = highlight(authors)
+        self.rank = rank
+
+    def __repr__(self):
+        return f"<SearchResult {self.pk} rank={self.rank}>"
+
+    @property
+    def cursor(self):
+        return f"{self.rank!r}:{self.pk}"
+
+
+def parse_search_cursor(value):
+    """Return the ``(rank, pk)`` pair encoded in a search cursor, or None."""
+    try:
+        rank, pk = value.split(':')
+        return float(rank), int(pk)
+    except (AttributeError, ValueError):
+        return None
+
+
+def search_books(query, limit=25, after=None, using=connection):
+    """Return up to ``limit`` books matching ``query``, best match first.
+
+    Results are ordered by bm25 rank and then primary key, and ``after`` is the
+    ``(rank, pk)`` of the last result on the previous page, so later pages seek
+    instead of skipping rows.  Returns ``(results, has_next)``.
+    """
+    expression = build_match_expression(query)
+    if not expression:
+        return [], False
+    sql = f"""
+        SELECT rowid, title, authors, rank FROM (
+            SELECT rowid,
+                   highlight({SEARCH_TABLE}, 0, %s, %s) AS title,
+                   highlight({SEARCH_TABLE}, 1, %s, %s) AS authors,
+                   bm25({SEARCH_TABLE}) AS rank
+            FROM {SEARCH_TABLE}
+            WHERE {SEARCH_TABLE} MATCH %s
+        )
+    """
+    params = [HIGHLIGHT_START, HIGHLIGHT_END, HIGHLIGHT_START, HIGHLIGHT_END, expression]
+    if after is not None:
+        sql += " WHERE rank > %s OR (rank = %s AND rowid > %s)"
+        params += [after[0], after[0], after[1]]
+    sql += " ORDER BY rank, rowid LIMIT %s"
+    params.append(limit + 1)
+    with using.cursor() as cursor:
+        cursor.execute(sql, params)
+        rows = cursor.fetchall()
+    results = [SearchResult(*row) for row in rows[:limit]]
+    return results, len(rows) > limit
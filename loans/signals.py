@@ -0,0 +1,79 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from loans.authors import link_authors
+from loans.cache import bump_loans_version, invalidate_book
+from loans.counters import adjust_row_count
+from loans.loan_stats import count_member_loans
+from loans.models import Book, Loan, Member
+from loans.rollups import adjust_rollups, get_key_values
+
+
+@receiver(post_save, sender=Book)
+def book_saved(sender, instance, **kwargs):
+    invalidate_book(instance.pk)
+
+
+@receiver(post_delete, sender=Book)
+def book_deleted(sender, instance, **kwargs):
+    invalidate_book(instance.pk, deleted=True)
+
+
+@receiver(pre_save, sender=Book)
+def remember_stored_values(sender, instance, **kwargs):
+    # post_save only sees the new values; an update moves the old ones out.
+    instance._stored_values = [] if instance._state.adding else get_key_values(Book.objects.filter(pk=instance.pk))
+
+
+@receiver(post_save, sender=Book)
+def roll_up_saved_book(sender, instance, **kwargs):
+    added = [(instance.authors, instance.publication_date, instance.created_at)]
+    adjust_rollups(added=added, removed=getattr(instance, '_stored_values', []))
+
+
+@receiver(post_save, sender=Book)
+def link_saved_book(sender, instance, **kwargs):
+    stored = getattr(instance, '_stored_values', [])
+    if not stored or stored[0][0] != instance.authors:
+        link_authors([(instance.pk, instance.authors)])
+
+
+@receiver(post_delete, sender=Book)
+def roll_up_deleted_book(sender, instance, **kwargs):
+    adjust_rollups(removed=[(instance.authors, instance.publication_date, instance.created_at)])
+
+
+@receiver(post_save, sender=Book)
+@receiver(post_save, sender=Member)
+@receiver(post_save, sender=Loan)
+def count_created_row(sender, instance, created, **kwargs):
+    if created:
+        adjust_row_count(sender, 1)
+
+
+@receiver(post_delete, sender=Book)
+@receiver(post_delete, sender=Member)
+@receiver(post_delete, sender=Loan)
+def count_deleted_row(sender, instance, **kwargs):
+    adjust_row_count(sender, -1)
+
+
+@receiver(post_save, sender=Loan)
+@receiver(post_delete, sender=Loan)
+def loan_changed(sender, instance, **kwargs):
+    bump_loans_version()
+
+
+@receiver(pre_save, sender=Loan)
+def remember_stored_member(sender, instance, **kwargs):
+    # A loan moved to another member leaves the old member's stats behind.
+    instance._stored_member_id = None if instance._state.adding else (
+        Loan.objects.filter(pk=instance.pk).values_list('member_id', flat=True).first()
+    )
+
+
+@receiver(post_save, sender=Loan)
+@receiver(post_delete, sender=Loan)
+def recount_member_loans(sender, instance, **kwargs):
+    member_ids = {instance.member_id, getattr(instance, '_stored_member_id', None)} - {None}
+    count_member_loans(sorted(member_ids))
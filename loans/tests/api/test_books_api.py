@@ -0,0 +1,104 @@
+from django.test import TestCase
+from django.urls import reverse
+
+from loans.models import Book
+
+import datetime
+import gzip
+
+class BooksApiTestCase(TestCase):
+    def setUp(self):
+        self.url = reverse('api_list_books')
+        self.books = [
+            Book.objects.create(
+                authors = "Doe, J.",
+                title = f"Title {number}",
+                publication_date = datetime.date(2024, 9, number),
+                isbn = f"{number:013d}"
+            )
+            for number in range(1, 8)
+        ]
+
+    def test_api_urls(self):
+        self.assertEqual(self.url, '/api/books/')
+        self.assertEqual(reverse('api_get_book', kwargs={'book_id': 3}), '/api/books/3/')
+
+    def test_list_books(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/json')
+        data = response.json()
+        self.assertEqual(len(data['results']), 7)
+        self.assertIsNone(data['next'])
+        self.assertEqual(data['results'][0]['title'], "Title 1")
+        self.assertEqual(data['results'][0]['publication_date'], "2024-09-01")
+        self.assertEqual(set(data['results'][0]), {'id', 'authors', 'title', 'publication_date', 'isbn', 'updated_at'})
+
+    def test_field_projection_narrows_the_select(self):
+        with self.assertNumQueries(1) as context:
+            response = self.client.get(self.url, {'fields': 'title'})
+        self.assertEqual(response.json()['results'][0], {'title': "Title 1"})
+        self.assertNotIn('authors', context.captured_queries[0]['sql'])
+
+    def test_unknown_field_is_rejected(self):
+        response = self.client.get(self.url, {'fields': 'title,password'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('password', response.json()['error'])
+
+    def test_keyset_pagination(self):
+        response = self.client.get(self.url, {'limit': 3, 'fields': 'id'})
+        data = response.json()
+        self.assertEqual([row['id'] for row in data['results']], [book.pk for book in self.books[:3]])
+        response = self.client.get(data['next'])
+        data = response.json()
+        self.assertEqual([row['id'] for row in data['results']], [book.pk for book in self.books[3:6]])
+        data = self.client.get(data['next']).json()
+        self.assertEqual([row['id'] for row in data['results']], [self.books[6].pk])
+        self.assertIsNone(data['next'])
+
+    def test_next_link_keeps_projection(self):
+        data = self.client.get(self.url, {'limit': 3, 'fields': 'title'}).json()
+        self.assertIn('fields=title', data['next'])
+        self.assertEqual(self.client.get(data['next']).json()['results'][0], {'title': "Title 4"})
+
+    def test_invalid_limit(self):
+        self.assertEqual(self.client.get(self.url, {'limit': 0}).status_code, 400)
+        self.assertEqual(self.client.get(self.url, {'limit': 'x'}).status_code, 400)
+
+    def test_batch_get_uses_one_query(self):
+        ids = [self.books[4].pk, self.books[1].pk, 999]
+        with self.assertNumQueries(1) as context:
+            response = self.client.get(self.url, {'ids': ','.join(str(book_id) for book_id in ids), 'fields': 'id,title'})
+        self.assertIn(' IN ', context.captured_queries[0]['sql'])
+        data = response.json()
+        self.assertEqual(data['results'], [
+            {'id': self.books[4].pk, 'title': "Title 5"},
+            {'id': self.books[1].pk, 'title': "Title 2"},
+        ])
+        self.assertEqual(data['missing'], [999])
+
+    def test_batch_get_with_bad_ids(self):
+        self.assertEqual(self.client.get(self.url, {'ids': '1,a'}).status_code, 400)
+        self.assertEqual(self.client.get(self.url, {'ids': ','.join(str(i) for i in range(600))}).status_code, 400)
+
+    def test_get_book(self):
+        book = self.books[2]
+        response = self.client.get(reverse('api_get_book', kwargs={'book_id': book.pk}), {'fields': 'isbn,title'})
+        self.assertEqual(response.json(), {'isbn': book.isbn, 'title': book.title})
+
+    def test_get_missing_book(self):
+        response = self.client.get(reverse('api_get_book', kwargs={'book_id': 999}))
+        self.assertEqual(response.status_code, 404)
+        self.assertIn('error', response.json())
+
+    def test_responses_are_gzipped_when_accepted(self):
+        Book.objects.bulk_create([
+            Book(authors="Doe, J.", title="x" * 100, publication_date=datetime.date(2024, 9, 1), isbn=f"{number:013d}", isbn_key=number)
+            for number in range(10, 60)
+        ])
+        response = self.client.get(self.url, {'limit': 50}, HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn(b'"results"', gzip.decompress(response.content))
+
+    def test_api_is_read_only(self):
+        self.assertEqual(self.client.post(self.url).status_code, 405)
@@ -0,0 +1,102 @@
+from django.core.management import call_command
+from django.templatetags.static import static
+from django.test import SimpleTestCase, override_settings
+from django.urls import reverse
+
+from loans import assets
+
+from io import StringIO
+from unittest import skipUnless
+import gzip
+import os
+import shutil
+import tempfile
+
+MANIFEST_STORAGES = {
+    'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+    'staticfiles': {'BACKEND': 'loans.assets.CompressedManifestStaticFilesStorage'},
+}
+
+class AssetsTestCase(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.static_root = tempfile.mkdtemp()
+        cls.addClassCleanup(shutil.rmtree, cls.static_root)
+        cls.enterClassContext(override_settings(STATIC_ROOT=cls.static_root, STORAGES=MANIFEST_STORAGES))
+        call_command('collectstatic', interactive=False, verbosity=0, stdout=StringIO())
+        cls.css_url = static('vendor/bootstrap-5.3.3/css/bootstrap.min.css')
+
+    def path(self, url):
+        return os.path.join(self.static_root, url.removeprefix('/static/'))
+
+    def test_collected_names_are_hashed(self):
+        self.assertRegex(self.css_url, r'^/static/vendor/bootstrap-5\.3\.3/css/bootstrap\.min\.[0-9a-f]{12}\.css$')
+        with open(self.path(static('custom.css')), encoding='utf-8') as custom:
+            self.assertRegex(custom.read(), r'images/library\.[0-9a-f]{12}\.jpg')
+
+    def test_text_files_are_precompressed(self):
+        with open(self.path(self.css_url), 'rb') as original, open(self.path(self.css_url) + '.gz', 'rb') as compressed:
+            self.assertEqual(gzip.decompress(compressed.read()), original.read())
+        self.assertTrue(os.path.exists(self.path(static('custom.css')) + '.gz'))
+
+    def test_compressed_formats_are_left_alone(self):
+        self.assertFalse(os.path.exists(self.path(static('images/library.jpg')) + '.gz'))
+        self.assertFalse(os.path.exists(self.path(static('vendor/bootstrap-icons-1.11.3/font/fonts/bootstrap-icons.woff2')) + '.gz'))
+
+    def test_serves_gzip_to_clients_that_accept_it(self):
+        response = self.client.get(self.css_url, headers={'Accept-Encoding': 'gzip, deflate'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(response['Content-Type'], 'text/css')
+        self.assertEqual(response['Vary'], 'Accept-Encoding')
+        body = gzip.decompress(b''.join(response.streaming_content))
+        self.assertTrue(body.startswith(b'@charset "UTF-8";/*!\n * Bootstrap  v5.3.3'))
+
+    def test_serves_the_original_otherwise(self):
+        for accept_encoding in ('', 'identity', 'gzip;q=0'):
+            response = self.client.get(self.css_url, headers={'Accept-Encoding': accept_encoding})
+            self.assertNotIn('Content-Encoding', response)
+            self.assertEqual(int(response['Content-Length']), os.path.getsize(self.path(self.css_url)))
+            response.close()
+
+    @skipUnless(assets.brotli, "brotli is not installed")
+    def test_prefers_brotli(self):
+        response = self.client.get(self.css_url, headers={'Accept-Encoding': 'gzip, br'})
+        self.assertEqual(response['Content-Encoding'], 'br')
+        response.close()
+
+    def test_hashed_names_are_immutable(self):
+        response = self.client.get(self.css_url)
+        self.assertEqual(response['Cache-Control'], 'public, max-age=31536000, immutable')
+        response.close()
+        response = self.client.get('/static/custom.css')
+        self.assertEqual(response['Cache-Control'], 'public, no-cache')
+        response.close()
+
+    def test_unmodified_file_is_not_sent_again(self):
+        response = self.client.get(self.css_url)
+        response.close()
+        response = self.client.get(self.css_url, headers={'If-Modified-Since': response['Last-Modified']})
+        self.assertEqual(response.status_code, 304)
+
+    def test_missing_and_outside_files_are_404(self):
+        for url in ('/static/missing.css', '/static/../manage.py', f'{self.css_url}.gz'):
+            self.assertEqual(self.client.get(url).status_code, 404)
+
+    def test_only_safe_methods(self):
+        self.assertEqual(self.client.post(self.css_url).status_code, 405)
+
+    def test_pages_use_the_vendored_assets(self):
+        with override_settings(STORAGES=MANIFEST_STORAGES):
+            response = self.client.get(reverse('welcome'))
+        self.assertNotContains(response, 'cdn.jsdelivr.net')
+        self.assertContains(response, self.css_url)
+        self.assertContains(response, static('vendor/bootstrap-5.3.3/js/bootstrap.bundle.min.js'))
+
+class AcceptedEncodingsTestCase(SimpleTestCase):
+    def test_parses_qualities(self):
+        self.assertEqual(assets.accepted_encodings('gzip, deflate, br'), {'gzip', 'deflate', 'br'})
+        self.assertEqual(assets.accepted_encodings('br;q=0, GZIP;q=0.5'), {'gzip'})
+        self.assertEqual(assets.accepted_encodings('gzip;q=x'), set())
+        self.assertEqual(assets.accepted_encodings(''), set())
@@ -0,0 +1,105 @@
+from asgiref.sync import sync_to_async
+from django.core.cache import caches
+from django.test import TestCase, override_settings
+from django.urls import resolve, reverse
+
+from loans import async_views
+from loans.models import Book, Loan, Member
+
+import datetime
+
+@override_settings(ITEMS_PER_PAGE=5, ROOT_URLCONF='my_library.asgi_urls')
+class AsyncViewsTestCase(TestCase):
+    def setUp(self):
+        self.books = [
+            Book.objects.create(
+                authors = "Doe, J.",
+                title = f"Title {number}",
+                publication_date = datetime.date(2024, 9, 1),
+                isbn = f"{number:013d}"
+            )
+            for number in range(1, 13)
+        ]
+        self.book = self.books[0]
+        member = Member.objects.create(first_name="Jane", last_name="Doe", email="jane@example.org")
+        today = datetime.date.today()
+        Loan.objects.create(member=member, book=self.book, start_at=today, end_at=today + datetime.timedelta(days=7))
+
+    def test_read_routes_use_async_views(self):
+        self.assertIs(resolve(reverse('list_books')).func, async_views.list_books)
+        self.assertIs(resolve(reverse('get_book', kwargs={'book_id': 1})).func, async_views.get_book)
+        self.assertIs(resolve(reverse('api_list_books')).func, async_views.api_list_books)
+        self.assertNotIn('async_views', resolve(reverse('create_book')).func.__module__)
+
+    def test_asgi_settings_select_the_async_routes(self):
+        from my_library import settings as wsgi_settings, settings_asgi
+        self.assertEqual(settings_asgi.ROOT_URLCONF, 'my_library.asgi_urls')
+        self.assertEqual(wsgi_settings.ROOT_URLCONF, 'my_library.urls')
+
+    async def assertSameAsSync(self, url, data=None):
+        expected = await self.sync_get(url, data)
+        response = await self.async_client.get(url, data)
+        self.assertEqual(response.status_code, expected.status_code)
+        self.assertEqual(response.content, expected.content)
+        return response
+
+    async def sync_get(self, url, data):
+        with override_settings(ROOT_URLCONF='my_library.urls'):
+            return await sync_to_async(self.client.get)(url, data)
+
+    async def test_list_pages_match_sync_views(self):
+        url = reverse('list_books')
+        response = await self.assertSameAsSync(url)
+        self.assertContains(response, "On loan")
+        await self.assertSameAsSync(url, {'page': 3})
+        await self.assertSameAsSync(url, {'after': self.books[4].pk})
+        await self.assertSameAsSync(url, {'before': self.books[5].pk})
+
+    async def test_detail_pages_match_sync_views(self):
+        await self.assertSameAsSync(reverse('get_book', kwargs={'book_id': self.book.pk}))
+        await self.assertSameAsSync(reverse('get_book_by_isbn', kwargs={'isbn': self.book.isbn}))
+
+    async def test_api_matches_sync_views(self):
+        url = reverse('api_list_books')
+        await self.assertSameAsSync(url, {'limit': 3, 'fields': 'title'})
+        await self.assertSameAsSync(url, {'ids': f'{self.book.pk},999'})
+        await self.assertSameAsSync(url, {'fields': 'password'})
+        await self.assertSameAsSync(reverse('api_get_book', kwargs={'book_id': self.book.pk}))
+
+    async def test_missing_book_is_404(self):
+        response = await self.async_client.get(reverse('get_book', kwargs={'book_id': 999}))
+        self.assertEqual(response.status_code, 404)
+        response = await self.async_client.get(reverse('api_get_book', kwargs={'book_id': 999}))
+        self.assertEqual(response.status_code, 404)
+
+    async def test_unchanged_pages_are_not_modified(self):
+        for url in (reverse('list_books'), reverse('get_book', kwargs={'book_id': self.book.pk})):
+            response = await self.async_client.get(url)
+            self.assertEqual(response.status_code, 200)
+            response = await self.async_client.get(url, headers={'If-None-Match': response['ETag']})
+            self.assertEqual(response.status_code, 304)
+
+    async def test_edit_changes_detail_etag(self):
+        url = reverse('get_book', kwargs={'book_id': self.book.pk})
+        response = await self.async_client.get(url)
+        self.book.title = "A New Title"
+        await self.book.asave()
+        response = await self.async_client.get(url, headers={'If-None-Match': response['ETag']})
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "A New Title")
+
+    @override_settings(CATALOG_CACHE_ENABLED=True, CATALOG_CACHE_STALE_TIMEOUT=0)
+    async def test_pages_are_cached(self):
+        caches['catalog'].clear()
+        self.addCleanup(caches['catalog'].clear)
+        url = reverse('get_book', kwargs={'book_id': self.book.pk})
+        response = await self.async_client.get(url)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        response = await self.async_client.get(url)
+        self.assertEqual(response['X-Cache'], 'HIT')
+        self.assertContains(response, "Title 1")
+        self.book.title = "A New Title"
+        await self.book.asave()
+        response = await self.async_client.get(url)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertContains(response, "A New Title")
@@ -0,0 +1,134 @@
+from django.apps import apps
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from loans import bulk
+from loans.authors import Link, link_authors
+from loans.forms import BookUpdateForm
+from loans.helpers import author_sort_key, split_authors
+from loans.models import Author, Book
+
+from importlib import import_module
+from io import StringIO
+import datetime
+import os
+import tempfile
+
+class AuthorsTestCase(TestCase):
+    def create_book(self, number, authors="Doe, J."):
+        return Book.objects.create(
+            authors = authors,
+            title = f"Title {number}",
+            publication_date = datetime.date(2024, 9, 1),
+            isbn = f"{number:013d}"
+        )
+
+    def linked(self, book):
+        return sorted(Author.objects.filter(books=book).values_list('name', flat=True))
+
+    def assertLinksMatchText(self):
+        for book in Book.objects.all():
+            expected = sorted(author_sort_key(name) for name in split_authors(book.authors))
+            actual = sorted(Author.objects.filter(books=book).values_list('sort_key', flat=True))
+            self.assertEqual(expected, actual, book.authors)
+
+    def test_create_links_each_author(self):
+        book = self.create_book(1, "Doe, J.; Roe, R.")
+        self.assertEqual(self.linked(book), ["Doe, J.", "Roe, R."])
+
+    def test_spellings_share_an_author(self):
+        first = self.create_book(1, "Brontë, C.")
+        second = self.create_book(2, "BRONTE, C")
+        self.assertEqual(Author.objects.count(), 1)
+        self.assertEqual(Author.objects.get().name, "Brontë, C.")
+        self.assertQuerySetEqual(Book.objects.filter(author__sort_key="bronte c").order_by('id'), [first, second])
+
+    def test_save_relinks_changed_authors(self):
+        book = self.create_book(1)
+        book.authors = "Roe, R."
+        book.save()
+        self.assertEqual(self.linked(book), ["Roe, R."])
+        # The author without books is kept for later books.
+        self.assertTrue(Author.objects.filter(name="Doe, J.").exists())
+
+    def test_save_without_author_change_leaves_links(self):
+        book = self.create_book(1)
+        book.title = "Another Title"
+        with CaptureQueriesContext(connection) as context:
+            book.save()
+        self.assertFalse([query for query in context.captured_queries if Link._meta.db_table in query['sql']])
+        self.assertEqual(self.linked(book), ["Doe, J."])
+
+    def test_delete_removes_links(self):
+        self.create_book(1).delete()
+        self.assertFalse(Link.objects.exists())
+
+    def test_edit_form_relinks_authors(self):
+        book = self.create_book(1)
+        Book.objects.filter(pk=book.pk).update(isbn="9780306406157", isbn_key=9780306406157)
+        book.refresh_from_db()
+        form = BookUpdateForm({'authors': "Roe, R. & Poe, E.", 'title': "Title 1", 'publication_date': '2024-09-01', 'isbn': book.isbn}, instance=book)
+        self.assertTrue(form.is_valid())
+        self.assertTrue(form.save_changes())
+        self.assertEqual(self.linked(book), ["Poe, E.", "Roe, R."])
+
+    def test_bulk_update_and_delete_relink(self):
+        books = [self.create_book(number) for number in range(1, 5)]
+        bulk.update_books([book.pk for book in books[:3]], 'authors', "Roe, R.")
+        self.assertEqual(Book.objects.filter(author__name="Roe, R.").count(), 3)
+        self.assertLinksMatchText()
+        bulk.delete_books([book.pk for book in books[:2]])
+        self.assertEqual(Link.objects.count(), 2)
+        self.assertLinksMatchText()
+
+    def test_bulk_update_skips_books_deleted_since_the_selection(self):
+        books = [self.create_book(number) for number in range(1, 3)]
+        self.assertEqual(bulk.update_books([book.pk for book in books] + [999999], 'authors', "Roe, R."), 2)
+        # The links are checked against the books when the transaction commits.
+        connection.check_constraints()
+        self.assertFalse(Link.objects.filter(book_id=999999).exists())
+        self.assertLinksMatchText()
+
+    def test_link_authors_replaces_links(self):
+        book = self.create_book(1)
+        link_authors([(book.pk, "Roe, R.; Poe, E.")])
+        self.assertEqual(self.linked(book), ["Poe, E.", "Roe, R."])
+
+    def test_seed_links_authors(self):
+        call_command('seed', count=12, batch_size=5, seed=1, stdout=StringIO())
+        self.assertEqual(Book.objects.filter(author__isnull=True).count(), 0)
+        self.assertLinksMatchText()
+
+    def test_import_links_authors(self):
+        self.create_book(1)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'books.csv')
+            with open(path, 'w', encoding='utf-8') as file:
+                file.write(
+                    "authors,title,publication_date,isbn\n"
+                    "\"Herbert, F.\",Dune,1965-08-01,9780441013593\n"
+                    "\"Austen, J.\",Emma,1815-12-23,0141439580\n"
+                )
+            call_command('import_books', path, stdout=StringIO())
+            with open(path, 'w', encoding='utf-8') as file:
+                file.write("authors,title,publication_date,isbn\n\"Austen, J.; Doe, J.\",Emma,1815-12-23,0141439580\n")
+            call_command('import_books', path, stdout=StringIO())
+        self.assertEqual(self.linked(Book.objects.get(title="Emma")), ["Austen, J.", "Doe, J."])
+        self.assertLinksMatchText()
+
+    def test_migration_links_unlinked_books(self):
+        linked = self.create_book(1)
+        unlinked = [self.create_book(number, "Roe, R.; Doe, J.") for number in range(2, 5)]
+        Link.objects.filter(book__in=unlinked).delete()
+        migration = import_module('loans.migrations.0013_link_book_authors')
+        with CaptureQueriesContext(connection) as context:
+            migration.link_book_authors(apps, None)
+        self.assertLinksMatchText()
+        self.assertEqual(self.linked(linked), ["Doe, J."])
+        self.assertEqual(Author.objects.count(), 2)
+        # Running it again finds nothing left to link.
+        with CaptureQueriesContext(connection) as rerun:
+            migration.link_book_authors(apps, None)
+        self.assertLess(len(rerun), len(context))
@@ -0,0 +1,122 @@
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from loans.availability import available_between, busy_book_ids, get_availability
+from loans.models import Book, Loan, Member
+
+import datetime
+
+class AvailabilityTestCase(TestCase):
+    def setUp(self):
+        self.today = datetime.date(2025, 3, 10)
+        self.member = Member.objects.create(first_name="Jane", last_name="Doe", email="jane@example.org")
+        self.books = [
+            Book.objects.create(
+                authors = "Doe, J.",
+                title = f"Title {number}",
+                publication_date = datetime.date(2024, 9, 1),
+                isbn = f"{number:013d}"
+            )
+            for number in range(1, 5)
+        ]
+        self.ids = [book.pk for book in self.books]
+
+    def lend(self, book, start_offset, end_offset):
+        return Loan.objects.create(
+            member = self.member,
+            book = book,
+            start_at = self.today + datetime.timedelta(days=start_offset),
+            end_at = self.today + datetime.timedelta(days=end_offset)
+        )
+
+    def day(self, offset):
+        return self.today + datetime.timedelta(days=offset)
+
+    def test_book_without_loans_is_available(self):
+        availability = get_availability(self.ids, on=self.today)
+        self.assertEqual(availability[self.books[0].pk], (True, self.today))
+
+    def test_book_on_loan_is_free_the_day_after_it_ends(self):
+        self.lend(self.books[0], -3, 4)
+        availability = get_availability(self.ids, on=self.today)
+        self.assertEqual(availability[self.books[0].pk], (False, self.day(5)))
+        self.assertTrue(availability[self.books[1].pk].available)
+
+    def test_loan_ending_today_still_covers_today(self):
+        self.lend(self.books[0], -3, 0)
+        self.assertEqual(get_availability(self.ids, on=self.today)[self.books[0].pk], (False, self.day(1)))
+
+    def test_past_and_future_loans_do_not_block_today(self):
+        past = self.lend(self.books[0], -10, -1)
+        past.returned_at = self.day(-1)
+        past.save()
+        self.lend(self.books[0], 2, 5)
+        self.assertEqual(get_availability(self.ids, on=self.today)[self.books[0].pk], (True, self.today))
+
+    def test_back_to_back_loans_are_chained(self):
+        self.lend(self.books[0], -2, 3)
+        self.lend(self.books[0], 4, 8)
+        self.lend(self.books[0], 6, 7)
+        self.lend(self.books[0], 12, 15)
+        self.assertEqual(get_availability(self.ids, on=self.today)[self.books[0].pk], (False, self.day(9)))
+
+    def test_overdue_loans_that_are_not_returned_block(self):
+        self.lend(self.books[0], -10, -1)
+        self.lend(self.books[0], 2, 5)
+        self.assertEqual(get_availability(self.ids, on=self.today)[self.books[0].pk], (False, None))
+
+    def test_returned_loans_do_not_block(self):
+        loan = self.lend(self.books[0], -3, 4)
+        loan.returned_at = self.today
+        loan.save()
+        self.assertEqual(get_availability(self.ids, on=self.today)[self.books[0].pk], (True, self.today))
+        self.assertTrue(available_between(self.ids, self.day(1), self.day(2))[self.books[0].pk])
+
+    def test_availability_for_a_page_is_one_query(self):
+        for book in self.books:
+            self.lend(book, -1, 1)
+        with self.assertNumQueries(1):
+            get_availability(self.ids, on=self.today)
+
+    def test_overlap_queries(self):
+        self.lend(self.books[0], 0, 5)
+        self.lend(self.books[1], 6, 9)
+        with self.assertNumQueries(1):
+            busy = busy_book_ids(self.ids, self.day(5), self.day(6))
+        self.assertEqual(busy, {self.books[0].pk, self.books[1].pk})
+        free = available_between(self.ids, self.day(10), self.day(20))
+        self.assertTrue(all(free.values()))
+        free = available_between(self.ids, self.day(-5), self.day(0))
+        self.assertFalse(free[self.books[0].pk])
+        self.assertTrue(free[self.books[1].pk])
+
+    def test_list_books_shows_availability(self):
+        today = datetime.date.today()
+        Loan.objects.create(member=self.member, book=self.books[0], start_at=today, end_at=today + datetime.timedelta(days=7))
+        response = self.client.get(reverse('list_books'))
+        self.assertContains(response, "Available", count=3)
+        self.assertContains(response, "On loan until")
+        page_object = response.context['page_object']
+        self.assertFalse(page_object[0].availability.available)
+
+    def test_list_books_shows_overdue_loans(self):
+        today = datetime.date.today()
+        Loan.objects.create(member=self.member, book=self.books[0], start_at=today - datetime.timedelta(days=14), end_at=today - datetime.timedelta(days=1))
+        response = self.client.get(reverse('list_books'))
+        self.assertContains(response, "Available", count=3)
+        self.assertContains(response, "Overdue")
+
+    def test_new_loan_changes_list_etag(self):
+        response = self.client.get(reverse('list_books'))
+        today = datetime.date.today()
+        Loan.objects.create(member=self.member, book=self.books[0], start_at=today, end_at=today)
+        response = self.client.get(reverse('list_books'), HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 200)
+
+    @override_settings(CATALOG_CACHE_ENABLED=True)
+    def test_new_loan_invalidates_cached_list(self):
+        self.client.get(reverse('list_books'))
+        today = datetime.date.today()
+        Loan.objects.create(member=self.member, book=self.books[0], start_at=today, end_at=today)
+        response = self.client.get(reverse('list_books'))
+        self.assertContains(response, "On loan until")
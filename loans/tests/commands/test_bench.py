@@ -0,0 +1,60 @@
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase, override_settings
+
+from loans.benchmark import add_member_history, build_cases, compare, get_samples, named_patterns, percentile, run_cases
+
+from io import StringIO
+
+def report(**results):
+    return {'scales': {'1000': results}}
+
+def result(queries=3, p50=10.0, p95=20.0):
+    return {'queries': queries, 'p50_ms': p50, 'p95_ms': p95}
+
+class BenchTestCase(TestCase):
+    def test_percentile_is_nearest_rank(self):
+        samples = list(range(1, 101))
+        self.assertEqual(percentile(samples, 50), 50)
+        self.assertEqual(percentile(samples, 95), 95)
+        self.assertEqual(percentile(samples, 99), 99)
+        self.assertEqual(percentile([7], 99), 7)
+
+    def test_compare_flags_slowdowns_beyond_threshold(self):
+        regressions = compare(report(list_books=result(p50=13.0)), report(list_books=result()), 0.25, 1.0)
+        self.assertEqual([(r.label, r.metric) for r in regressions], [('list_books', 'p50_ms')])
+
+    def test_compare_ignores_small_slowdowns(self):
+        self.assertEqual(compare(report(list_books=result(p50=12.0)), report(list_books=result()), 0.25, 1.0), [])
+        self.assertEqual(compare(report(welcome=result(p50=0.5)), report(welcome=result(p50=0.2)), 0.25, 1.0), [])
+
+    def test_compare_flags_any_extra_query(self):
+        regressions = compare(report(get_book=result(queries=4)), report(get_book=result()), 0.25, 1.0)
+        self.assertEqual([(r.metric, r.baseline, r.current) for r in regressions], [('queries', 3, 4)])
+
+    def test_compare_skips_cases_missing_from_baseline(self):
+        self.assertEqual(compare(report(new_view=result()), report(), 0.25, 1.0), [])
+
+    def test_every_named_route_is_benchmarked(self):
+        call_command('seed', count=30, stdout=StringIO())
+        add_member_history(loans=5)
+        cases = build_cases(get_samples(10), repeat=2)
+        routes = {label.split('?')[0] for label in (case.label for case in cases)}
+        self.assertEqual(routes, {name for name, pattern in named_patterns()})
+        self.assertIn('list_books?page', [case.label for case in cases])
+
+    @override_settings(ITEMS_PER_PAGE=10)
+    def test_run_cases_reports_latency_and_queries(self):
+        call_command('seed', count=30, stdout=StringIO())
+        add_member_history(loans=5)
+        cases = [case for case in build_cases(get_samples(10), repeat=3) if case.label in ('get_book', 'export_books')]
+        results = run_cases(cases)
+        self.assertEqual(results['get_book']['status'], 200)
+        self.assertEqual(results['get_book']['requests'], 3)
+        self.assertGreater(results['get_book']['queries'], 0)
+        self.assertLessEqual(results['get_book']['p50_ms'], results['get_book']['p99_ms'])
+        self.assertEqual(results['export_books']['queries'], 1)
+
+    def test_invalid_scales(self):
+        with self.assertRaises(CommandError):
+            call_command('bench', scales='abc', stdout=StringIO())
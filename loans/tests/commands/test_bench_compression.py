@@ -0,0 +1,40 @@
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from loans.benchmark import measure_compression
+from loans.models import Book
+
+from io import StringIO
+import datetime
+
+class BenchCompressionTestCase(TestCase):
+    def setUp(self):
+        for number in range(1, 26):
+            Book.objects.create(
+                authors = "Doe, J.",
+                title = f"Title {number}",
+                publication_date = datetime.date(2024, 9, 1),
+                isbn = f"{number:013d}"
+            )
+
+    def test_measure_compression(self):
+        result = measure_compression(Client(), reverse('list_books'), 2)
+        self.assertEqual(result['status'], 200)
+        gzip = result['encodings']['gzip']
+        self.assertLess(gzip['bytes'], result['identity_bytes'])
+        self.assertEqual(gzip['ratio'], round(gzip['bytes'] / result['identity_bytes'], 3))
+        self.assertGreaterEqual(gzip['cpu_us'], 0)
+
+    def test_command_reports_book_pages(self):
+        output = StringIO()
+        call_command('bench_compression', repeat=2, stdout=output)
+        self.assertIn('list_books', output.getvalue())
+        self.assertIn('get_book_by_isbn', output.getvalue())
+        self.assertIn('gzip', output.getvalue())
+
+    def test_command_needs_books(self):
+        Book.objects.all().delete()
+        with self.assertRaises(CommandError):
+            call_command('bench_compression', stdout=StringIO())
@@ -0,0 +1,52 @@
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TransactionTestCase, override_settings
+from django.urls import reverse
+
+from loans.benchmark import run_asgi, run_wsgi
+from loans.models import Book
+
+from io import StringIO
+import datetime
+
+# The handlers run requests in other threads, which only see committed rows.
+class BenchConcurrencyTestCase(TransactionTestCase):
+    def setUp(self):
+        self.book = Book.objects.create(
+            authors = "Doe, J.",
+            title = "A Title",
+            publication_date = datetime.date(2024, 9, 1),
+            isbn = "9780306406157"
+        )
+        self.url = reverse('get_book', kwargs={'book_id': self.book.pk})
+
+    def test_run_wsgi(self):
+        result = run_wsgi(self.url, 6, 3)
+        self.assertEqual(result['requests'], 6)
+        self.assertEqual(result['errors'], 0)
+        self.assertGreater(result['rps'], 0)
+        self.assertLessEqual(result['p50_ms'], result['p95_ms'])
+
+    @override_settings(ROOT_URLCONF='my_library.asgi_urls')
+    def test_run_asgi(self):
+        result = run_asgi(self.url, 6, 3)
+        self.assertEqual(result['requests'], 6)
+        self.assertEqual(result['errors'], 0)
+        self.assertLessEqual(result['p50_ms'], result['p95_ms'])
+
+    def test_errors_are_counted(self):
+        url = reverse('get_book', kwargs={'book_id': self.book.pk + 1})
+        self.assertEqual(run_wsgi(url, 2, 2)['errors'], 2)
+        self.assertEqual(run_asgi(url, 2, 2)['errors'], 2)
+
+    def test_command_compares_both_servers(self):
+        output = StringIO()
+        call_command('bench_concurrency', requests=2, concurrency=2, stdout=output)
+        lines = output.getvalue().splitlines()
+        self.assertTrue(any('get_book' in line and 'wsgi' in line for line in lines))
+        self.assertTrue(any('api_list_books' in line and 'asgi' in line for line in lines))
+
+    def test_command_needs_books(self):
+        Book.objects.all().delete()
+        with self.assertRaises(CommandError):
+            call_command('bench_concurrency', stdout=StringIO())
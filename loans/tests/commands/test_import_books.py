@@ -0,0 +1,118 @@
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+
+from loans.counters import get_row_count
+from loans.forms import BookUpdateForm
+from loans.models import Book
+
+from io import StringIO
+import datetime
+import json
+import os
+import tempfile
+
+class ImportBooksCommandTestCase(TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def write(self, name, content):
+        path = os.path.join(self.directory.name, name)
+        with open(path, 'w', encoding='utf-8') as file:
+            file.write(content)
+        return path
+
+    def import_books(self, path, **options):
+        out = StringIO()
+        call_command('import_books', path, stdout=out, **options)
+        return out.getvalue()
+
+    def test_import_csv(self):
+        path = self.write('books.csv',
+            "authors,title,publication_date,isbn\n"
+            "\"Herbert, F.\",Dune,1965-08-01,9780441013593\n"
+            "\"Austen, J.\",Emma,1815-12-23,0141439580\n"
+        )
+        output = self.import_books(path)
+        self.assertEqual(Book.objects.count(), 2)
+        self.assertEqual(get_row_count(Book), 2)
+        self.assertEqual(Book.objects.get(title="Emma").isbn_key, 9780141439587)
+        self.assertIn("Imported 2 books", output)
+        self.assertIn("rows/s", output)
+
+    def test_import_ndjson(self):
+        path = self.write('books.ndjson',
+            json.dumps({'authors': "Herbert, F.", 'title': "Dune", 'publication_date': "1965-08-01", 'isbn': "9780441013593"}) + "\n\n"
+            + json.dumps({'authors': "Austen, J.", 'title': "Emma", 'publication_date': "1815-12-23", 'isbn': "9780141439587"}) + "\n"
+        )
+        self.import_books(path, batch_size=1)
+        self.assertEqual(Book.objects.count(), 2)
+
+    def test_import_upserts_on_isbn(self):
+        book = Book.objects.create(authors="Herbert, F.", title="Dune", publication_date=datetime.date(1965, 8, 1), isbn="9780441013593")
+        path = self.write('books.csv',
+            "authors,title,publication_date,isbn\n"
+            "\"Herbert, F.\",Dune (Deluxe Edition),1965-08-01,0441013597\n"
+        )
+        self.import_books(path)
+        self.assertEqual(Book.objects.count(), 1)
+        self.assertEqual(get_row_count(Book), 1)
+        book.refresh_from_db()
+        self.assertEqual(book.title, "Dune (Deluxe Edition)")
+        self.assertEqual(book.isbn, "0441013597")
+
+    def test_import_bumps_the_version_of_updated_books(self):
+        book = Book.objects.create(authors="Herbert, F.", title="Dune", publication_date=datetime.date(1965, 8, 1), isbn="9780441013593")
+        # An edit form opened before the import.
+        form = BookUpdateForm({'authors': "Herbert, F.", 'title': "Dune (Edited)", 'publication_date': '1965-08-01', 'isbn': "9780441013593", 'version': book.version}, instance=book)
+        path = self.write('books.csv',
+            "authors,title,publication_date,isbn\n"
+            "\"Herbert, F.\",Dune (Deluxe Edition),1965-08-01,9780441013593\n"
+            "\"Austen, J.\",Emma,1815-12-23,0141439580\n"
+        )
+        self.import_books(path)
+        self.assertEqual(Book.objects.get(pk=book.pk).version, 2)
+        self.assertEqual(Book.objects.get(title="Emma").version, 1)
+        self.assertTrue(form.is_valid())
+        self.assertFalse(form.save_changes())
+        self.assertEqual(Book.objects.get(pk=book.pk).title, "Dune (Deluxe Edition)")
+
+    def test_duplicate_isbns_within_a_batch_keep_the_last_row(self):
+        path = self.write('books.csv',
+            "authors,title,publication_date,isbn\n"
+            "\"Herbert, F.\",Dune,1965-08-01,9780441013593\n"
+            "\"Herbert, F.\",Dune Again,1965-08-01,0441013597\n"
+        )
+        self.import_books(path)
+        self.assertEqual(list(Book.objects.values_list('title', flat=True)), ["Dune Again"])
+
+    def test_invalid_rows_are_written_to_rejects_file(self):
+        path = self.write('books.csv',
+            "authors,title,publication_date,isbn\n"
+            "\"Herbert, F.\",Dune,1965-08-01,9780441013593\n"
+            "abc,Short author,1965-08-01,9780141439587\n"
+            "\"Austen, J.\",Emma,not a date,9780141439588\n"
+        )
+        output = self.import_books(path)
+        self.assertEqual(Book.objects.count(), 1)
+        self.assertIn("rejected 2 of 3 rows", output)
+        with open(path + '.rejects.ndjson', encoding='utf-8') as file:
+            rejects = [json.loads(line) for line in file]
+        self.assertEqual([reject['line'] for reject in rejects], [3, 4])
+        self.assertIn('authors', rejects[0]['errors'])
+        self.assertIn('publication_date', rejects[1]['errors'])
+        self.assertIn('isbn', rejects[1]['errors'])
+
+    def test_malformed_json_is_rejected(self):
+        path = self.write('books.ndjson', "{not json\n[1, 2]\n")
+        rejects = os.path.join(self.directory.name, 'rejects.ndjson')
+        self.import_books(path, rejects=rejects)
+        with open(rejects, encoding='utf-8') as file:
+            self.assertEqual(len(file.readlines()), 2)
+
+    def test_missing_file(self):
+        with self.assertRaises(CommandError):
+            self.import_books(os.path.join(self.directory.name, 'missing.csv'))
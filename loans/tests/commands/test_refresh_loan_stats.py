@@ -0,0 +1,34 @@
+from django.core.management import call_command
+from django.test import TestCase
+
+from loans.models import Book, Loan, LoanStats, Member
+
+from io import StringIO
+import datetime
+
+class RefreshLoanStatsTestCase(TestCase):
+    def setUp(self):
+        today = datetime.date.today()
+        self.member = Member.objects.create(first_name="Jane", last_name="Doe", email="jane@example.org")
+        book = Book.objects.create(
+            authors = "Doe, J.",
+            title = "A Title",
+            publication_date = datetime.date(2024, 9, 1),
+            isbn = "9780306406157"
+        )
+        Loan.objects.create(member=self.member, book=book, start_at=today - datetime.timedelta(days=7), end_at=today - datetime.timedelta(days=1))
+
+    def test_rebuild_repairs_drift(self):
+        LoanStats.objects.update(overdue_loans=0, total_loans=5)
+        output = StringIO()
+        call_command('refresh_loan_stats', stdout=output)
+        self.assertIn("Rebuilt loan stats for 1 members", output.getvalue())
+        stats = LoanStats.objects.get(member=self.member)
+        self.assertEqual((stats.total_loans, stats.overdue_loans), (1, 1))
+
+    def test_overdue_only(self):
+        LoanStats.objects.update(overdue_loans=0)
+        output = StringIO()
+        call_command('refresh_loan_stats', overdue=True, stdout=output)
+        self.assertIn("Updated the overdue count of 1 members", output.getvalue())
+        self.assertEqual(LoanStats.objects.get(member=self.member).overdue_loans, 1)
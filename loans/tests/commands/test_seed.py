@@ -0,0 +1,62 @@
+from django.core.management import call_command
+from django.test import TestCase
+
+from loans.helpers import is_valid_isbn
+from loans.management.commands.seed import seeded_isbn
+from loans.models import Book
+
+from io import StringIO
+import datetime
+
+class SeedCommandTestCase(TestCase):
+    def seed(self, **options):
+        call_command('seed', stdout=StringIO(), **options)
+        return list(Book.objects.order_by('pk').values_list('authors', 'title', 'publication_date', 'isbn'))
+
+    def test_seed_creates_requested_count(self):
+        self.seed(count=25, batch_size=10)
+        self.assertEqual(Book.objects.count(), 25)
+
+    def test_seeded_isbns_are_unique(self):
+        self.seed(count=30, batch_size=7)
+        isbns = list(Book.objects.values_list('isbn', flat=True))
+        self.assertEqual(len(isbns), len(set(isbns)))
+
+    def test_same_seed_gives_identical_dataset(self):
+        first = self.seed(count=20, batch_size=6, seed=42)
+        Book.objects.all().delete()
+        second = self.seed(count=20, batch_size=6, seed=42, workers=2)
+        self.assertEqual(first, second)
+
+    def test_same_seed_gives_identical_dataset_whatever_the_table_holds(self):
+        first = self.seed(count=10, batch_size=4, seed=42)
+        Book.objects.all().delete()
+        Book.objects.create(pk=1000, authors="Doe, J.", title="A Title", publication_date=datetime.date(2024, 9, 1), isbn="9780306406157")
+        second = self.seed(count=10, batch_size=4, seed=42)[1:]
+        self.assertEqual(first, second)
+
+    def test_isbns_taken_by_existing_books_are_replaced(self):
+        self.seed(count=10, seed=42)
+        self.seed(count=10, seed=42)
+        isbns = list(Book.objects.values_list('isbn', flat=True))
+        self.assertEqual(len(isbns), 20)
+        self.assertEqual(len(set(isbns)), 20)
+        self.assertTrue(all(is_valid_isbn(isbn) for isbn in isbns))
+
+    def test_seeded_isbns_are_valid_isbn13(self):
+        for counter in (0, 1, 10 ** 9 - 1):
+            isbn = seeded_isbn(42, counter)
+            self.assertEqual(len(isbn), 13)
+            self.assertTrue(is_valid_isbn(isbn))
+        self.assertRaises(ValueError, seeded_isbn, 42, 10 ** 9)
+
+    def test_different_seeds_give_different_datasets(self):
+        first = self.seed(count=5, seed=1)
+        Book.objects.all().delete()
+        second = self.seed(count=5, seed=2)
+        self.assertNotEqual([row[:3] for row in first], [row[:3] for row in second])
+
+    def test_seeding_twice_appends(self):
+        self.seed(count=5)
+        self.seed(count=5)
+        self.assertEqual(Book.objects.count(), 10)
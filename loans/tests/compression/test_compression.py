@@ -0,0 +1,129 @@
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from loans import compression
+from loans.models import Book
+
+from unittest import skipUnless
+import asyncio
+import datetime
+import gzip
+
+PAGE = b'<tr><td>1</td><td>Doe, J. (2024) "Title"</td></tr>\n' * 200
+
+class EncoderTestCase(SimpleTestCase):
+    def test_gzip_round_trip(self):
+        for data in (PAGE, b'x', b''):
+            self.assertEqual(gzip.decompress(compression.compress_bytes(data, 'gzip')), data)
+
+    def test_header_carries_random_padding(self):
+        lengths = {len(compression.compress_bytes(PAGE, 'gzip')) for _ in range(20)}
+        self.assertGreater(len(lengths), 1)
+
+    def test_streamed_chunks_round_trip(self):
+        chunks = [PAGE[:100], b'', PAGE[100:]]
+        self.assertEqual(gzip.decompress(b''.join(compression.compress_chunks(chunks, 'gzip'))), PAGE)
+
+    def test_async_streamed_chunks_round_trip(self):
+        async def chunks():
+            yield PAGE[:100]
+            yield PAGE[100:]
+
+        async def collect():
+            return b''.join([chunk async for chunk in compression.acompress_chunks(chunks(), 'gzip')])
+
+        self.assertEqual(gzip.decompress(asyncio.run(collect())), PAGE)
+
+    @skipUnless(compression.brotli, "brotli is not installed")
+    def test_brotli_round_trip(self):
+        self.assertEqual(compression.brotli.decompress(compression.compress_bytes(PAGE, 'br')), PAGE)
+
+class MiddlewareTestCase(SimpleTestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+
+    def compress(self, response, accept_encoding='gzip, deflate'):
+        request = self.factory.get('/', headers={'Accept-Encoding': accept_encoding})
+        return compression.CompressionMiddleware(lambda request: response)(request)
+
+    def test_compresses_html(self):
+        response = self.compress(HttpResponse(PAGE))
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(response['Vary'], 'Accept-Encoding')
+        self.assertEqual(int(response['Content-Length']), len(response.content))
+        self.assertEqual(gzip.decompress(response.content), PAGE)
+
+    def test_compresses_streaming_responses(self):
+        response = self.compress(StreamingHttpResponse(iter([PAGE, PAGE])))
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertNotIn('Content-Length', response)
+        self.assertEqual(gzip.decompress(b''.join(response.streaming_content)), PAGE + PAGE)
+
+    def test_leaves_small_responses_alone(self):
+        response = self.compress(HttpResponse(b'<p>Short</p>'))
+        self.assertNotIn('Content-Encoding', response)
+
+    @override_settings(COMPRESSION_MIN_SIZE=100)
+    def test_size_threshold_is_a_setting(self):
+        self.assertEqual(self.compress(HttpResponse(b'<p>Short</p>' * 20))['Content-Encoding'], 'gzip')
+
+    def test_leaves_other_content_types_alone(self):
+        response = self.compress(HttpResponse(PAGE, content_type='image/png'))
+        self.assertNotIn('Content-Encoding', response)
+        self.assertNotIn('Vary', response)
+
+    def test_leaves_encoded_responses_alone(self):
+        encoded = gzip.compress(PAGE)
+        response = HttpResponse(encoded)
+        response['Content-Encoding'] = 'gzip'
+        self.assertEqual(self.compress(response).content, encoded)
+
+    def test_respects_no_transform(self):
+        response = HttpResponse(PAGE)
+        response['Cache-Control'] = 'no-transform'
+        self.assertNotIn('Content-Encoding', self.compress(response))
+
+    def test_needs_an_accepted_encoding(self):
+        for accept_encoding in ('', 'identity', 'gzip;q=0', 'deflate'):
+            response = self.compress(HttpResponse(PAGE), accept_encoding)
+            self.assertNotIn('Content-Encoding', response)
+            self.assertEqual(response['Vary'], 'Accept-Encoding')
+
+    def test_weakens_strong_etags(self):
+        response = HttpResponse(PAGE)
+        response['ETag'] = '"abc"'
+        self.assertEqual(self.compress(response)['ETag'], 'W/"abc"')
+
+    @skipUnless(compression.brotli, "brotli is not installed")
+    def test_prefers_brotli(self):
+        self.assertEqual(self.compress(HttpResponse(PAGE), 'gzip, br')['Content-Encoding'], 'br')
+
+class CompressedPagesTestCase(TestCase):
+    def setUp(self):
+        for number in range(1, 26):
+            Book.objects.create(
+                authors = "Doe, J.",
+                title = f"Title {number}",
+                publication_date = datetime.date(2024, 9, 1),
+                isbn = f"{number:013d}"
+            )
+        self.url = reverse('list_books')
+
+    def test_list_page_is_compressed(self):
+        plain = self.client.get(self.url)
+        response = self.client.get(self.url, headers={'Accept-Encoding': 'gzip'})
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(response.content), plain.content)
+        self.assertLess(len(response.content), len(plain.content) / 4)
+
+    def test_revalidation_with_the_weak_etag(self):
+        response = self.client.get(self.url, headers={'Accept-Encoding': 'gzip'})
+        self.assertTrue(response['ETag'].startswith('W/'))
+        response = self.client.get(self.url, headers={'Accept-Encoding': 'gzip', 'If-None-Match': response['ETag']})
+        self.assertEqual(response.status_code, 304)
+
+    def test_export_is_compressed_once(self):
+        response = self.client.get(reverse('export_books'), headers={'Accept-Encoding': 'gzip'})
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn(b'Title 1', gzip.decompress(b''.join(response.streaming_content)))
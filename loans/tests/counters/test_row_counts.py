@@ -0,0 +1,72 @@
+from django.core.management import call_command
+from django.test import TestCase
+
+from loans.counters import get_row_count
+from loans.models import Book, Loan, Member, RowCount
+from loans.pagination import CountedPaginator
+
+from io import StringIO
+import datetime
+
+class RowCountTestCase(TestCase):
+    def create_book(self, isbn="9780306406157"):
+        return Book.objects.create(
+            authors = "Doe, J.",
+            title = "A Title",
+            publication_date = datetime.date(2024, 9, 1),
+            isbn = isbn
+        )
+
+    def test_counts_start_at_zero(self):
+        self.assertEqual(get_row_count(Book), 0)
+        self.assertEqual(get_row_count(Member), 0)
+        self.assertEqual(get_row_count(Loan), 0)
+
+    def test_create_and_delete_adjust_count(self):
+        book = self.create_book()
+        self.create_book("9780441013593")
+        self.assertEqual(get_row_count(Book), 2)
+        book.delete()
+        self.assertEqual(get_row_count(Book), 1)
+
+    def test_update_does_not_change_count(self):
+        book = self.create_book()
+        book.title = "A New Title"
+        book.save()
+        self.assertEqual(get_row_count(Book), 1)
+
+    def test_member_and_loan_are_counted(self):
+        member = Member.objects.create(first_name="Jane", last_name="Doe", email="jane@example.org")
+        Loan.objects.create(member=member, book=self.create_book(), start_at=datetime.date(2024, 9, 1), end_at=datetime.date(2024, 9, 15))
+        self.assertEqual(get_row_count(Member), 1)
+        self.assertEqual(get_row_count(Loan), 1)
+
+    def test_seed_adjusts_count(self):
+        call_command('seed', count=12, batch_size=5, stdout=StringIO())
+        self.assertEqual(get_row_count(Book), 12)
+
+    def test_missing_counter_is_initialised(self):
+        self.create_book()
+        RowCount.objects.all().delete()
+        self.create_book("9780441013593")
+        self.assertEqual(get_row_count(Book), 2)
+
+    def test_recount_repairs_drift(self):
+        self.create_book()
+        RowCount.objects.filter(pk='loans.Book').update(rows=42)
+        out = StringIO()
+        call_command('recount', stdout=out)
+        self.assertEqual(get_row_count(Book), 1)
+        self.assertIn("was recorded as 42", out.getvalue())
+
+    def test_paginator_reads_counter(self):
+        self.create_book()
+        paginator = CountedPaginator(Book.objects.order_by('pk'), 25)
+        with self.assertNumQueries(1) as context:
+            self.assertEqual(paginator.count, 1)
+        self.assertNotIn('COUNT', context.captured_queries[0]['sql'])
+
+    def test_paginator_counts_filtered_querysets(self):
+        self.create_book()
+        paginator = CountedPaginator(Book.objects.filter(title="Nothing").order_by('pk'), 25)
+        self.assertEqual(paginator.count, 0)
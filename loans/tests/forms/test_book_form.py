@@ -10,7 +10,7 @@ class BookFormTestCase(TestCase):
             'authors': "Doe, J.",
             'title': "A title",
             'publication_date': datetime.datetime(2024, 9, 1),
-            'isbn': "1234567890123"
+            'isbn': "9780306406157"
         }
     def test_form_has_necessary_fields(self):
         form = BookForm()
@@ -71,7 +71,7 @@ class BookFormTestCase(TestCase):
         self.assertFalse(form.is_valid())
 
     def test_13_isbn_is_valid(self):
-        self.form_input['isbn'] = "1234567890123"
+        self.form_input['isbn'] = "9780306406157"
         form = BookForm(data = self.form_input)
         self.assertTrue(form.is_valid())
 
@@ -86,7 +86,7 @@ class BookFormTestCase(TestCase):
         self.assertFalse(form.is_valid())
 
     def test_10_isbn_is_valid(self):
-        self.form_input['isbn'] = "1234567890"
+        self.form_input['isbn'] = "0306406152"
         form = BookForm(data = self.form_input)
         self.assertTrue(form.is_valid())
 
@@ -111,4 +111,42 @@ class BookFormTestCase(TestCase):
         form.save()
         after_count = Book.objects.count()
         self.assertEqual(before_count+1, after_count)
-    
\ No newline at end of file
+
+    def test_13_isbn_with_bad_check_digit_is_invalid(self):
+        self.form_input['isbn'] = "9780306406158"
+        form = BookForm(data = self.form_input)
+        self.assertFalse(form.is_valid())
+        self.assertIn('isbn', form.errors)
+
+    def test_10_isbn_with_bad_check_digit_is_invalid(self):
+        self.form_input['isbn'] = "0306406153"
+        form = BookForm(data = self.form_input)
+        self.assertFalse(form.is_valid())
+
+    def test_10_isbn_with_x_check_digit_is_valid(self):
+        self.form_input['isbn'] = "080442957X"
+        form = BookForm(data = self.form_input)
+        self.assertTrue(form.is_valid())
+
+    def test_hyphenated_isbn_is_cleaned(self):
+        self.form_input['isbn'] = "978-0-306-40615-7"
+        form = BookForm(data = self.form_input)
+        self.assertTrue(form.is_valid())
+        self.assertEqual(form.cleaned_data['isbn'], "9780306406157")
+
+    def test_isbn_10_of_existing_isbn_13_is_invalid(self):
+        Book.objects.create(
+            authors = "Pickles, P.",
+            title = "Another title",
+            publication_date = datetime.date(2023, 9, 2),
+            isbn = "9780306406157"
+        )
+        self.form_input['isbn'] = "0306406152"
+        form = BookForm(data = self.form_input)
+        self.assertFalse(form.is_valid())
+        self.assertIn('isbn', form.errors)
+
+    def test_saved_book_has_canonical_isbn_key(self):
+        self.form_input['isbn'] = "0306406152"
+        book = BookForm(data = self.form_input).save()
+        self.assertEqual(book.isbn_key, 9780306406157)
@@ -83,7 +83,7 @@ class SeleniumTestCase(StaticLiveServerTestCase):
         self.assertIn("is-invalid", isbn_field_after.get_attribute("class"))
 
         isbn_field_after.clear()
-        isbn_field_after.send_keys("1234567890123")
+        isbn_field_after.send_keys("9780306406157")
 
         submit_button_valid = self.browser.find_element(By.XPATH, '//input[@type="submit"]')
         self.browser.execute_script("arguments[0].click();", submit_button_valid)
@@ -0,0 +1,28 @@
+from django.test import TestCase
+from parameterized import parameterized
+from loans.helpers import author_sort_key, split_authors
+
+class AuthorSortKeyTestCase(TestCase):
+    @parameterized.expand([
+        ("Doe, J.", "doe j"),
+        ("  DOE,J ", "doe j"),
+        ("Brontë, C.", "bronte c"),
+        ("Straße, A.", "strasse a"),
+        ("O'Brien, F.", "o brien f"),
+        ("", "")
+    ])
+    def test_author_sort_key(self, name, expected_result):
+        self.assertEqual(expected_result, author_sort_key(name))
+
+class SplitAuthorsTestCase(TestCase):
+    @parameterized.expand([
+        ("Doe, J.", ["Doe, J."]),
+        ("Doe, J.; Roe, R.", ["Doe, J.", "Roe, R."]),
+        ("Doe, J. & Roe, R.", ["Doe, J.", "Roe, R."]),
+        ("Doe, J. and Roe, R.", ["Doe, J.", "Roe, R."]),
+        ("Doe, J.; doe, j; Roe, R.", ["Doe, J.", "Roe, R."]),
+        ("Anderson, B.", ["Anderson, B."]),
+        ("; ", [])
+    ])
+    def test_split_authors(self, authors, expected_result):
+        self.assertEqual(expected_result, split_authors(authors))
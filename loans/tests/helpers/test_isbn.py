@@ -0,0 +1,40 @@
+from django.test import TestCase
+from parameterized import parameterized
+from loans.helpers import clean_isbn, is_valid_isbn, isbn_to_key, to_isbn13
+
+class IsbnTestCase(TestCase):
+    @parameterized.expand([
+        ("0306406152", True),
+        ("9780306406157", True),
+        ("080442957X", True),
+        ("0306406153", False),
+        ("9780306406158", False),
+        ("0804429579", False),
+        ("030640615", False),
+        ("97803064061570", False),
+        ("03064061X2", False),
+        ("abcdefghij", False),
+        ("", False),
+        (None, False)
+    ])
+    def test_is_valid_isbn(self, isbn, expected_result):
+        self.assertEqual(is_valid_isbn(isbn), expected_result)
+
+    @parameterized.expand([
+        ("0306406152", "9780306406157"),
+        ("080442957X", "9780804429573"),
+        ("9780306406157", "9780306406157")
+    ])
+    def test_to_isbn13(self, isbn, expected_result):
+        self.assertEqual(to_isbn13(isbn), expected_result)
+
+    def test_to_isbn13_rejects_other_lengths(self):
+        self.assertRaises(ValueError, to_isbn13, "12345")
+
+    def test_both_forms_share_a_key(self):
+        self.assertEqual(isbn_to_key("0306406152"), isbn_to_key("9780306406157"))
+        self.assertEqual(isbn_to_key("9780306406157"), 9780306406157)
+
+    def test_clean_isbn(self):
+        self.assertEqual(clean_isbn("0-8044-2957-x"), "080442957X")
+        self.assertEqual(clean_isbn("978 0 306 40615 7"), "9780306406157")
@@ -0,0 +1,99 @@
+from unittest import skipUnless
+
+from django.test import SimpleTestCase
+from parameterized import parameterized
+from loans import helpers
+from loans.helpers import is_prime, is_prime_many, primes_up_to
+
+import math
+
+def trial_division(number):
+    return number > 1 and all(number % i for i in range(2, math.isqrt(number) + 1))
+
+class IsPrimeLargeTestCase(SimpleTestCase):
+    @parameterized.expand([
+        (2**31 - 1, True),
+        (2**61 - 1, True),
+        (2**64 - 59, True),
+        (2**64 - 1, False),
+        (2**89 - 1, True),
+        # Strong pseudoprimes to several of the smaller bases.
+        (3215031751, False),
+        (341550071728321, False),
+        (3825123056546413051, False),
+        (318665857834031151167461, False),
+        # The smallest strong pseudoprime to all of MILLER_RABIN_BASES.
+        (helpers.MILLER_RABIN_EXACT_LIMIT, False),
+        (2**127 - 1, True),
+    ])
+    def test_is_prime_beyond_trial_division(self, number, expected_result):
+        self.assertEqual(is_prime(number), expected_result)
+
+    def test_exact_bases_are_fooled_at_the_limit(self):
+        # The limit passes every exact base, so is_prime tries the extra ones there.
+        self.assertTrue(helpers.miller_rabin(helpers.MILLER_RABIN_EXACT_LIMIT))
+        self.assertFalse(helpers.miller_rabin(helpers.MILLER_RABIN_EXACT_LIMIT, helpers.MILLER_RABIN_EXTRA_BASES))
+
+    def test_is_prime_agrees_with_trial_division(self):
+        for number in range(-10, 5000):
+            self.assertEqual(is_prime(number), trial_division(number), number)
+
+class IsPrimeManyTestCase(SimpleTestCase):
+    def test_is_prime_many_matches_is_prime(self):
+        numbers = list(range(-5, 3000)) + [2**61 - 1, 2**61 + 1, 2**32 - 5, 2**32 + 15]
+        self.assertEqual(is_prime_many(numbers), [is_prime(number) for number in numbers])
+
+    def test_is_prime_many_accepts_any_iterable(self):
+        self.assertEqual(is_prime_many(number for number in (1, 2, 3, 4)), [False, True, True, False])
+        self.assertEqual(is_prime_many([]), [])
+
+    def test_is_prime_many_with_invalid_type(self):
+        self.assertRaises(ValueError, is_prime_many, [2, 3.0])
+
+    def test_is_prime_many_beyond_sieve(self):
+        limit = helpers.SIEVE_CACHE_LIMIT
+        numbers = list(range(limit - 50, limit + 50))
+        self.assertEqual(is_prime_many(numbers), [is_prime(number) for number in numbers])
+
+class PrimesUpToTestCase(SimpleTestCase):
+    def test_primes_up_to(self):
+        self.assertEqual(primes_up_to(30), [2, 3, 5, 7, 11, 13, 17, 19, 23, 29])
+        self.assertEqual(primes_up_to(29)[-1], 29)
+        self.assertEqual(primes_up_to(1), [])
+        self.assertEqual(primes_up_to(-7), [])
+
+    def test_prime_counts(self):
+        self.assertEqual(len(primes_up_to(10**5)), 9592)
+        self.assertEqual(len(primes_up_to(10**6)), 78498)
+
+    def test_segments_past_the_cached_sieve(self):
+        original = helpers.SIEVE_CACHE_LIMIT, helpers.SEGMENT_SIZE
+        helpers.SIEVE_CACHE_LIMIT, helpers.SEGMENT_SIZE = 1000, 97
+        try:
+            for limit in (1000, 1001, 1097, 5000, 20011):
+                self.assertEqual(primes_up_to(limit), [n for n in range(limit + 1) if trial_division(n)], limit)
+        finally:
+            helpers.SIEVE_CACHE_LIMIT, helpers.SEGMENT_SIZE = original
+
+@skipUnless(helpers.numpy, "NumPy is not installed")
+class IsPrimeArrayTestCase(SimpleTestCase):
+    def test_array_matches_is_prime(self):
+        numpy = helpers.numpy
+        rng = numpy.random.default_rng(7)
+        numbers = numpy.concatenate([
+            numpy.arange(-5, 3000),
+            rng.integers(helpers.SIEVE_CACHE_LIMIT, 2**32, 5000),
+            numpy.array([3215031751, 4294967291, 4294967295, 2**61 - 1, 2**63 - 25]),
+        ])
+        result = is_prime_many(numbers)
+        self.assertIsInstance(result, numpy.ndarray)
+        self.assertEqual(result.tolist(), [is_prime(int(number)) for number in numbers])
+
+    def test_array_keeps_its_shape(self):
+        numpy = helpers.numpy
+        result = is_prime_many(numpy.arange(12, dtype=numpy.uint64).reshape(3, 4))
+        self.assertEqual(result.shape, (3, 4))
+        self.assertEqual(result.tolist()[0], [False, False, True, True])
+
+    def test_float_array_is_rejected(self):
+        self.assertRaises(ValueError, is_prime_many, helpers.numpy.array([2.0, 3.0]))
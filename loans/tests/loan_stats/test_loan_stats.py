@@ -0,0 +1,111 @@
+from django.db import connection
+from django.test import TestCase
+
+from loans.loan_stats import count_member_loans, rebuild_loan_stats, refresh_overdue
+from loans.models import Book, Loan, LoanStats, Member
+
+import datetime
+
+class LoanStatsTestCase(TestCase):
+    def setUp(self):
+        self.today = datetime.date.today()
+        self.member = Member.objects.create(first_name="Jane", last_name="Doe", email="jane@example.org")
+        self.books = [
+            Book.objects.create(
+                authors = "Doe, J.",
+                title = f"Title {number}",
+                publication_date = datetime.date(2024, 9, 1),
+                isbn = f"{number:013d}"
+            )
+            for number in range(1, 4)
+        ]
+
+    def lend(self, book, end_in, returned=False, member=None):
+        return Loan.objects.create(
+            member = member or self.member,
+            book = book,
+            start_at = self.today - datetime.timedelta(days=14),
+            end_at = self.today + datetime.timedelta(days=end_in),
+            returned_at = self.today if returned else None,
+        )
+
+    def stats(self, member=None):
+        return LoanStats.objects.get(member=member or self.member)
+
+    def assertCounts(self, stats, total, active, overdue):
+        self.assertEqual((stats.total_loans, stats.active_loans, stats.overdue_loans), (total, active, overdue))
+
+    def test_creating_loans_updates_the_member_stats(self):
+        self.lend(self.books[0], end_in=7)
+        self.lend(self.books[1], end_in=-3)
+        self.lend(self.books[2], end_in=-10, returned=True)
+        stats = self.stats()
+        self.assertCounts(stats, 3, 2, 1)
+        self.assertEqual(stats.next_due_at, self.today - datetime.timedelta(days=3))
+        self.assertEqual(stats.counted_on, self.today)
+
+    def test_returning_a_loan_updates_the_member_stats(self):
+        loan = self.lend(self.books[0], end_in=-3)
+        loan.returned_at = self.today
+        loan.save()
+        stats = self.stats()
+        self.assertCounts(stats, 1, 0, 0)
+        self.assertIsNone(stats.next_due_at)
+
+    def test_deleting_the_last_loan_removes_the_stats(self):
+        loan = self.lend(self.books[0], end_in=7)
+        self.lend(self.books[1], end_in=7).delete()
+        self.assertCounts(self.stats(), 1, 1, 0)
+        loan.delete()
+        self.assertFalse(LoanStats.objects.exists())
+
+    def test_a_write_only_recounts_its_member(self):
+        other = Member.objects.create(first_name="John", last_name="Roe", email="john@example.org")
+        self.lend(self.books[0], end_in=7, member=other)
+        LoanStats.objects.filter(member=other).update(total_loans=99)
+        self.lend(self.books[1], end_in=7)
+        self.assertEqual(self.stats(other).total_loans, 99)
+
+    def test_moving_a_loan_recounts_both_members(self):
+        other = Member.objects.create(first_name="John", last_name="Roe", email="john@example.org")
+        loan = self.lend(self.books[0], end_in=-3)
+        self.lend(self.books[1], end_in=7)
+        loan.member = other
+        loan.save()
+        self.assertCounts(self.stats(), 1, 1, 0)
+        self.assertCounts(self.stats(other), 1, 1, 1)
+
+    def test_rebuild_matches_incremental_counts(self):
+        other = Member.objects.create(first_name="John", last_name="Roe", email="john@example.org")
+        self.lend(self.books[0], end_in=-1)
+        self.lend(self.books[1], end_in=5, returned=True)
+        self.lend(self.books[2], end_in=-2, member=other)
+        incremental = list(LoanStats.objects.order_by('member').values())
+        LoanStats.objects.all().delete()
+        self.assertEqual(rebuild_loan_stats(), 2)
+        self.assertEqual(list(LoanStats.objects.order_by('member').values()), incremental)
+
+    def test_refresh_overdue_counts_loans_that_fell_due(self):
+        self.lend(self.books[0], end_in=1)
+        self.lend(self.books[1], end_in=3)
+        self.assertCounts(self.stats(), 2, 2, 0)
+        later = self.today + datetime.timedelta(days=2)
+        self.assertEqual(refresh_overdue(on=later), 1)
+        stats = self.stats()
+        self.assertCounts(stats, 2, 2, 1)
+        self.assertEqual(stats.counted_on, later)
+        self.assertEqual(refresh_overdue(on=later), 0)
+
+    def test_overdue_query_uses_the_open_loans_index(self):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "EXPLAIN QUERY PLAN SELECT member_id, COUNT(*) FROM loans_loan "
+                "WHERE returned_at IS NULL AND end_at < %s GROUP BY member_id",
+                [self.today],
+            )
+            plan = ' '.join(str(row[-1]) for row in cursor.fetchall())
+        self.assertIn('loans_loan_open_by_member', plan)
+
+    def test_count_member_loans_of_member_without_loans(self):
+        count_member_loans([self.member.pk])
+        self.assertFalse(LoanStats.objects.exists())
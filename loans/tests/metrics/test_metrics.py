@@ -0,0 +1,109 @@
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from loans.metrics import Registry, registry
+from loans.models import Book
+
+from unittest import mock
+import datetime
+import os
+import runpy
+import sys
+
+class MetricsMiddlewareTestCase(TestCase):
+    def setUp(self):
+        registry.reset()
+        self.book = Book.objects.create(
+            authors = "Doe, J.",
+            title = "A Title",
+            publication_date = datetime.date(2024, 9, 1),
+            isbn = "9780306406157"
+        )
+
+    def series(self, view, method='GET'):
+        return registry.series[(view, method)]
+
+    def test_requests_are_recorded_by_url_name(self):
+        self.client.get(reverse('get_book', kwargs={'book_id': self.book.pk}))
+        self.client.get(reverse('get_book', kwargs={'book_id': self.book.pk}))
+        series = self.series('get_book')
+        self.assertEqual(sum(series.durations.counts), 2)
+        self.assertEqual(series.statuses, {'2xx': 2})
+
+    def test_queries_are_counted(self):
+        with self.assertNumQueries(2):
+            self.client.get(reverse('get_book', kwargs={'book_id': self.book.pk}))
+        series = self.series('get_book')
+        self.assertEqual(series.queries.total, 2)
+        self.assertGreater(series.sql_seconds, 0)
+
+    @override_settings(ROOT_URLCONF='my_library.asgi_urls')
+    async def test_queries_of_async_views_are_counted(self):
+        response = await self.async_client.get(reverse('get_book', kwargs={'book_id': self.book.pk}))
+        self.assertEqual(response.status_code, 200)
+        series = self.series('get_book')
+        self.assertGreater(series.queries.total, 0)
+        self.assertGreater(series.sql_seconds, 0)
+
+    def test_unmatched_and_missing_pages(self):
+        self.client.get('/no/such/page/')
+        self.client.get(reverse('get_book', kwargs={'book_id': self.book.pk + 1}))
+        self.assertEqual(self.series('unmatched').statuses, {'4xx': 1})
+        self.assertEqual(self.series('get_book').statuses, {'4xx': 1})
+
+    def test_metrics_endpoint(self):
+        self.client.get(reverse('list_books'))
+        response = self.client.get(reverse('metrics'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/plain; version=0.0.4; charset=utf-8')
+        body = response.content.decode()
+        self.assertIn('# TYPE library_request_duration_seconds histogram', body)
+        self.assertIn('library_request_duration_seconds_bucket{view="list_books",method="GET",le="+Inf"} 1', body)
+        self.assertIn('library_request_duration_seconds_count{view="list_books",method="GET"} 1', body)
+        self.assertIn('library_requests_total{view="list_books",method="GET",status="2xx"} 1', body)
+        self.assertIn('library_sql_duration_seconds_total{view="list_books",method="GET"}', body)
+
+    @override_settings(METRICS_ENABLED=False)
+    def test_metrics_endpoint_can_be_disabled(self):
+        self.assertEqual(self.client.get(reverse('metrics')).status_code, 404)
+
+    def test_metrics_endpoint_is_off_by_default_in_production(self):
+        environment = {'PYTHONANYWHERE_SITE': 'example', 'SECRET_KEY': 'secret'}
+        with mock.patch.dict(os.environ, environment), mock.patch.object(sys, 'argv', ['manage.py']):
+            os.environ.pop('METRICS_ENABLED', None)
+            production = runpy.run_module('my_library.settings')
+        self.assertEqual(production['ENVIRONMENT'], 'production')
+        self.assertFalse(production['METRICS_ENABLED'])
+        with override_settings(METRICS_ENABLED=production['METRICS_ENABLED']):
+            self.assertEqual(self.client.get(reverse('metrics')).status_code, 404)
+
+    @override_settings(METRICS_ALLOWED_IPS=['10.0.0.1'])
+    def test_metrics_endpoint_is_internal(self):
+        self.assertEqual(self.client.get(reverse('metrics')).status_code, 404)
+        self.assertEqual(self.client.get(reverse('metrics'), REMOTE_ADDR='10.0.0.1').status_code, 200)
+
+class RegistryTestCase(TestCase):
+    def test_histogram_buckets_are_cumulative(self):
+        metrics = Registry()
+        for duration in (0.001, 0.02, 0.02, 30):
+            metrics.record('list_books', 'GET', 200, duration, 3, 0.001)
+        body = metrics.render()
+        self.assertIn('library_request_duration_seconds_bucket{view="list_books",method="GET",le="0.005"} 1', body)
+        self.assertIn('library_request_duration_seconds_bucket{view="list_books",method="GET",le="0.025"} 3', body)
+        self.assertIn('library_request_duration_seconds_bucket{view="list_books",method="GET",le="10.0"} 3', body)
+        self.assertIn('library_request_duration_seconds_bucket{view="list_books",method="GET",le="+Inf"} 4', body)
+        self.assertIn('library_request_queries_bucket{view="list_books",method="GET",le="2"} 0', body)
+        self.assertIn('library_request_queries_bucket{view="list_books",method="GET",le="3"} 4', body)
+        self.assertIn('library_request_queries_sum{view="list_books",method="GET"} 12', body)
+
+    def test_series_are_bounded(self):
+        metrics = Registry(max_series=2)
+        for number in range(10):
+            metrics.record(f'view_{number}', 'GET', 200, 0.01, 1, 0.001)
+        self.assertEqual(len(metrics.series), 3)
+        self.assertEqual(metrics.series[('other', 'GET')].statuses, {'2xx': 8})
+
+    def test_label_values_are_escaped(self):
+        metrics = Registry()
+        metrics.record('a"b', 'GET', 500, 0.01, 0, 0)
+        self.assertIn('view="a\\"b",method="GET",status="5xx"', metrics.render())
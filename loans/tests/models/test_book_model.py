@@ -106,6 +106,17 @@ class BookTestCase(TestCase):
         with self.assertRaises(IntegrityError):
             Book.objects.create(authors = authors, title=title, publication_date=publication_date, isbn=isbn)
 
+    def test_isbn_10_and_13_forms_must_be_unique(self):
+        self.book.isbn = "9780306406157"
+        self.book.save()
+        with self.assertRaises(IntegrityError):
+            Book.objects.create(authors = "Pickles, P.", title="Another title", publication_date=datetime.datetime(2023, 9, 2), isbn="0306406152")
+
+    def test_save_sets_isbn_key(self):
+        self.book.isbn = "0306406152"
+        self.book.save()
+        self.assertEqual(self.book.isbn_key, 9780306406157)
+
     def test_str_method(self):
         actual_string = str(self.book)
         expected_string ="Doe, J.    (2024)  \"A title\"    ISBN 1234567890123."
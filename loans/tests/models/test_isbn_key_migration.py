@@ -0,0 +1,14 @@
+from django.test import TestCase
+
+from importlib import import_module
+
+migration = import_module('loans.migrations.0004_book_isbn_key')
+
+class IsbnKeyMigrationTestCase(TestCase):
+    def test_both_forms_of_an_isbn_collide(self):
+        books = [(1, "0441013597"), (2, "9780141439587"), (3, "9780441013593")]
+        self.assertEqual(migration.find_isbn_collisions(books), [[(1, "0441013597"), (3, "9780441013593")]])
+
+    def test_distinct_isbns_do_not_collide(self):
+        books = [(1, "0441013597"), (2, "0141439580")]
+        self.assertEqual(migration.find_isbn_collisions(books), [])
@@ -0,0 +1,138 @@
+from django.contrib.sessions.models import Session
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection, transaction
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, TransactionTestCase
+
+from loans.models import Book
+from loans.replica import PIN_COOKIE, PrimaryReplicaRouter, ReplicaMiddleware, reads_from_replica
+
+from io import StringIO
+from unittest import mock
+import datetime
+import os
+import sqlite3
+import tempfile
+
+# Not a TestCase: its wrapping transaction would keep every read on the primary.
+@mock.patch('loans.replica.get_replica_alias', return_value='replica')
+class PrimaryReplicaRouterTestCase(SimpleTestCase):
+    databases = {'default'}
+
+    def setUp(self):
+        self.router = PrimaryReplicaRouter()
+        self.addCleanup(reads_from_replica.set, False)
+
+    def test_reads_stay_on_primary_outside_requests(self, get_replica_alias):
+        self.assertIsNone(self.router.db_for_read(Book))
+
+    def test_reads_go_to_replica_when_allowed(self, get_replica_alias):
+        reads_from_replica.set(True)
+        self.assertEqual(self.router.db_for_read(Book), 'replica')
+        self.assertIsNone(self.router.db_for_read(Session))
+
+    def test_write_pins_reads_to_primary(self, get_replica_alias):
+        reads_from_replica.set(True)
+        self.assertEqual(self.router.db_for_write(Book), 'default')
+        self.assertIsNone(self.router.db_for_read(Book))
+
+    def test_writes_outside_loans_do_not_pin(self, get_replica_alias):
+        reads_from_replica.set(True)
+        self.assertIsNone(self.router.db_for_write(Session))
+        self.assertEqual(self.router.db_for_read(Book), 'replica')
+
+    def test_reads_in_a_transaction_stay_on_primary(self, get_replica_alias):
+        reads_from_replica.set(True)
+        with transaction.atomic():
+            self.assertIsNone(self.router.db_for_read(Book))
+
+    def test_no_replica_configured(self, get_replica_alias):
+        get_replica_alias.return_value = None
+        reads_from_replica.set(True)
+        self.assertIsNone(self.router.db_for_read(Book))
+
+    def test_replica_is_never_migrated(self, get_replica_alias):
+        self.assertFalse(self.router.allow_migrate('replica', 'loans'))
+        self.assertIsNone(self.router.allow_migrate('default', 'loans'))
+
+class ReplicaMiddlewareTestCase(TestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+        self.seen = []
+
+    def middleware(self, write=False, streaming=False):
+        def view(request):
+            self.seen.append(reads_from_replica.get())
+            if write:
+                PrimaryReplicaRouter().db_for_write(Book)
+                self.seen.append(reads_from_replica.get())
+            if streaming:
+                return StreamingHttpResponse(self.seen.append(reads_from_replica.get()) or b'x' for _ in range(1))
+            return HttpResponse()
+        return ReplicaMiddleware(view)
+
+    def test_get_reads_from_replica(self):
+        response = self.middleware()(self.factory.get('/'))
+        self.assertEqual(self.seen, [True])
+        self.assertNotIn(PIN_COOKIE, response.cookies)
+        self.assertFalse(reads_from_replica.get())
+
+    def test_post_reads_from_primary_and_pins(self):
+        response = self.middleware()(self.factory.post('/'))
+        self.assertEqual(self.seen, [False])
+        self.assertEqual(response.cookies[PIN_COOKIE]['max-age'], 10)
+
+    def test_write_pins_rest_of_request_and_next_requests(self):
+        response = self.middleware(write=True)(self.factory.get('/'))
+        self.assertEqual(self.seen, [True, False])
+        self.assertIn(PIN_COOKIE, response.cookies)
+
+    def test_pin_cookie_keeps_reads_on_primary(self):
+        request = self.factory.get('/')
+        request.COOKIES[PIN_COOKIE] = '1'
+        response = self.middleware()(request)
+        self.assertEqual(self.seen, [False])
+        self.assertNotIn(PIN_COOKIE, response.cookies)
+
+    def test_streaming_content_keeps_routing(self):
+        response = self.middleware(streaming=True)(self.factory.get('/'))
+        self.assertFalse(reads_from_replica.get())
+        b''.join(response.streaming_content)
+        self.assertEqual(self.seen, [True, True])
+        self.assertFalse(reads_from_replica.get())
+
+class ConnectionProfileTestCase(TestCase):
+    def test_profile_is_applied(self):
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA cache_size')
+            self.assertEqual(cursor.fetchone()[0], -64000)
+            cursor.execute('PRAGMA temp_store')
+            self.assertEqual(cursor.fetchone()[0], 2)
+
+# The backup reads the database through its own connection, which must not be
+# inside TestCase's open transaction.
+class RefreshReplicaTestCase(TransactionTestCase):
+    def test_refresh_copies_the_database(self):
+        Book.objects.create(
+            authors = "Doe, J.",
+            title = "A Title",
+            publication_date = datetime.date(2024, 9, 1),
+            isbn = "9780306406157"
+        )
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'replica.sqlite3')
+            with open(path, 'w') as old_copy:
+                old_copy.write('stale')
+            call_command('refresh_replica', replica=path, pages=1, stdout=StringIO())
+            replica = sqlite3.connect(path)
+            try:
+                self.assertEqual(replica.execute('SELECT title FROM loans_book').fetchall(), [("A Title",)])
+                self.assertEqual(replica.execute('PRAGMA journal_mode').fetchone()[0], 'delete')
+            finally:
+                replica.close()
+            self.assertEqual(os.listdir(directory), ['replica.sqlite3'])
+
+    def test_refresh_needs_a_replica(self):
+        with self.assertRaises(CommandError):
+            call_command('refresh_replica', stdout=StringIO())
@@ -0,0 +1,155 @@
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from loans import bulk
+from loans.forms import BookUpdateForm
+from loans.models import Book, CatalogRollup
+from loans.rollups import AUTHORS, MONTH, YEAR, get_catalog_stats, rebuild_rollups
+
+from io import StringIO
+import datetime
+import os
+import tempfile
+
+class RollupsTestCase(TestCase):
+    def create_book(self, number, authors="Doe, J.", year=2024):
+        return Book.objects.create(
+            authors = authors,
+            title = f"Title {number}",
+            publication_date = datetime.date(year, 9, 1),
+            isbn = f"{number:013d}"
+        )
+
+    def rollups(self):
+        return {(rollup.kind, rollup.key): rollup.books for rollup in CatalogRollup.objects.filter(books__gt=0)}
+
+    def assertRollupsMatchRebuild(self):
+        incremental = self.rollups()
+        rebuild_rollups()
+        self.assertEqual(incremental, self.rollups())
+
+    def this_month(self):
+        return timezone.localtime().strftime('%Y-%m')
+
+    def test_create_adds_to_each_rollup(self):
+        self.create_book(1)
+        self.create_book(2, authors="Roe, R.", year=1999)
+        self.assertEqual(self.rollups(), {
+            (YEAR, '2024'): 1,
+            (YEAR, '1999'): 1,
+            (AUTHORS, "doe j"): 1,
+            (AUTHORS, "roe r"): 1,
+            (MONTH, self.this_month()): 2,
+        })
+
+    def test_save_moves_a_book_between_rollups(self):
+        book = self.create_book(1)
+        book.authors = "Roe, R."
+        book.publication_date = datetime.date(2001, 1, 1)
+        book.save()
+        rollups = self.rollups()
+        self.assertEqual(rollups[(AUTHORS, "roe r")], 1)
+        self.assertNotIn((AUTHORS, "doe j"), rollups)
+        self.assertEqual(rollups[(YEAR, '2001')], 1)
+        self.assertRollupsMatchRebuild()
+
+    def test_delete_removes_from_each_rollup(self):
+        self.create_book(1)
+        self.create_book(2).delete()
+        self.assertEqual(self.rollups()[(AUTHORS, "doe j")], 1)
+        self.assertRollupsMatchRebuild()
+
+    def test_edit_form_moves_the_rollups(self):
+        book = self.create_book(1)
+        Book.objects.filter(pk=book.pk).update(isbn="9780306406157", isbn_key=9780306406157)
+        book.refresh_from_db()
+        form = BookUpdateForm({'authors': "Roe, R.", 'title': "Title 1", 'publication_date': '2024-09-01', 'isbn': book.isbn}, instance=book)
+        self.assertTrue(form.is_valid())
+        self.assertTrue(form.save_changes())
+        self.assertEqual(self.rollups()[(AUTHORS, "roe r")], 1)
+        self.assertRollupsMatchRebuild()
+
+    def test_bulk_update_and_delete_move_the_rollups(self):
+        books = [self.create_book(number) for number in range(1, 5)]
+        bulk.update_books([book.pk for book in books[:3]], 'authors', "Roe, R.")
+        self.assertEqual(self.rollups()[(AUTHORS, "roe r")], 3)
+        bulk.delete_books([book.pk for book in books[:2]])
+        self.assertEqual(self.rollups()[(AUTHORS, "roe r")], 1)
+        self.assertRollupsMatchRebuild()
+
+    def test_seed_moves_the_rollups(self):
+        call_command('seed', count=12, batch_size=5, seed=1, stdout=StringIO())
+        self.assertEqual(self.rollups()[(MONTH, self.this_month())], 12)
+        self.assertRollupsMatchRebuild()
+
+    def test_import_moves_the_rollups(self):
+        self.create_book(1)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'books.csv')
+            with open(path, 'w', encoding='utf-8') as file:
+                file.write(
+                    "authors,title,publication_date,isbn\n"
+                    "\"Herbert, F.\",Dune,1965-08-01,9780441013593\n"
+                    "\"Austen, J.\",Emma,1815-12-23,0141439580\n"
+                )
+            call_command('import_books', path, stdout=StringIO())
+            with open(path, 'w', encoding='utf-8') as file:
+                file.write("authors,title,publication_date,isbn\n\"Austen, J.\",Emma,1816-12-23,0141439580\n")
+            call_command('import_books', path, stdout=StringIO())
+        rollups = self.rollups()
+        self.assertEqual(rollups[(YEAR, '1816')], 1)
+        self.assertNotIn((YEAR, '1815'), rollups)
+        self.assertEqual(rollups[(MONTH, self.this_month())], 3)
+        self.assertRollupsMatchRebuild()
+
+    def test_missing_rollup_row_is_inserted_with_the_delta(self):
+        self.create_book(1, authors="Roe, R.")
+        self.assertEqual(self.rollups()[(AUTHORS, "roe r")], 1)
+        self.assertRollupsMatchRebuild()
+
+    def test_bulk_delete_moves_the_rollups_in_one_statement(self):
+        books = [self.create_book(number, authors=f"Author {number}") for number in range(1, 21)]
+        with CaptureQueriesContext(connection) as context:
+            bulk.delete_books([book.pk for book in books])
+        rollup_statements = [query for query in context.captured_queries if 'loans_catalogrollup' in query['sql']]
+        self.assertEqual(len(rollup_statements), 1)
+        self.assertRollupsMatchRebuild()
+
+    def test_seed_moves_the_rollups_in_one_statement_per_batch(self):
+        with CaptureQueriesContext(connection) as context:
+            call_command('seed', count=40, batch_size=20, seed=1, stdout=StringIO())
+        rollup_statements = [query for query in context.captured_queries if 'loans_catalogrollup' in query['sql']]
+        self.assertEqual(len(rollup_statements), 2)
+        self.assertRollupsMatchRebuild()
+
+    def test_books_count_towards_each_linked_author(self):
+        self.create_book(1, authors="Doe, J.; Roe, R.")
+        self.create_book(2, authors="ROE, R")
+        rollups = self.rollups()
+        self.assertEqual(rollups[(AUTHORS, "doe j")], 1)
+        self.assertEqual(rollups[(AUTHORS, "roe r")], 2)
+        self.assertNotIn((AUTHORS, "Doe, J.; Roe, R."), rollups)
+        self.assertEqual(get_catalog_stats(top_authors=1)['authors'], [("Roe, R.", 2)])
+        self.assertRollupsMatchRebuild()
+
+    def test_catalog_stats(self):
+        for number, (authors, year) in enumerate([("Doe, J.", 2024), ("Doe, J.", 2020), ("Roe, R.", 2024)], start=1):
+            self.create_book(number, authors=authors, year=year)
+        with self.assertNumQueries(3):
+            stats = get_catalog_stats(top_authors=1)
+        self.assertEqual(stats['years'], [('2020', 1), ('2024', 2)])
+        self.assertEqual(stats['most_books_in_a_year'], 2)
+        self.assertEqual(stats['authors'], [("Doe, J.", 2)])
+        self.assertEqual(stats['growth'], [(self.this_month(), 3, 3)])
+        self.assertEqual(stats['total'], 3)
+
+    def test_rebuild_rollups_command(self):
+        self.create_book(1)
+        CatalogRollup.objects.update(books=7)
+        output = StringIO()
+        call_command('rebuild_rollups', stdout=output)
+        self.assertIn("Rebuilt 3 rollup rows", output.getvalue())
+        self.assertEqual(set(self.rollups().values()), {1})
@@ -0,0 +1,89 @@
+from django.core.cache import caches
+from django.template import engines
+from django.template.loaders.cached import Loader as CachedLoader
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from loans.cache import bump_list_version, render_rows, row_key
+from loans.models import Book, Loan, Member
+
+import datetime
+
+@override_settings(CATALOG_CACHE_ENABLED=True, CATALOG_CACHE_STALE_TIMEOUT=0)
+class BookRowsTestCase(TestCase):
+    def setUp(self):
+        caches['catalog'].clear()
+        self.addCleanup(caches['catalog'].clear)
+        self.books = [
+            Book.objects.create(
+                authors = "Doe, J.",
+                title = f"Title {number}",
+                publication_date = datetime.date(2024, 9, 1),
+                isbn = f"{number:013d}"
+            )
+            for number in range(1, 4)
+        ]
+        self.book = self.books[0]
+        self.list_url = reverse('list_books')
+
+    def replace_cached_row(self, book, content):
+        entry = caches['catalog'].get(row_key(book.pk))
+        entry['content'] = content
+        caches['catalog'].set(row_key(book.pk), entry)
+
+    def test_rows_are_cached(self):
+        self.client.get(self.list_url)
+        for book in self.books:
+            self.assertIn(book.title, caches['catalog'].get(row_key(book.pk))['content'])
+
+    def test_cached_rows_match_fresh_rows(self):
+        cached = self.client.get(self.list_url).content
+        with override_settings(CATALOG_CACHE_ENABLED=False):
+            self.assertEqual(self.client.get(self.list_url).content, cached)
+
+    def test_rerendered_page_reuses_rows(self):
+        self.client.get(self.list_url)
+        self.replace_cached_row(self.books[1], '<tr><td>From the row cache</td></tr>')
+        bump_list_version()
+        response = self.client.get(self.list_url)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertContains(response, "From the row cache")
+        self.assertContains(response, "Title 1")
+
+    def test_saving_a_book_drops_its_row(self):
+        self.client.get(self.list_url)
+        self.book.title = "A New Title"
+        self.book.save()
+        self.assertIsNone(caches['catalog'].get(row_key(self.book.pk)))
+        self.assertIsNotNone(caches['catalog'].get(row_key(self.books[1].pk)))
+        self.assertContains(self.client.get(self.list_url), "A New Title")
+
+    def test_outdated_row_is_rerendered(self):
+        self.client.get(self.list_url)
+        self.replace_cached_row(self.book, '<tr><td>Outdated</td></tr>')
+        Book.objects.filter(pk=self.book.pk).update(title="A New Title", updated_at=datetime.datetime(2030, 1, 1, tzinfo=datetime.timezone.utc))
+        bump_list_version()
+        response = self.client.get(self.list_url)
+        self.assertNotContains(response, "Outdated")
+        self.assertContains(response, "A New Title")
+
+    def test_loan_rerenders_the_row(self):
+        self.client.get(self.list_url)
+        member = Member.objects.create(first_name="Jane", last_name="Doe", email="jane@example.org")
+        today = datetime.date.today()
+        Loan.objects.create(member=member, book=self.book, start_at=today, end_at=today + datetime.timedelta(days=7))
+        response = self.client.get(self.list_url)
+        self.assertContains(response, "On loan until", count=1)
+
+    @override_settings(CATALOG_CACHE_ENABLED=False)
+    def test_rows_are_not_cached_when_the_cache_is_off(self):
+        books = list(Book.objects.all())
+        for book in books:
+            book.availability = None
+        render_rows(books, '__book_row.html')
+        self.assertIn("Title 1", books[0].row)
+        self.assertIsNone(caches['catalog'].get(row_key(self.book.pk)))
+
+    def test_templates_are_parsed_once(self):
+        loader = engines['django'].engine.template_loaders[0]
+        self.assertIsInstance(loader, CachedLoader)
@@ -0,0 +1,68 @@
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from loans.models import Author, Book
+
+import datetime
+
+class BooksByAuthorTestCase(TestCase):
+    def setUp(self):
+        self.book = Book.objects.create(
+            authors = "Doe, J.; Roe, R.",
+            title = "A Title",
+            publication_date = datetime.date(2024, 9, 1),
+            isbn = "9780306406157"
+        )
+        self.other_book = Book.objects.create(
+            authors = "Roe, R.",
+            title = "Another Title",
+            publication_date = datetime.date(2024, 9, 1),
+            isbn = "1111111111"
+        )
+        self.url = reverse('books_by_author', kwargs={'name': "Doe, J."})
+
+    def test_books_by_author_url(self):
+        self.assertEqual(self.url, '/books/author/Doe,%20J./')
+
+    def test_get_books_by_author(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertTemplateUsed(response, 'books_by_author.html')
+        self.assertEqual(response.context['author'].name, "Doe, J.")
+        self.assertEqual(list(response.context['page_object']), [self.book])
+
+    def test_other_spellings_find_the_author(self):
+        response = self.client.get(reverse('books_by_author', kwargs={'name': "roe r"}))
+        self.assertEqual(list(response.context['page_object']), [self.book, self.other_book])
+
+    def test_get_books_by_unknown_author(self):
+        response = self.client.get(reverse('books_by_author', kwargs={'name': "Poe, E."}))
+        self.assertEqual(response.status_code, 404)
+
+    @override_settings(ITEMS_PER_PAGE=1)
+    def test_books_by_author_are_paginated(self):
+        url = reverse('books_by_author', kwargs={'name': "Roe, R."})
+        response = self.client.get(url)
+        self.assertEqual(list(response.context['page_object']), [self.book])
+        response = self.client.get(url, {'after': response.context['page_object'].next_cursor})
+        self.assertEqual(list(response.context['page_object']), [self.other_book])
+
+    def test_books_are_read_through_the_link_index(self):
+        with CaptureQueriesContext(connection) as context:
+            self.client.get(self.url)
+        query = next(query['sql'] for query in context.captured_queries if 'loans_author_books' in query['sql'])
+        with connection.cursor() as cursor:
+            cursor.execute(f"EXPLAIN QUERY PLAN {query}")
+            plan = ' '.join(str(row[-1]) for row in cursor.fetchall())
+        self.assertIn('loans_author_books_author_id_book_id', plan)
+        self.assertNotIn('TEMP B-TREE', plan)
+
+    def test_book_page_links_its_authors(self):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(reverse('get_book', kwargs={'book_id': self.book.pk}))
+        # The links come from the authors text, without reading the author tables.
+        self.assertFalse([query for query in context.captured_queries if 'loans_author' in query['sql']])
+        self.assertContains(response, f'href="{self.url}"')
+        self.assertContains(response, reverse('books_by_author', kwargs={'name': "Roe, R."}))
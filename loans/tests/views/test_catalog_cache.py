@@ -0,0 +1,141 @@
+from django.core.cache import caches
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from loans.cache import LIST_VERSION_KEY, book_key
+from loans.models import Book, Loan, Member
+
+from unittest import mock
+import datetime
+
+@override_settings(CATALOG_CACHE_ENABLED=True, CATALOG_CACHE_STALE_TIMEOUT=0)
+class CatalogCacheTestCase(TestCase):
+    def setUp(self):
+        caches['catalog'].clear()
+        self.book = Book.objects.create(
+            authors = "Doe, J.",
+            title = "A Title",
+            publication_date = datetime.date(2024, 9, 1),
+            isbn = "9780306406157"
+        )
+        self.book_url = reverse('get_book', kwargs={'book_id': self.book.pk})
+        self.list_url = reverse('list_books')
+
+    def tearDown(self):
+        caches['catalog'].clear()
+
+    def test_second_detail_request_is_served_from_cache(self):
+        response = self.client.get(self.book_url)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        # Only the conditional GET validator reaches the database.
+        with self.assertNumQueries(1):
+            response = self.client.get(self.book_url)
+        self.assertEqual(response['X-Cache'], 'HIT')
+        self.assertContains(response, "A Title")
+
+    def test_second_list_request_is_served_from_cache(self):
+        self.client.get(self.list_url, {'after': 0})
+        with self.assertNumQueries(1):
+            response = self.client.get(self.list_url, {'after': 0})
+        self.assertEqual(response['X-Cache'], 'HIT')
+
+    def test_list_pages_are_cached_per_query_string(self):
+        self.client.get(self.list_url, {'page': 1})
+        response = self.client.get(self.list_url, {'page': 2})
+        self.assertEqual(response['X-Cache'], 'MISS')
+
+    def test_list_pages_are_rendered_again_the_next_day(self):
+        today = datetime.date.today()
+        member = Member.objects.create(first_name="Jane", last_name="Doe", email="jane@example.org")
+        tomorrow = today + datetime.timedelta(days=1)
+        Loan.objects.create(member=member, book=self.book, start_at=tomorrow, end_at=tomorrow)
+        response = self.client.get(self.list_url)
+        self.assertContains(response, "Available")
+        with mock.patch('django.utils.timezone.localdate', return_value=tomorrow):
+            response = self.client.get(self.list_url)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertContains(response, "On loan until")
+
+    def test_welcome_is_cached(self):
+        for _ in range(20):
+            self.client.get(reverse('welcome'))
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse('welcome'))
+        self.assertEqual(response.status_code, 200)
+
+    def test_saving_a_book_invalidates_its_page_and_the_list(self):
+        self.client.get(self.book_url)
+        self.client.get(self.list_url)
+        self.book.title = "A New Title"
+        self.book.save()
+        response = self.client.get(self.book_url)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertContains(response, "A New Title")
+        response = self.client.get(self.list_url)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertContains(response, "A New Title")
+
+    def test_saving_a_book_leaves_other_detail_pages_cached(self):
+        other = Book.objects.create(
+            authors = "Pickles, P.",
+            title = "Other Title",
+            publication_date = datetime.date(2023, 8, 2),
+            isbn = "9780441013593"
+        )
+        other_url = reverse('get_book', kwargs={'book_id': other.pk})
+        self.client.get(other_url)
+        self.book.title = "A New Title"
+        self.book.save()
+        response = self.client.get(other_url)
+        self.assertEqual(response['X-Cache'], 'HIT')
+
+    def test_deleting_a_book_invalidates_its_page(self):
+        self.client.get(self.book_url)
+        self.book.delete()
+        self.assertIsNone(caches['catalog'].get(book_key(self.book.pk)))
+        response = self.client.get(self.book_url)
+        self.assertEqual(response.status_code, 404)
+
+    def test_writes_bump_the_list_version(self):
+        self.client.get(self.list_url)
+        version = caches['catalog'].get(LIST_VERSION_KEY)
+        self.book.save()
+        self.assertEqual(caches['catalog'].get(LIST_VERSION_KEY), version + 1)
+
+    def test_missing_pages_are_not_cached(self):
+        url = reverse('get_book', kwargs={'book_id': 999})
+        self.client.get(url)
+        self.assertIsNone(caches['catalog'].get(book_key(999)))
+
+    def test_pages_with_messages_bypass_the_cache(self):
+        self.client.get(self.list_url)
+        form_input = {
+            'authors': "Calin, B.",
+            'title': "A Title",
+            'publication_date': '2024-09-01',
+            'isbn': "9780306406157"
+        }
+        response = self.client.post(reverse('update_book', kwargs={'book_id': self.book.pk}), form_input, follow=True)
+        self.assertNotIn('X-Cache', response)
+        self.assertContains(response, "Updated book record")
+
+    @override_settings(CATALOG_CACHE_STALE_TIMEOUT=60)
+    def test_stale_page_is_served_while_another_request_revalidates(self):
+        self.client.get(self.book_url)
+        self.book.title = "A New Title"
+        self.book.save()
+        caches['catalog'].add(f'{book_key(self.book.pk)}:lock', 1)
+        response = self.client.get(self.book_url)
+        self.assertEqual(response['X-Cache'], 'STALE')
+        self.assertContains(response, "A Title")
+
+    @override_settings(CATALOG_CACHE_STALE_TIMEOUT=60)
+    def test_first_request_after_a_write_revalidates_stale_page(self):
+        self.client.get(self.list_url)
+        self.book.title = "A New Title"
+        self.book.save()
+        response = self.client.get(self.list_url)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertContains(response, "A New Title")
+        response = self.client.get(self.list_url)
+        self.assertEqual(response['X-Cache'], 'HIT')
@@ -0,0 +1,41 @@
+from django.core.cache import caches
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from loans.models import Book
+
+import datetime
+
+@override_settings(CATALOG_CACHE_ENABLED=True, CATALOG_CACHE_STALE_TIMEOUT=0)
+class CatalogStatsTestCase(TestCase):
+    def setUp(self):
+        caches['catalog'].clear()
+        self.addCleanup(caches['catalog'].clear)
+        self.url = reverse('catalog_stats')
+        self.book = Book.objects.create(
+            authors = "Doe, J.",
+            title = "A Title",
+            publication_date = datetime.date(2024, 9, 1),
+            isbn = "9780306406157"
+        )
+
+    def test_catalog_stats_url(self):
+        self.assertEqual(self.url, '/books/stats/')
+
+    def test_get_catalog_stats(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertTemplateUsed(response, 'catalog_stats.html')
+        self.assertContains(response, "Doe, J.")
+        self.assertContains(response, "2024")
+
+    def test_page_is_cached_until_a_book_changes(self):
+        self.client.get(self.url)
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url)
+        self.assertEqual(response['X-Cache'], 'HIT')
+        self.book.authors = "Roe, R."
+        self.book.save()
+        response = self.client.get(self.url)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertContains(response, "Roe, R.")
@@ -0,0 +1,122 @@
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from loans.models import Book
+
+import datetime
+
+@override_settings(ITEMS_PER_PAGE=5)
+class ConditionalGetTestCase(TestCase):
+    def setUp(self):
+        self.books = [
+            Book.objects.create(
+                authors = "Doe, J.",
+                title = f"Title {number}",
+                publication_date = datetime.date(2024, 9, 1),
+                isbn = f"{number:013d}"
+            )
+            for number in range(1, 13)
+        ]
+        self.book = self.books[0]
+        self.book_url = reverse('get_book', kwargs={'book_id': self.book.pk})
+        self.list_url = reverse('list_books')
+
+    def revalidate(self, url, response, data=None):
+        return self.client.get(url, data, HTTP_IF_NONE_MATCH=response['ETag'])
+
+    def test_book_has_updated_at(self):
+        before = self.book.updated_at
+        self.book.title = "A New Title"
+        self.book.save()
+        self.assertGreater(self.book.updated_at, before)
+
+    def test_detail_page_has_validators(self):
+        response = self.client.get(self.book_url)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('ETag', response)
+        self.assertIn('Last-Modified', response)
+        self.assertIn('no-cache', response['Cache-Control'])
+
+    def test_unchanged_detail_page_is_not_modified(self):
+        response = self.client.get(self.book_url)
+        with self.assertNumQueries(1):
+            response = self.revalidate(self.book_url, response)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+
+    def test_unchanged_detail_page_is_not_modified_since(self):
+        response = self.client.get(self.book_url)
+        response = self.client.get(self.book_url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+        self.assertEqual(response.status_code, 304)
+
+    def test_edited_detail_page_is_sent_again(self):
+        response = self.client.get(self.book_url)
+        self.book.title = "A New Title"
+        self.book.save()
+        response = self.revalidate(self.book_url, response)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "A New Title")
+
+    def test_missing_book_is_still_not_found(self):
+        response = self.client.get(reverse('get_book', kwargs={'book_id': 999}), HTTP_IF_NONE_MATCH='"x"')
+        self.assertEqual(response.status_code, 404)
+
+    def test_unchanged_keyset_page_is_not_modified_with_one_query(self):
+        data = {'after': self.books[4].pk}
+        response = self.client.get(self.list_url, data)
+        with self.assertNumQueries(1):
+            response = self.revalidate(self.list_url, response, data)
+        self.assertEqual(response.status_code, 304)
+
+    def test_unchanged_numbered_page_is_not_modified(self):
+        response = self.client.get(self.list_url, {'page': 2})
+        response = self.revalidate(self.list_url, response, {'page': 2})
+        self.assertEqual(response.status_code, 304)
+
+    def test_edit_on_page_changes_its_etag(self):
+        data = {'after': self.books[4].pk}
+        response = self.client.get(self.list_url, data)
+        book = self.books[6]
+        book.title = "A New Title"
+        book.save()
+        response = self.revalidate(self.list_url, response, data)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "A New Title")
+
+    def test_edit_on_another_page_keeps_etag(self):
+        data = {'after': self.books[4].pk}
+        response = self.client.get(self.list_url, data)
+        self.book.title = "A New Title"
+        self.book.save()
+        response = self.revalidate(self.list_url, response, data)
+        self.assertEqual(response.status_code, 304)
+
+    def test_deletion_on_page_changes_its_etag(self):
+        response = self.client.get(self.list_url)
+        self.books[2].delete()
+        response = self.revalidate(self.list_url, response)
+        self.assertEqual(response.status_code, 200)
+
+    def test_new_book_changes_numbered_page_etag(self):
+        response = self.client.get(self.list_url, {'page': 1})
+        Book.objects.create(
+            authors = "Doe, J.",
+            title = "Title 13",
+            publication_date = datetime.date(2024, 9, 1),
+            isbn = "9780306406157"
+        )
+        response = self.revalidate(self.list_url, response, {'page': 1})
+        self.assertEqual(response.status_code, 200)
+
+    def test_pending_messages_skip_revalidation(self):
+        response = self.client.get(self.list_url)
+        form_input = {
+            'authors': "Calin, B.",
+            'title': "Title 1",
+            'publication_date': '2024-09-01',
+            'isbn': "9780306406157"
+        }
+        self.client.post(reverse('update_book', kwargs={'book_id': self.book.pk}), form_input)
+        response = self.revalidate(self.list_url, response)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "Updated book record")
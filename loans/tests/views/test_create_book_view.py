@@ -14,7 +14,7 @@ class CreateBookTestCase(TestCase):
             'authors': "Doe, J.",
             'title': "A title",
             'publication_date': "2024-09-01",
-            'isbn': "1234567890123"
+            'isbn': "9780306406157"
         }
 
     def test_create_book_url(self):
@@ -55,7 +55,7 @@ class CreateBookTestCase(TestCase):
             authors = "Pickles, P.",
             title = "My book",
             publication_date = datetime.datetime(2023, 8, 2),
-            isbn = "1234567890123"
+            isbn = "9780306406157"
         )
         before_count = Book.objects.count()
         with transaction.atomic():
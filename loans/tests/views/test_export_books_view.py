@@ -0,0 +1,77 @@
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+
+from loans.export import BUFFER_SIZE
+from loans.models import Book
+
+from io import StringIO
+import csv
+import datetime
+import gzip
+import json
+import os
+import tempfile
+
+class ExportBooksTestCase(TestCase):
+    def setUp(self):
+        self.url = reverse('export_books')
+        self.books = [
+            Book.objects.create(
+                authors = "Doe, J.",
+                title = f"Title, part {number}",
+                publication_date = datetime.date(2024, 9, 1),
+                isbn = f"{number:013d}"
+            )
+            for number in range(1, 4)
+        ]
+
+    def test_export_books_url(self):
+        self.assertEqual(self.url, '/books/export/')
+
+    def test_export_csv(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        self.assertIn('attachment', response['Content-Disposition'])
+        rows = list(csv.reader(b''.join(response.streaming_content).decode().splitlines()))
+        self.assertEqual(rows[0], ['id', 'authors', 'title', 'publication_date', 'isbn'])
+        self.assertEqual(rows[1], [str(self.books[0].pk), "Doe, J.", "Title, part 1", "2024-09-01", "0000000000001"])
+        self.assertEqual(len(rows), 4)
+
+    def test_export_ndjson(self):
+        response = self.client.get(self.url, {'format': 'ndjson'})
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        records = [json.loads(line) for line in b''.join(response.streaming_content).decode().splitlines()]
+        self.assertEqual(len(records), 3)
+        self.assertEqual(records[2]['title'], "Title, part 3")
+        self.assertEqual(records[2]['publication_date'], "2024-09-01")
+
+    def test_export_gzip_when_accepted(self):
+        response = self.client.get(self.url, HTTP_ACCEPT_ENCODING='gzip, deflate')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', response['Vary'])
+        content = gzip.decompress(b''.join(response.streaming_content)).decode()
+        self.assertIn("Title, part 2", content)
+
+    def test_export_unknown_format(self):
+        response = self.client.get(self.url, {'format': 'xml'})
+        self.assertEqual(response.status_code, 404)
+
+    def test_export_is_streamed_in_chunks(self):
+        Book.objects.bulk_create([
+            Book(authors="Doe, J.", title="x" * 200, publication_date=datetime.date(2024, 9, 1), isbn=f"{number:013d}", isbn_key=number)
+            for number in range(10, 1000)
+        ])
+        response = self.client.get(self.url)
+        chunks = list(response.streaming_content)
+        self.assertGreater(len(chunks), 1)
+        self.assertTrue(all(len(chunk) < 2 * BUFFER_SIZE for chunk in chunks))
+
+    def test_export_command(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'books.ndjson.gz')
+            call_command('export_books', path, format='ndjson', gzip=True, stdout=StringIO())
+            with gzip.open(path, 'rt') as file:
+                self.assertEqual(len(file.readlines()), 3)
@@ -0,0 +1,42 @@
+from django.test import TestCase
+from django.urls import reverse
+
+from loans.models import Book
+
+import datetime
+
+class GetBookByIsbnTestCase(TestCase):
+    def setUp(self):
+        self.book = Book.objects.create(
+            authors = "Doe, J.",
+            title = "A Title",
+            publication_date = datetime.date(2024, 9, 1),
+            isbn = "9780306406157"
+        )
+
+    def test_get_book_by_isbn_url(self):
+        url = reverse('get_book_by_isbn', kwargs={'isbn': "9780306406157"})
+        self.assertEqual(url, '/book/isbn/9780306406157/')
+
+    def test_get_book_by_isbn_13(self):
+        response = self.client.get(reverse('get_book_by_isbn', kwargs={'isbn': "9780306406157"}))
+        self.assertEqual(response.status_code, 200)
+        self.assertTemplateUsed(response, 'get_book.html')
+        self.assertEqual(response.context['book'], self.book)
+
+    def test_get_book_by_isbn_10(self):
+        response = self.client.get(reverse('get_book_by_isbn', kwargs={'isbn': "0-306-40615-2"}))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['book'], self.book)
+
+    def test_lookup_is_a_single_query(self):
+        with self.assertNumQueries(1):
+            self.client.get(reverse('get_book_by_isbn', kwargs={'isbn': "0306406152"}))
+
+    def test_get_book_by_invalid_isbn(self):
+        response = self.client.get(reverse('get_book_by_isbn', kwargs={'isbn': "0306406153"}))
+        self.assertEqual(response.status_code, 404)
+
+    def test_get_book_by_unknown_isbn(self):
+        response = self.client.get(reverse('get_book_by_isbn', kwargs={'isbn': "080442957X"}))
+        self.assertEqual(response.status_code, 404)
@@ -0,0 +1,118 @@
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from loans.models import Book, Loan, Member
+
+import datetime
+
+# Member, summary and one page of loans; the page size must not change this.
+QUERY_BUDGET = 3
+
+@override_settings(ITEMS_PER_PAGE=10)
+class GetMemberTestCase(TestCase):
+    def setUp(self):
+        self.today = datetime.date.today()
+        self.member = Member.objects.create(first_name="Jane", last_name="Doe", email="jane@example.org")
+        self.url = reverse('get_member', kwargs={'member_id': self.member.pk})
+
+    def lend(self, count, start_offset=-2, end_offset=2, returned=False):
+        loans = []
+        for number in range(count):
+            book = Book.objects.create(
+                authors = "Doe, J.",
+                title = f"Title {number}",
+                publication_date = datetime.date(2024, 9, 1),
+                isbn = f"{Book.objects.count() + 1:013d}"
+            )
+            loans.append(Loan.objects.create(
+                member = self.member,
+                book = book,
+                start_at = self.today + datetime.timedelta(days=start_offset),
+                end_at = self.today + datetime.timedelta(days=end_offset),
+                returned_at = self.today if returned else None
+            ))
+        return loans
+
+    def assertWithinBudget(self, data=None, budget=QUERY_BUDGET):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(self.url, data)
+        self.assertEqual(response.status_code, 200)
+        self.assertLessEqual(len(context.captured_queries), budget, "\n".join(query['sql'] for query in context.captured_queries))
+        return response
+
+    def test_get_member_url(self):
+        self.assertEqual(self.url, f'/member/{self.member.pk}/')
+
+    def test_get_member(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertTemplateUsed(response, 'get_member.html')
+        self.assertEqual(response.context['member'], self.member)
+        self.assertContains(response, "No loans yet.")
+
+    def test_get_unknown_member(self):
+        response = self.client.get(reverse('get_member', kwargs={'member_id': self.member.pk + 1}))
+        self.assertEqual(response.status_code, 404)
+
+    def test_summary_counts(self):
+        self.lend(2)
+        self.lend(3, -10, -1)
+        self.lend(1, -10, -1, returned=True)
+        self.lend(1, 3, 5)
+        member = self.client.get(self.url).context['member']
+        self.assertEqual(member.loan_count, 7)
+        self.assertEqual(member.active_count, 2)
+        self.assertEqual(member.overdue_count, 3)
+
+    def test_summary_is_not_multiplied_by_other_members_loans(self):
+        self.lend(2)
+        other = Member.objects.create(first_name="John", last_name="Roe", email="john@example.org")
+        Loan.objects.create(member=other, book=Book.objects.first(), start_at=self.today, end_at=self.today)
+        self.assertEqual(self.client.get(self.url).context['member'].loan_count, 2)
+
+    def test_history_statuses(self):
+        self.lend(1)
+        self.lend(1, -10, -1)
+        self.lend(1, -10, -1, returned=True)
+        self.lend(1, 3, 5)
+        response = self.client.get(self.url)
+        statuses = [loan.status for loan in response.context['page_object']]
+        self.assertEqual(statuses, ['active', 'overdue', 'returned', 'upcoming'])
+        self.assertContains(response, "Overdue")
+        self.assertContains(response, "Upcoming")
+
+    def test_history_is_paginated_by_keyset(self):
+        loans = self.lend(25)
+        response = self.client.get(self.url)
+        page_object = response.context['page_object']
+        self.assertEqual([loan.pk for loan in page_object], [loan.pk for loan in loans[:10]])
+        self.assertTrue(page_object.has_next())
+        response = self.client.get(self.url, {'after': page_object.next_cursor})
+        self.assertEqual([loan.pk for loan in response.context['page_object']], [loan.pk for loan in loans[10:20]])
+
+    def test_history_only_lists_the_members_loans(self):
+        self.lend(1)
+        other = Member.objects.create(first_name="John", last_name="Roe", email="john@example.org")
+        Loan.objects.create(member=other, book=Book.objects.first(), start_at=self.today, end_at=self.today)
+        response = self.client.get(self.url)
+        self.assertEqual([loan.member_id for loan in response.context['page_object']], [self.member.pk])
+
+    def test_query_budget_for_a_full_page(self):
+        self.lend(10)
+        self.assertWithinBudget()
+
+    def test_query_budget_does_not_grow_with_loans(self):
+        self.lend(1)
+        with CaptureQueriesContext(connection) as one_loan:
+            self.client.get(self.url)
+        self.lend(9)
+        with CaptureQueriesContext(connection) as full_page:
+            self.client.get(self.url)
+        self.assertEqual(len(one_loan.captured_queries), len(full_page.captured_queries))
+
+    def test_query_budget_for_later_pages(self):
+        loans = self.lend(25)
+        self.assertWithinBudget({'after': loans[9].pk})
+        self.assertWithinBudget({'before': loans[20].pk})
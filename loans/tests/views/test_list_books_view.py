@@ -0,0 +1,94 @@
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from loans.models import Book
+from loans.pagination import KeysetPage
+
+import datetime
+
+@override_settings(ITEMS_PER_PAGE=5)
+class ListBooksTestCase(TestCase):
+    def setUp(self):
+        self.url = reverse('list_books')
+        self.books = [
+            Book.objects.create(
+                authors = "Doe, J.",
+                title = f"Title {number}",
+                publication_date = datetime.date(2024, 9, 1),
+                isbn = f"{number:013d}"
+            )
+            for number in range(1, 61)
+        ]
+
+    def test_list_books_url(self):
+        self.assertEqual(self.url, '/books/')
+
+    def test_get_first_page(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertTemplateUsed(response, 'books.html')
+        page_object = response.context['page_object']
+        self.assertEqual(page_object.number, 1)
+        self.assertEqual(list(page_object), self.books[:5])
+        self.assertContains(response, f'href="?after={self.books[4].pk}"')
+        self.assertNotContains(response, 'href="?before=')
+
+    def test_get_numbered_page_still_works(self):
+        response = self.client.get(self.url, {'page': 3})
+        page_object = response.context['page_object']
+        self.assertEqual(page_object.number, 3)
+        self.assertEqual(list(page_object), self.books[10:15])
+        self.assertContains(response, f'href="?before={self.books[10].pk}"')
+        self.assertContains(response, f'href="?after={self.books[14].pk}"')
+
+    def test_page_navigator_is_elided(self):
+        response = self.client.get(self.url, {'page': 1})
+        self.assertContains(response, 'href="?page=2"')
+        self.assertContains(response, 'href="?page=12"')
+        self.assertNotContains(response, 'href="?page=6"')
+
+    def test_after_cursor_seeks_on_primary_key(self):
+        response = self.client.get(self.url, {'after': self.books[4].pk})
+        page_object = response.context['page_object']
+        self.assertTrue(isinstance(page_object, KeysetPage))
+        self.assertEqual(list(page_object), self.books[5:10])
+        self.assertTrue(page_object.has_previous())
+        self.assertTrue(page_object.has_next())
+
+    def test_before_cursor_seeks_on_primary_key(self):
+        response = self.client.get(self.url, {'before': self.books[10].pk})
+        page_object = response.context['page_object']
+        self.assertEqual(list(page_object), self.books[5:10])
+        self.assertTrue(page_object.has_previous())
+        self.assertTrue(page_object.has_next())
+
+    def test_last_keyset_page_has_no_next(self):
+        response = self.client.get(self.url, {'after': self.books[54].pk})
+        page_object = response.context['page_object']
+        self.assertEqual(list(page_object), self.books[55:])
+        self.assertFalse(page_object.has_next())
+        self.assertNotContains(response, 'href="?after=')
+
+    def test_first_keyset_page_has_no_previous(self):
+        response = self.client.get(self.url, {'before': self.books[5].pk})
+        page_object = response.context['page_object']
+        self.assertEqual(list(page_object), self.books[:5])
+        self.assertFalse(page_object.has_previous())
+
+    def test_keyset_page_does_not_count_rows(self):
+        with CaptureQueriesContext(connection) as context:
+            self.client.get(self.url, {'after': self.books[4].pk})
+        # Validator, page rows plus one, and the availability of the page.
+        self.assertEqual(len(context.captured_queries), 4)
+        for query in context.captured_queries:
+            # The conditional GET validator counts the rows of the page only.
+            if 'COUNT' in query['sql']:
+                self.assertIn('LIMIT', query['sql'])
+            self.assertNotIn('OFFSET', query['sql'])
+
+    def test_malformed_cursor_falls_back_to_first_page(self):
+        response = self.client.get(self.url, {'after': 'abc'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['page_object'].number, 1)
@@ -0,0 +1,49 @@
+from django.test import TestCase
+from django.urls import reverse
+
+from loans.models import Book, Loan, Member
+
+import datetime
+
+class OverdueReportTestCase(TestCase):
+    def setUp(self):
+        self.today = datetime.date.today()
+        self.url = reverse('overdue_report')
+        self.members = [
+            Member.objects.create(first_name=f"Jane{number}", last_name="Doe", email=f"jane{number}@example.org")
+            for number in range(3)
+        ]
+        for number, member in enumerate(self.members):
+            book = Book.objects.create(
+                authors = "Doe, J.",
+                title = f"Title {number}",
+                publication_date = datetime.date(2024, 9, 1),
+                isbn = f"{number + 1:013d}"
+            )
+            # Member 0 is one day late, member 1 three days late, member 2 not due yet.
+            end_at = self.today + datetime.timedelta(days=(-1, -3, 5)[number])
+            Loan.objects.create(member=member, book=book, start_at=self.today - datetime.timedelta(days=14), end_at=end_at)
+
+    def test_overdue_report_url(self):
+        self.assertEqual(self.url, '/members/overdue/')
+
+    def test_lists_overdue_members_longest_overdue_first(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertTemplateUsed(response, 'overdue_report.html')
+        self.assertEqual([stats.member for stats in response.context['page_object']], [self.members[1], self.members[0]])
+        self.assertContains(response, reverse('get_member', args=[self.members[1].pk]))
+        self.assertNotContains(response, "Jane2")
+
+    def test_reads_only_the_summary_table(self):
+        with self.assertNumQueries(2) as context:
+            self.client.get(self.url)
+        for query in context.captured_queries:
+            self.assertNotIn('"loans_loan"', query['sql'])
+
+    def test_no_overdue_loans(self):
+        for loan in Loan.objects.all():
+            loan.returned_at = self.today
+            loan.save()
+        response = self.client.get(self.url)
+        self.assertContains(response, "No loans are overdue.")
@@ -0,0 +1,105 @@
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from loans.models import Book
+from loans.search import search_books
+
+from io import StringIO
+import datetime
+
+class SearchBooksTestCase(TestCase):
+    def setUp(self):
+        self.url = reverse('search_books')
+        self.dune = Book.objects.create(
+            authors = "Herbert, F.",
+            title = "Dune",
+            publication_date = datetime.date(1965, 8, 1),
+            isbn = "9780441013593"
+        )
+        self.messiah = Book.objects.create(
+            authors = "Herbert, F.",
+            title = "Dune Messiah",
+            publication_date = datetime.date(1969, 10, 15),
+            isbn = "9780593098233"
+        )
+        self.emma = Book.objects.create(
+            authors = "Austen, J.",
+            title = "Emma",
+            publication_date = datetime.date(1815, 12, 23),
+            isbn = "9780141439587"
+        )
+
+    def test_search_books_url(self):
+        self.assertEqual(self.url, '/books/search/')
+
+    def test_search_matches_title_and_authors(self):
+        results, has_next = search_books("herbert")
+        self.assertEqual({result.pk for result in results}, {self.dune.pk, self.messiah.pk})
+        self.assertFalse(has_next)
+        results, has_next = search_books("emma")
+        self.assertEqual([result.pk for result in results], [self.emma.pk])
+
+    def test_search_ranks_best_match_first(self):
+        results, has_next = search_books("dune")
+        self.assertEqual([result.pk for result in results], [self.dune.pk, self.messiah.pk])
+
+    def test_search_highlights_matches(self):
+        results, has_next = search_books("messiah")
+        self.assertEqual(results[0].title, "Dune <mark>Messiah</mark>")
+
+    def test_search_escapes_html(self):
+        self.emma.title = "Emma <script>"
+        self.emma.save()
+        results, has_next = search_books("emma")
+        self.assertEqual(results[0].title, "<mark>Emma</mark> &lt;script&gt;")
+
+    def test_search_ignores_fts_syntax(self):
+        results, has_next = search_books('"dune* -(')
+        self.assertEqual(len(results), 2)
+
+    def test_index_follows_updates_and_deletes(self):
+        self.emma.title = "Persuasion"
+        self.emma.save()
+        self.assertEqual(search_books("emma")[0], [])
+        self.assertEqual(len(search_books("persuasion")[0]), 1)
+        self.dune.delete()
+        self.assertEqual([result.pk for result in search_books("dune")[0]], [self.messiah.pk])
+
+    def test_index_follows_bulk_create(self):
+        Book.objects.bulk_create([
+            Book(authors="Tolkien, J.", title="The Hobbit", publication_date=datetime.date(1937, 9, 21), isbn="9780547928227", isbn_key=9780547928227)
+        ])
+        self.assertEqual(len(search_books("hobbit")[0]), 1)
+
+    def test_keyset_pagination(self):
+        first_page, has_next = search_books("dune", limit=1)
+        self.assertTrue(has_next)
+        second_page, has_next = search_books("dune", limit=1, after=(first_page[0].rank, first_page[0].pk))
+        self.assertFalse(has_next)
+        self.assertEqual([first_page[0].pk, second_page[0].pk], [self.dune.pk, self.messiah.pk])
+
+    def test_rebuild_command(self):
+        call_command('rebuild_search_index', stdout=StringIO())
+        self.assertEqual(len(search_books("herbert")[0]), 2)
+
+    def test_get_search_page(self):
+        response = self.client.get(self.url, {'q': 'emma'})
+        self.assertEqual(response.status_code, 200)
+        self.assertTemplateUsed(response, 'search_books.html')
+        self.assertContains(response, "<mark>Emma</mark>")
+        self.assertContains(response, reverse('get_book', kwargs={'book_id': self.emma.pk}))
+
+    def test_get_search_page_without_query(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['results'], [])
+
+    @override_settings(ITEMS_PER_PAGE=1)
+    def test_search_page_links_to_next_page(self):
+        response = self.client.get(self.url, {'q': 'dune'})
+        next_cursor = response.context['next_cursor']
+        self.assertIsNotNone(next_cursor)
+        response = self.client.get(self.url, {'q': 'dune', 'after': next_cursor})
+        self.assertEqual([result.pk for result in response.context['results']], [self.messiah.pk])
+        self.assertIsNone(response.context['next_cursor'])
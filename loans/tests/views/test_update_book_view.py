@@ -4,6 +4,7 @@ from django.db import transaction
 from django.contrib import messages
 
 from loans.forms import BookForm
+from loans.helpers import isbn_to_key
 from loans.models import Book
 
 import datetime
@@ -109,4 +110,57 @@ class UpdateBookTestCase(TestCase):
         response = self.client.post(bad_url, self.form_input)
         after_count = Book.objects.count()
         self.assertEqual(response.status_code, 404)
-        self.assertEqual(after_count, before_count)
\ No newline at end of file
+        self.assertEqual(after_count, before_count)
+
+    def test_form_carries_the_version(self):
+        response = self.client.get(self.url)
+        self.assertContains(response, f'name="version" value="{self.book.version}"')
+
+    def test_post_updates_changed_fields_with_one_conditional_statement(self):
+        # Neither the authors nor the publication year change, so no rollup moves.
+        self.form_input.update(authors="Doe, J.", publication_date='2024-10-01', version=self.book.version)
+        with self.assertNumQueries(3) as context:
+            self.client.post(self.url, self.form_input)
+        update = context.captured_queries[-1]['sql']
+        self.assertTrue(update.startswith('UPDATE "loans_book" SET'))
+        self.assertIn('"version" =', update.split('WHERE')[1])
+        self.assertNotIn('"authors"', update)
+        self.book.refresh_from_db()
+        self.assertEqual(self.book.title, "A New Title")
+        self.assertEqual(self.book.version, 2)
+
+    def test_post_with_stale_version_is_refused(self):
+        form_input = dict(self.form_input, version=self.book.version)
+        self.book.title = "Someone Else's Title"
+        self.book.save()
+        response = self.client.post(self.url, form_input)
+        self.assertEqual(response.status_code, 200)
+        self.assertTemplateUsed(response, 'update_book.html')
+        self.assertIn("Someone else changed this book", response.context['form'].non_field_errors()[0])
+        self.book.refresh_from_db()
+        self.assertEqual(self.book.title, "Someone Else's Title")
+        self.assertEqual(self.book.authors, "Doe, J.")
+
+    def test_second_of_two_concurrent_edits_is_refused(self):
+        version = self.book.version
+        first = self.client.post(self.url, dict(self.form_input, version=version))
+        self.assertEqual(first.status_code, 302)
+        second = self.client.post(self.url, dict(self.form_input, title="Another Title", version=version))
+        self.assertEqual(second.status_code, 200)
+        self.book.refresh_from_db()
+        self.assertEqual(self.book.title, "A New Title")
+
+    def test_post_without_changes_writes_nothing(self):
+        Book.objects.filter(pk=self.book.pk).update(isbn="1111111111", isbn_key=isbn_to_key("1111111111"))
+        form_input = {'authors': "Doe, J.", 'title': "A Title", 'publication_date': '2024-09-01', 'isbn': "1111111111"}
+        with self.assertNumQueries(1):
+            response = self.client.post(self.url, form_input)
+        self.assertEqual(response.status_code, 302)
+        self.book.refresh_from_db()
+        self.assertEqual(self.book.version, 1)
+
+    def test_saving_a_book_bumps_its_version(self):
+        self.book.title = "A New Title"
+        self.book.save()
+        self.book.refresh_from_db()
+        self.assertEqual(self.book.version, 2)
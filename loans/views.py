@@ -1,37 +1,104 @@
 from django.shortcuts import render
-from django.http import HttpResponse, HttpResponseRedirect
+from django.http import HttpResponse, HttpResponseRedirect, StreamingHttpResponse
 from django.http import Http404
 from django.urls import reverse
-from django.core.paginator import Paginator
 from django.contrib import messages
+from django.db import connections, router
+from django.utils import timezone
+from django.utils.cache import patch_vary_headers
 from django.views import View
 from django.views.generic.edit import FormView
 import random
+import re
 
-from loans.models import Book
-from loans.forms import BookForm
+from loans.models import Author, Book, Member
+from loans import bulk
+from loans.availability import get_availability
+from loans.cache import cache_book_page, cache_list_page, cached_response, get_list_version, get_loans_version, render_rows
+from loans.export import CONTENT_TYPES, stream_catalog
+from loans.conditional import conditional_page, make_etag, window_validator
+from loans.forms import BookForm, BookSelectionForm, BookUpdateForm, BulkUpdateForm
+from loans.helpers import author_sort_key, clean_isbn, is_valid_isbn, isbn_to_key
+from loans.loan_stats import get_overdue_report
+from loans.members import get_loan_history, get_member_summary
+from loans.metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, registry as metrics_registry
+from loans.pagination import CountedPaginator, get_keyset_page, get_keyset_window, parse_cursor
+from loans.rollups import get_catalog_stats
+from loans.search import parse_search_cursor, search_books as run_search
 
-from my_library import settings
+from django.conf import settings
 
 ITEMS_PER_PAGE =25
 
+ACCEPTS_GZIP = re.compile(r'\bgzip\b')
+
+SLOGANS = ["Having fun isn't hard when you've got a library card.",
+            "Libraries make shhh happen.", 
+            "Believe in your shelf.", 
+            "Need a good read? We've got you covered.", 
+            "Check us out. And maybe one of our books too.", "Get a better read on the world"]
+
 def welcome(request):
-    slogans = ["Having fun isn't hard when you've got a library card.",
-                "Libraries make shhh happen.", 
-                "Believe in your shelf.", 
-                "Need a good read? We've got you covered.", 
-                "Check us out. And maybe one of our books too.", "Get a better read on the world"]
-    context = {'slogan': random.choice(slogans)}
-    return render(request, 'welcome.html', context)
+    # One cached page per slogan keeps the slogan random for every visitor.
+    index = random.randrange(len(SLOGANS))
+    context = {'slogan': SLOGANS[index]}
+    return cached_response(request, f'catalog:welcome:{index}', lambda: render(request, 'welcome.html', context))
+
+def book_list_validator(request):
+    book_list = Book.objects.all().order_by('id')
+    after = parse_cursor(request.GET.get("after"))
+    before = parse_cursor(request.GET.get("before"))
+    if after is not None or before is not None:
+        window = get_keyset_window(book_list, settings.ITEMS_PER_PAGE, after=after, before=before)
+        return window_validator(window, 'keyset', *list_context_version())
+    paginator = CountedPaginator(book_list, settings.ITEMS_PER_PAGE)
+    page_object = paginator.get_page(request.GET.get("page"))
+    bottom = (page_object.number - 1) * settings.ITEMS_PER_PAGE
+    window = book_list[bottom:bottom + settings.ITEMS_PER_PAGE + 1]
+    # The page navigator depends on the total, so it is part of the validator.
+    return window_validator(window, page_object.number, paginator.count, *list_context_version())
+
+def list_context_version():
+    # Availability depends on loans and on today's date rather than on the
+    # books themselves; every loan write bumps the loans version.
+    return timezone.localdate(), get_loans_version()
 
+@conditional_page(book_list_validator)
+@cache_list_page
 def list_books(request):
     book_list = Book.objects.all().order_by('id')
-    paginator = Paginator(book_list, settings.ITEMS_PER_PAGE)
-    page_number = request.GET.get("page")
-    page_object = paginator.get_page(page_number)
+    after = parse_cursor(request.GET.get("after"))
+    before = parse_cursor(request.GET.get("before"))
+    if after is not None or before is not None:
+        page_object = get_keyset_page(book_list, settings.ITEMS_PER_PAGE, after=after, before=before)
+    else:
+        paginator = CountedPaginator(book_list, settings.ITEMS_PER_PAGE)
+        page_number = request.GET.get("page")
+        page_object = paginator.get_page(page_number)
+    availability = get_availability([book.pk for book in page_object])
+    for book in page_object:
+        book.availability = availability[book.pk]
+    render_rows(page_object, '__book_row.html')
     context = {'page_object': page_object}
     return render(request, 'books.html', context)
 
+def search_books(request):
+    query = request.GET.get("q", "").strip()
+    after = parse_search_cursor(request.GET.get("after"))
+    using = connections[router.db_for_read(Book)]
+    results, has_next = run_search(query, limit=settings.ITEMS_PER_PAGE, after=after, using=using)
+    next_cursor = results[-1].cursor if has_next else None
+    context = {'query': query, 'results': results, 'next_cursor': next_cursor}
+    return render(request, 'search_books.html', context)
+
+def book_validator(request, book_id):
+    updated_at = Book.objects.filter(pk=book_id).values_list('updated_at', flat=True).first()
+    if updated_at is None:
+        return None
+    return make_etag(book_id, updated_at), updated_at
+
+@conditional_page(book_validator)
+@cache_book_page
 def get_book(request, book_id):
     try:
         context = {'book': Book.objects.get(pk=book_id)}
@@ -39,6 +106,78 @@ def get_book(request, book_id):
         raise Http404(f"Could not find book with primary key {book_id}")
     else:
         return render(request, 'get_book.html', context)
+
+def get_member(request, member_id):
+    today = timezone.localdate()
+    try:
+        member = get_member_summary(member_id, on=today)
+    except Member.DoesNotExist:
+        raise Http404(f"Could not find member with primary key {member_id}")
+    after = parse_cursor(request.GET.get("after"))
+    before = parse_cursor(request.GET.get("before"))
+    page_object = get_loan_history(member, settings.ITEMS_PER_PAGE, after=after, before=before, on=today)
+    context = {'member': member, 'page_object': page_object}
+    return render(request, 'get_member.html', context)
+
+def overdue_report(request):
+    today = timezone.localdate()
+    page_object = get_overdue_report(settings.ITEMS_PER_PAGE, request.GET.get("page"), on=today)
+    return render(request, 'overdue_report.html', {'page_object': page_object, 'today': today})
+
+def catalog_stats(request):
+    # Every write to a book bumps the list version, which retires this page too.
+    return cached_response(request, 'catalog:stats', lambda: render(request, 'catalog_stats.html', get_catalog_stats()), version=get_list_version())
+
+def metrics(request):
+    if not settings.METRICS_ENABLED:
+        raise Http404("Metrics are disabled")
+    if not (request.user.is_staff or request.META.get('REMOTE_ADDR') in settings.METRICS_ALLOWED_IPS):
+        raise Http404("Metrics are served to internal addresses only")
+    response = HttpResponse(metrics_registry.render(), content_type=METRICS_CONTENT_TYPE)
+    response['Cache-Control'] = 'no-store'
+    return response
+
+def export_books(request):
+    file_format = request.GET.get("format", "csv")
+    if file_format not in CONTENT_TYPES:
+        raise Http404(f"Unknown export format {file_format}")
+    compress = bool(ACCEPTS_GZIP.search(request.headers.get('Accept-Encoding', '')))
+    response = StreamingHttpResponse(stream_catalog(file_format, compress=compress), content_type=CONTENT_TYPES[file_format])
+    response['Content-Disposition'] = f'attachment; filename="books.{file_format}"'
+    if compress:
+        response['Content-Encoding'] = 'gzip'
+    patch_vary_headers(response, ('Accept-Encoding',))
+    return response
+
+def books_by_author(request, name):
+    try:
+        author = Author.objects.get(sort_key=author_sort_key(name))
+    except Author.DoesNotExist:
+        raise Http404(f"Could not find author {name}")
+    # An IN over the link table's (author_id, book_id) index yields the ids
+    # already sorted, where a join would sort the author's books every page.
+    book_ids = Author.books.through.objects.filter(author=author).values('book_id')
+    book_list = Book.objects.filter(pk__in=book_ids).order_by('id')
+    after = parse_cursor(request.GET.get("after"))
+    before = parse_cursor(request.GET.get("before"))
+    page_object = get_keyset_page(book_list, settings.ITEMS_PER_PAGE, after=after, before=before)
+    availability = get_availability([book.pk for book in page_object])
+    for book in page_object:
+        book.availability = availability[book.pk]
+    render_rows(page_object, '__book_row.html')
+    context = {'author': author, 'page_object': page_object}
+    return render(request, 'books_by_author.html', context)
+
+def get_book_by_isbn(request, isbn):
+    isbn = clean_isbn(isbn)
+    if not is_valid_isbn(isbn):
+        raise Http404(f"{isbn} is not a valid ISBN")
+    try:
+        context = {'book': Book.objects.get(isbn_key=isbn_to_key(isbn))}
+    except Book.DoesNotExist:
+        raise Http404(f"Could not find book with ISBN {isbn}")
+    else:
+        return render(request, 'get_book.html', context)
     
 class CreateBookView(FormView):
     form_class = BookForm
@@ -57,33 +196,85 @@ class CreateBookView(FormView):
 
 def update_book(request, book_id):
     try:
-        Book.objects.get(pk=book_id)
+        book = Book.objects.get(pk=book_id)
     except Book.DoesNotExist:
         raise Http404(f"Could not find book with primary key {book_id}")
     if request.method == "POST":
-        book = Book.objects.get(pk=book_id)
-        form = BookForm(request.POST, instance=book)
+        form = BookUpdateForm(request.POST, instance=book)
         if form.is_valid():
             try:
-                book = form.save()
+                saved = form.save_changes()
             except:
                 form.add_error(None, "It was not possible to update this book in the database.")
             else:
-                messages.info(request, f"Updated book record to: {book}")
-                path = reverse('list_books')
-                return HttpResponseRedirect(path)
+                if saved:
+                    messages.info(request, f"Updated book record to: {book}")
+                    path = reverse('list_books')
+                    return HttpResponseRedirect(path)
+                form.add_error(None, "Someone else changed this book while you were editing it. Reload the page to see their changes before editing it again.")
     else:
-        book = Book.objects.get(pk=book_id)
-        form = BookForm(instance=book)
+        form = BookUpdateForm(instance=book)
     return render(request, 'update_book.html', {'form': form, 'book': book})
 
 def delete_book(request, book_id):
+    if request.method == "POST":
+        # The delete collects the row itself, so there is no separate lookup.
+        deleted, _ = Book.objects.filter(pk=book_id).delete()
+        if not deleted:
+            raise Http404(f"Could not find book with primary key {book_id}")
+        path = reverse('list_books')
+        return HttpResponseRedirect(path)
     try:
         book = Book.objects.get(pk=book_id)
     except Book.DoesNotExist:
         raise Http404(f"Could not find book with primary key {book_id}")
+    return render(request, 'delete_book.html', {'book': book})
+
+def get_selection_or_redirect(request):
+    form = BookSelectionForm(request.GET)
+    if form.is_valid():
+        return form.cleaned_data['ids'], None
+    messages.warning(request, form.errors['ids'][0])
+    return None, HttpResponseRedirect(reverse('list_books'))
+
+def bulk_delete_books(request):
+    protected = None
     if request.method == "POST":
-        book.delete()
-        path = reverse('list_books')
-        return HttpResponseRedirect(path)
-    return render(request, 'delete_book.html', {'book': book})
\ No newline at end of file
+        form = BookSelectionForm(request.POST)
+        if form.is_valid():
+            try:
+                deleted = bulk.delete_books(form.cleaned_data['ids'])
+            except bulk.ProtectedBooks as error:
+                protected = error.book_ids
+                form.add_error(None, "None of the books were deleted because some of them have loans.")
+            else:
+                messages.info(request, f"Deleted {deleted} books.")
+                path = reverse('list_books')
+                return HttpResponseRedirect(path)
+        ids = form.cleaned_data.get('ids', [])
+    else:
+        ids, redirect = get_selection_or_redirect(request)
+        if redirect is not None:
+            return redirect
+        form = BookSelectionForm(initial={'ids': ids})
+    if protected is None:
+        protected = bulk.find_protected(ids)
+    context = {'form': form, 'books': bulk.get_selection(ids), 'protected': protected}
+    return render(request, 'bulk_delete_books.html', context)
+
+def bulk_update_books(request):
+    if request.method == "POST":
+        form = BulkUpdateForm(request.POST)
+        if form.is_valid():
+            field = form.cleaned_data['field']
+            updated = bulk.update_books(form.cleaned_data['ids'], field, form.cleaned_data['value'])
+            messages.info(request, f"Updated the {Book._meta.get_field(field).verbose_name} of {updated} books.")
+            path = reverse('list_books')
+            return HttpResponseRedirect(path)
+        ids = form.cleaned_data.get('ids', [])
+    else:
+        ids, redirect = get_selection_or_redirect(request)
+        if redirect is not None:
+            return redirect
+        form = BulkUpdateForm(initial={'ids': ids})
+    return render(request, 'bulk_update_books.html', {'form': form, 'books': bulk.get_selection(ids)})
\ No newline at end of file
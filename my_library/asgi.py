@@ -11,6 +11,7 @@ import os
 
 from django.core.asgi import get_asgi_application
 
-os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'my_library.settings')
+# These settings route the catalog's read views to their async versions.
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'my_library.settings_asgi')
 
 application = get_asgi_application()
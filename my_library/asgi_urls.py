@@ -0,0 +1,24 @@
+"""
+URL configuration for the ASGI deployment.
+
+The same routes as my_library.urls, with the read views that have async
+versions pointed at loans.async_views.
+"""
+from django.urls import path
+
+from loans import async_views
+from my_library.urls import urlpatterns as sync_urlpatterns
+
+ASYNC_VIEWS = {
+    'list_books': async_views.list_books,
+    'get_book': async_views.get_book,
+    'get_book_by_isbn': async_views.get_book_by_isbn,
+    'api_list_books': async_views.api_list_books,
+    'api_get_book': async_views.api_get_book,
+}
+
+urlpatterns = [
+    path(str(pattern.pattern), ASYNC_VIEWS[pattern.name], name=pattern.name)
+    if getattr(pattern, 'name', None) in ASYNC_VIEWS else pattern
+    for pattern in sync_urlpatterns
+]
@@ -59,6 +59,9 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'loans.metrics.MetricsMiddleware',
+    'loans.compression.CompressionMiddleware',
+    'loans.replica.ReplicaMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -68,12 +71,15 @@ MIDDLEWARE = [
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+# my_library.settings_asgi, used by the ASGI entry point, serves async views instead.
 ROOT_URLCONF = 'my_library.urls'
 
 TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
         'DIRS': [],
+        # Without explicit loaders Django wraps these in the cached loader,
+        # which the autoreloader resets in development.
         'APP_DIRS': True,
         'OPTIONS': {
             'context_processors': [
@@ -98,6 +104,61 @@ DATABASES = {
     }
 }
 
+# Reads of the catalog can go to a read-only copy of the database, refreshed
+# with `manage.py refresh_replica`.  Set DATABASE_REPLICA to its file to use one.
+DATABASE_REPLICA = os.getenv('DATABASE_REPLICA')
+REPLICA_DATABASE_ALIAS = 'replica'
+if DATABASE_REPLICA and ENVIRONMENT != 'test':
+    DATABASES[REPLICA_DATABASE_ALIAS] = {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': DATABASE_REPLICA,
+        'TEST': {'MIRROR': 'default'},
+    }
+
+DATABASE_ROUTERS = ['loans.replica.PrimaryReplicaRouter']
+
+# Seconds after a write during which the writer's reads stay on the primary.
+REPLICA_PIN_SECONDS = 10
+
+# Pragmas applied to every SQLite connection as it is opened.
+SQLITE_CONNECTION_PROFILE = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'cache_size': -64000,  # In KiB: about 64 MB of page cache per connection.
+    'mmap_size': 256 * 1024 * 1024,
+    'temp_store': 'MEMORY',
+}
+
+
+# Caches
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+
+# The catalog cache must be shared by every worker process for invalidation to
+# reach all of them, so production defaults to the file-based backend.
+CATALOG_CACHE_BACKEND = os.getenv('CATALOG_CACHE_BACKEND', 'file' if ENVIRONMENT == 'production' else 'locmem')
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'catalog': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': BASE_DIR / 'cache' / 'catalog',
+    } if CATALOG_CACHE_BACKEND == 'file' else {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'catalog',
+    },
+}
+
+CATALOG_CACHE_ALIAS = 'catalog'
+CATALOG_CACHE_ENABLED = ENVIRONMENT != 'test'
+CATALOG_CACHE_TIMEOUT = 300
+# Seconds an outdated page may still be served while one request re-renders it.
+# 0 disables stale-while-revalidate.
+CATALOG_CACHE_STALE_TIMEOUT = 60
+# Rendered book rows carry their own version, so they can outlive the pages.
+CATALOG_ROW_TIMEOUT = 3600
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -138,6 +199,28 @@ STATIC_ROOT = 'assets/'
 STATICFILES_DIRS = [
     BASE_DIR / "static",
 ]
+# collectstatic writes content-hashed names and compressed copies, which
+# loans.assets.serve_asset serves with far-future cache headers.  Tests render
+# pages without collecting, so they keep the plain names.
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage' if ENVIRONMENT == 'test'
+        else 'loans.assets.CompressedManifestStaticFilesStorage',
+    },
+}
+
+# Compression of dynamic responses, see loans.compression.  brotli is used
+# when the package is installed and the client accepts it.
+COMPRESSION_MIN_SIZE = 1024
+COMPRESSION_CONTENT_TYPES = {
+    'text/html', 'text/plain', 'text/csv', 'text/css', 'text/javascript',
+    'application/json', 'application/javascript', 'application/xml', 'image/svg+xml',
+}
+COMPRESSION_GZIP_LEVEL = 6
+COMPRESSION_BROTLI_QUALITY = 5
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
@@ -157,6 +240,12 @@ MESSAGE_TAGS = {
 
 ITEMS_PER_PAGE = 25
 
+# Per-view latency and SQL metrics, served at /metrics/ for Prometheus.  Off in
+# production unless METRICS_ENABLED is set, and only served to staff and to the
+# addresses in METRICS_ALLOWED_IPS (comma-separated) when on.
+METRICS_ENABLED = os.getenv('METRICS_ENABLED', str(ENVIRONMENT != 'production')).lower() in ('1', 'true', 'yes')
+METRICS_ALLOWED_IPS = os.getenv('METRICS_ALLOWED_IPS', '127.0.0.1,::1').split(',')
+
 # Security settings
 if ENVIRONMENT == 'production':
     SECURE_HSTS_SECONDS = 3600
@@ -0,0 +1,8 @@
+"""
+Settings for the ASGI deployment: my_library.settings with the URLconf that
+points the catalog's read views at loans.async_views.
+"""
+
+from my_library.settings import *  # noqa: F401,F403
+
+ROOT_URLCONF = 'my_library.asgi_urls'
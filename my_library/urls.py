@@ -15,21 +15,37 @@ Including another URLconf
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
 from django.contrib import admin
-from django.urls import path
+from django.urls import path, re_path
 from django.conf import settings
-from django.conf.urls.static import static
+import re
 
-from loans import views
+from loans import api, assets, views
 
 urlpatterns = [
     path('', views.welcome, name='root'),
     path('welcome/', views.welcome, name='welcome'),
     path('books/', views.list_books, name='list_books'),
+    path('books/search/', views.search_books, name='search_books'),
+    path('books/export/', views.export_books, name='export_books'),
+    path('books/stats/', views.catalog_stats, name='catalog_stats'),
+    path('books/author/<path:name>/', views.books_by_author, name='books_by_author'),
     path('book/<int:book_id>/', views.get_book, name='get_book'),
+    path('book/isbn/<str:isbn>/', views.get_book_by_isbn, name='get_book_by_isbn'),
     path('create_book/', views.CreateBookView.as_view(), name='create_book'),
     path('update_book/<int:book_id>/', views.update_book, name='update_book'),
     path('delete_book/<int:book_id>/', views.delete_book, name='delete_book'),
+    path('books/bulk_delete/', views.bulk_delete_books, name='bulk_delete_books'),
+    path('books/bulk_update/', views.bulk_update_books, name='bulk_update_books'),
+    path('member/<int:member_id>/', views.get_member, name='get_member'),
+    path('members/overdue/', views.overdue_report, name='overdue_report'),
+    path('api/books/', api.list_books, name='api_list_books'),
+    path('api/books/<int:book_id>/', api.get_book, name='api_get_book'),
+    path('metrics/', views.metrics, name='metrics'),
     path('admin/', admin.site.urls),
 ]
 
-urlpatterns += static(settings.STATIC_URL, document_root=settings.STATIC_ROOT)
+# runserver serves static files itself in development; everywhere else the app
+# serves the collected, precompressed copies.
+urlpatterns += [
+    re_path(rf'^{re.escape(settings.STATIC_URL.lstrip("/"))}(?P<path>.+)$', assets.serve_asset),
+]